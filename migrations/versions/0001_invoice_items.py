@@ -0,0 +1,113 @@
+"""Move invoice items from the invoices.items JSON column to invoice_items
+
+Revision ID: 0001_invoice_items
+Revises:
+Create Date: 2026-10-18 00:00:00
+
+Databases created by `init_db()` (SQLAlchemy `create_all`) may already have an
+empty `invoice_items` table, so creation is conditional; the backfill only runs
+while the legacy `invoices.items` column still exists.
+
+The `(created_at, id)` index used by keyset pagination of `GET /invoices` is
+also added here, as `create_all` does not add indexes to existing tables.
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0001_invoice_items"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+invoices = sa.table("invoices", sa.column("id", sa.String), sa.column("items", sa.String))
+invoice_items = sa.table(
+    "invoice_items",
+    sa.column("invoice_id", sa.String),
+    sa.column("product_id", sa.String),
+    sa.column("description", sa.String),
+    sa.column("quantity", sa.Integer),
+    sa.column("unit_price", sa.Float),
+    sa.column("position", sa.Integer),
+)
+
+
+def _legacy_rows(invoice_id, raw):
+    """Turn one legacy JSON array into item rows, merging repeated products
+    (the old aggregate allowed the same product twice)."""
+    rows = {}
+    for data in json.loads(raw):
+        product_id = data.get("product_id") or data.get("productId") or ""
+        quantity = int(data.get("quantity") or 0)
+        if product_id in rows:
+            rows[product_id]["quantity"] += quantity
+            continue
+        rows[product_id] = {
+            "invoice_id": invoice_id,
+            "product_id": product_id,
+            "description": data.get("description", ""),
+            "quantity": quantity,
+            "unit_price": float(data.get("unit_price") or data.get("unitPrice") or 0.0),
+            "position": len(rows),
+        }
+    return list(rows.values())
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "invoice_items" not in inspector.get_table_names():
+        op.create_table(
+            "invoice_items",
+            sa.Column("invoice_id", sa.String(36), sa.ForeignKey("invoices.id", ondelete="CASCADE"), primary_key=True),
+            sa.Column("product_id", sa.String(64), primary_key=True),
+            sa.Column("description", sa.String(255), nullable=False, server_default=""),
+            sa.Column("quantity", sa.Integer, nullable=False),
+            sa.Column("unit_price", sa.Float, nullable=False),
+            sa.Column("position", sa.Integer, nullable=False, server_default="0"),
+        )
+    if "ix_invoices_created_at_id" not in {ix["name"] for ix in inspector.get_indexes("invoices")}:
+        op.create_index("ix_invoices_created_at_id", "invoices", ["created_at", "id"])
+
+    if "items" not in {col["name"] for col in inspector.get_columns("invoices")}:
+        return
+    result = bind.execution_options(stream_results=True).execute(
+        sa.select(invoices.c.id, invoices.c.items).where(invoices.c.items.isnot(None))
+    )
+    batch = []
+    for invoice_id, raw in result:
+        batch.extend(_legacy_rows(invoice_id, raw))
+        if len(batch) >= BATCH_SIZE:
+            bind.execute(invoice_items.insert().prefix_with("IGNORE"), batch)
+            batch = []
+    if batch:
+        bind.execute(invoice_items.insert().prefix_with("IGNORE"), batch)
+    op.drop_column("invoices", "items")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    op.add_column("invoices", sa.Column("items", sa.String(2000), nullable=True))
+    result = bind.execute(
+        sa.select(
+            invoice_items.c.invoice_id,
+            invoice_items.c.product_id,
+            invoice_items.c.description,
+            invoice_items.c.quantity,
+            invoice_items.c.unit_price,
+        ).order_by(invoice_items.c.invoice_id, invoice_items.c.position)
+    )
+    grouped = {}
+    for invoice_id, product_id, description, quantity, unit_price in result:
+        grouped.setdefault(invoice_id, []).append(
+            {"productId": product_id, "description": description, "quantity": quantity, "unitPrice": unit_price}
+        )
+    for invoice_id, items in grouped.items():
+        bind.execute(invoices.update().where(invoices.c.id == invoice_id).values(items=json.dumps(items)))
+    op.drop_index("ix_invoices_created_at_id", table_name="invoices")
+    op.drop_table("invoice_items")
@@ -0,0 +1,26 @@
+"""Add invoices.version for optimistic concurrency control
+
+Revision ID: 0002_invoice_version
+Revises: 0001_invoice_items
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0002_invoice_version"
+down_revision = "0001_invoice_items"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "version" not in {col["name"] for col in inspector.get_columns("invoices")}:
+        op.add_column("invoices", sa.Column("version", sa.Integer, nullable=False, server_default="0"))
+
+
+def downgrade() -> None:
+    op.drop_column("invoices", "version")
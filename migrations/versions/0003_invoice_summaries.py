@@ -0,0 +1,51 @@
+"""Add the invoice_summaries read model behind GET /invoices
+
+Revision ID: 0003_invoice_summaries
+Revises: 0002_invoice_version
+Create Date: 2026-10-18 00:00:00
+
+The table may already exist when `init_db()` created it; it is then left as
+is. Existing invoices are backfilled with one INSERT ... SELECT (IGNORE keeps
+rows the running API projected in the meantime).
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0003_invoice_summaries"
+down_revision = "0002_invoice_version"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "invoice_summaries" not in inspector.get_table_names():
+        op.create_table(
+            "invoice_summaries",
+            sa.Column("id", sa.String(36), primary_key=True),
+            sa.Column("customer", sa.String(255), nullable=False),
+            sa.Column("status", sa.String(50), nullable=False),
+            sa.Column("amount", sa.Float, nullable=False),
+            sa.Column("item_count", sa.Integer, nullable=False, server_default="0"),
+            sa.Column("invoice_number", sa.String(64), nullable=False),
+            sa.Column("created_at", sa.DateTime),
+            sa.Column("updated_at", sa.DateTime, server_default=sa.func.now()),
+        )
+        op.create_index("ix_invoice_summaries_created_at_id", "invoice_summaries", ["created_at", "id"])
+        op.create_index("ix_invoice_summaries_status_created_at_id", "invoice_summaries", ["status", "created_at", "id"])
+        op.create_index("ix_invoice_summaries_customer_created_at_id", "invoice_summaries", ["customer", "created_at", "id"])
+    op.execute(
+        """
+        INSERT IGNORE INTO invoice_summaries (id, customer, status, amount, item_count, invoice_number, created_at, updated_at)
+        SELECT i.id, i.customer, i.status, i.amount,
+               (SELECT COUNT(*) FROM invoice_items it WHERE it.invoice_id = i.id),
+               i.invoice_number, i.created_at, NOW()
+        FROM invoices i
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("invoice_summaries")
@@ -0,0 +1,35 @@
+"""Index invoices for GET /reports/totals
+
+Revision ID: 0004_invoice_report_indexes
+Revises: 0003_invoice_summaries
+Create Date: 2026-10-18 00:00:00
+
+The indexes may already exist when `init_db()` created the table; they are
+then left as is.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0004_invoice_report_indexes"
+down_revision = "0003_invoice_summaries"
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    "ix_invoices_status_created_at": ["status", "created_at"],
+    "ix_invoices_customer_created_at": ["customer", "created_at"],
+}
+
+
+def upgrade() -> None:
+    existing = {index["name"] for index in sa.inspect(op.get_bind()).get_indexes("invoices")}
+    for name, columns in INDEXES.items():
+        if name not in existing:
+            op.create_index(name, "invoices", columns)
+
+
+def downgrade() -> None:
+    for name in INDEXES:
+        op.drop_index(name, table_name="invoices")
@@ -0,0 +1,76 @@
+"""Store money as DECIMAL(14, 2) instead of FLOAT
+
+Revision ID: 0005_money_decimal
+Revises: 0004_invoice_report_indexes
+Create Date: 2026-10-18 00:00:00
+
+The upgrade first looks for item prices with fractions of a cent, which the
+column conversion would round, and aborts listing them; fix those rows, or
+accept the rounding with `alembic -x allow_price_rounding=true upgrade`.
+Other existing values are rounded to the cent by the conversion. Amounts of
+invoices with items are then recomputed exactly from their lines (replacing
+the float drift the nightly reconciliation used to repair) and copied to the
+invoice_summaries read model.
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0005_money_decimal"
+down_revision = "0004_invoice_report_indexes"
+branch_labels = None
+depends_on = None
+
+COLUMNS = [("invoices", "amount"), ("invoice_items", "unit_price"), ("invoice_summaries", "amount")]
+
+
+# compared in the shortest decimal form of the stored FLOAT, the one the
+# column conversion rounds
+SUB_CENT_PRICES = """
+    SELECT invoice_id, product_id, unit_price
+    FROM invoice_items
+    WHERE CAST(unit_price AS DECIMAL(30, 10)) <> CAST(unit_price AS DECIMAL(30, 2))
+    ORDER BY invoice_id, product_id
+"""
+
+
+def _check_prices() -> None:
+    if context.get_x_argument(as_dictionary=True).get("allow_price_rounding") == "true":
+        return
+    rows = op.get_bind().execute(sa.text(SUB_CENT_PRICES)).fetchall()
+    if rows:
+        listed = "\n".join(f"  invoice {r.invoice_id} product {r.product_id}: {r.unit_price}" for r in rows[:50])
+        more = f"\n  ... and {len(rows) - 50} more" if len(rows) > 50 else ""
+        raise RuntimeError(
+            f"{len(rows)} invoice item prices have more than 2 decimals and would be rounded:\n{listed}{more}\n"
+            "Fix them, or rerun with `-x allow_price_rounding=true` to accept the rounding."
+        )
+
+
+def upgrade() -> None:
+    _check_prices()
+    for table, column in COLUMNS:
+        op.alter_column(table, column, type_=sa.Numeric(14, 2), existing_type=sa.Float, existing_nullable=False)
+    op.execute(
+        """
+        UPDATE invoices i
+        JOIN (SELECT invoice_id, SUM(quantity * unit_price) AS total FROM invoice_items GROUP BY invoice_id) t
+          ON t.invoice_id = i.id
+        SET i.amount = t.total
+        WHERE i.amount <> t.total
+        """
+    )
+    op.execute(
+        """
+        UPDATE invoice_summaries s
+        JOIN invoices i ON i.id = s.id
+        SET s.amount = i.amount
+        WHERE s.amount <> i.amount
+        """
+    )
+
+
+def downgrade() -> None:
+    for table, column in COLUMNS:
+        op.alter_column(table, column, type_=sa.Float, existing_type=sa.Numeric(14, 2), existing_nullable=False)
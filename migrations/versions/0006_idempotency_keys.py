@@ -0,0 +1,37 @@
+"""Add idempotency_keys for Idempotency-Key request deduplication
+
+Revision ID: 0006_idempotency_keys
+Revises: 0005_money_decimal
+Create Date: 2026-10-18 00:00:00
+
+The table may already exist when `init_db()` created it; it is then left as is.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision = "0006_idempotency_keys"
+down_revision = "0005_money_decimal"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table("idempotency_keys"):
+        return
+    op.create_table(
+        "idempotency_keys",
+        sa.Column("idempotency_key", sa.String(255), primary_key=True),
+        sa.Column("fingerprint", sa.String(64), nullable=False),
+        sa.Column("status_code", sa.Integer()),
+        sa.Column("headers", sa.Text()),
+        sa.Column("body", sa.LargeBinary().with_variant(mysql.LONGBLOB(), "mysql")),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_idempotency_keys_expires_at", "idempotency_keys", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_table("idempotency_keys")
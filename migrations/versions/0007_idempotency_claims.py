@@ -0,0 +1,33 @@
+"""Add claim_token and applied to idempotency_keys
+
+Revision ID: 0007_idempotency_claims
+Revises: 0006_idempotency_keys
+Create Date: 2026-10-18 00:00:00
+
+`claim_token` identifies the request owning a pending key, so only that
+request can complete or release it. `applied` is set in the transaction that
+commits the request's command, so an abandoned claim is only taken over when
+nothing was committed for it.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0007_idempotency_claims"
+down_revision = "0006_idempotency_keys"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    columns = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("idempotency_keys")}
+    if "claim_token" not in columns:
+        op.add_column("idempotency_keys", sa.Column("claim_token", sa.String(32)))
+    if "applied" not in columns:
+        op.add_column("idempotency_keys", sa.Column("applied", sa.Boolean(), nullable=False, server_default="0"))
+
+
+def downgrade() -> None:
+    op.drop_column("idempotency_keys", "applied")
+    op.drop_column("idempotency_keys", "claim_token")
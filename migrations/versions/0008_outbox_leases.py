@@ -0,0 +1,42 @@
+"""Add claim leases and sent_at to outbox_events
+
+Revision ID: 0008_outbox_leases
+Revises: 0007_idempotency_claims
+Create Date: 2026-10-18 00:00:00
+
+The relay claims rows with `claim_token` / `claimed_until` and commits before
+publishing, then sets `sent_at`; sent rows are purged after the retention
+period. `outbox_events` is created by `init_db()`, so a missing table is left
+to it.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0008_outbox_leases"
+down_revision = "0007_idempotency_claims"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("outbox_events"):
+        return
+    columns = {column["name"] for column in inspector.get_columns("outbox_events")}
+    if "claim_token" not in columns:
+        op.add_column("outbox_events", sa.Column("claim_token", sa.String(32)))
+    if "claimed_until" not in columns:
+        op.add_column("outbox_events", sa.Column("claimed_until", sa.DateTime()))
+    if "sent_at" not in columns:
+        op.add_column("outbox_events", sa.Column("sent_at", sa.DateTime()))
+    if "ix_outbox_events_sent_at_id" not in {index["name"] for index in inspector.get_indexes("outbox_events")}:
+        op.create_index("ix_outbox_events_sent_at_id", "outbox_events", ["sent_at", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_outbox_events_sent_at_id", table_name="outbox_events")
+    op.drop_column("outbox_events", "sent_at")
+    op.drop_column("outbox_events", "claimed_until")
+    op.drop_column("outbox_events", "claim_token")
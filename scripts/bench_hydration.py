@@ -0,0 +1,71 @@
+"""Micro-benchmark: per-invoice hydration cost and memory per value object.
+
+Compares the validating constructors with the trusted `from_row` path the
+repository uses for rows from our own database. No database is needed.
+
+    python scripts/bench_hydration.py [invoices] [items per invoice]
+"""
+import os
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from src.Domain.Invoice.Invoice import Invoice
+from src.Domain.Shared.ValueObject.Money import Money
+from src.Domain.ValueObject.InvoiceId import InvoiceId
+from src.Domain.ValueObject.InvoiceItem import InvoiceItem
+from src.Domain.ValueObject.InvoiceNumber import InvoiceNumber
+from src.Domain.ValueObject.InvoiceStatus import InvoiceStatus
+
+
+def _rows(count, lines):
+    now = datetime(2024, 1, 1)
+    items = [(f"P{i}", "Item", 2, 1.25) for i in range(lines)]
+    return [(str(uuid.uuid4()), "ACME", 2.5 * lines, "issued", f"INV-{n}", now, 1, items) for n in range(count)]
+
+
+def validated(row):
+    id_, customer, amount, status, number, created_at, version, items = row
+    lines = [InvoiceItem(product_id=p, description=d, quantity=q, unit_price=Money(u)) for p, d, q, u in items]
+    invoice = Invoice(id=InvoiceId(id_), customer=customer, amount=Money(amount), status=InvoiceStatus(status), invoiceNumber=InvoiceNumber(number), items=lines)
+    invoice.created_at = created_at
+    invoice.version = version
+    return invoice
+
+
+def trusted(row):
+    id_, customer, amount, status, number, created_at, version, items = row
+    lines = [InvoiceItem.from_row(p, d, q, Money.from_stored(u)) for p, d, q, u in items]
+    return Invoice.from_row(id=id_, customer=customer, amount=amount, status=status, invoice_number=number, created_at=created_at, version=version, items=lines)
+
+
+def _measure(build, rows):
+    start = time.perf_counter()
+    for row in rows:
+        build(row)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    kept = [build(row) for row in rows]
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return elapsed / len(rows) * 1e6, memory / len(rows)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    lines = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    rows = _rows(count, lines)
+    for name, build in (("validated", validated), ("from_row", trusted)):
+        micros, size = _measure(build, rows)
+        print(f"{name:>9}: {micros:7.2f} us/invoice  {size:8.0f} B/invoice  ({lines} items)")
+
+
+if __name__ == "__main__":
+    main()
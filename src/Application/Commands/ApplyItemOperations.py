@@ -0,0 +1,34 @@
+from src.Domain.ValueObject.ItemOperation import ItemOperation
+from src.Application.Ports.Repositories import InvoiceRepositoryPort
+from src.Application.Ports.Events import EventPublisherPort
+from src.Application.Commands.Retry import retryOnConflict
+from src.Application.Commands.Precondition import ExpectedVersion, requireVersion
+from src.Application.Ports.UnitOfWork import UnitOfWork
+from typing import Dict, List, Optional, Sequence
+from src.Domain.Invoice.Invoice import Invoice
+
+
+async def applyInvoiceItemOperationsHandler(invoice_id: str, operations: Sequence[ItemOperation], repo: Optional[InvoiceRepositoryPort] = None, publisher: Optional[EventPublisherPort] = None, uow: Optional[UnitOfWork] = None, expected_version: ExpectedVersion = None) -> Invoice:
+    """Apply a batch of item operations in one transaction and one event."""
+    if uow is not None:
+        # read and write inside the unit's transaction
+        repo = uow.invoices
+    if repo is None:
+        raise RuntimeError("Repository dependency not provided")
+    changed: Dict[str, List[str]] = {"added": [], "updated": [], "removed": []}
+    for operation in operations:
+        changed[{"add": "added", "update": "updated", "remove": "removed"}[operation.op]].append(operation.product_id)
+
+    def record(invoice: Invoice) -> None:
+        invoice.record_event("invoice.items.changed", {"invoice_id": str(invoice.id.value), **changed, "items_count": len(invoice.items), "amount": invoice.amount.value})
+
+    async def apply() -> Invoice:
+        await requireVersion(repo, invoice_id, expected_version)
+        return await repo.apply_item_operations(invoice_id, operations, on_change=record)
+
+    updated = await retryOnConflict(apply, uow=uow)
+    if publisher is not None:
+        # events still pending were not taken over by a transactional outbox
+        for routing_key, payload in updated.pull_events():
+            await publisher.publish(routing_key, payload)
+    return updated
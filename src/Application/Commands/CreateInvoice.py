@@ -16,9 +16,11 @@ async def createInvoiceHandler(customer: str, invoice_number: str, amount: Optio
     id_vo = InvoiceId(uuid4())
     invoice_number_vo = InvoiceNumber(invoice_number)
     invoice = Invoice(id=id_vo, customer=customer, amount=amount_vo, invoiceNumber=invoice_number_vo)
+    invoice.record_event("invoice.created", {"invoice_id": str(id_vo.value), "customer": invoice.customer, "amount": invoice.amount.value, "status": invoice.status.value, "invoiceNumber": invoice.invoiceNumber.value})
     created = await repo.save(invoice)
     if publisher is None:
         raise RuntimeError("Event publisher dependency not provided")
-    invoice_id_value = created.id.value
-    await publisher.publish("invoice.created", {"invoice_id": str(invoice_id_value), "customer": created.customer, "amount": created.amount.value, "status": created.status.value, "invoiceNumber": created.invoiceNumber.value})
+    # events still pending were not taken over by a transactional outbox
+    for routing_key, payload in invoice.pull_events():
+        await publisher.publish(routing_key, payload)
     return created
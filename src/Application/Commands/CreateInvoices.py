@@ -0,0 +1,65 @@
+from src.Domain.Invoice.Invoice import Invoice
+from src.Domain.Shared.ValueObject.Money import Money
+from src.Domain.ValueObject.InvoiceId import InvoiceId
+from src.Domain.ValueObject.InvoiceItem import InvoiceItem
+from src.Domain.ValueObject.InvoiceNumber import InvoiceNumber
+from src.Application.Ports.Repositories import InvoiceRepositoryPort
+from src.Application.Ports.Events import EventPublisherPort, DomainEvent
+from typing import Any, List, Mapping, Optional, Sequence, Tuple
+from uuid import uuid4
+
+# (created invoice, None) or (None, reason the entry was rejected)
+CreateResult = Tuple[Optional[Invoice], Optional[str]]
+
+
+def _build(entry: Mapping[str, Any]) -> Invoice:
+    invoice = Invoice(id=InvoiceId(uuid4()), customer=entry["customer"], amount=Money(0.0), invoiceNumber=InvoiceNumber(entry["invoiceNumber"]))
+    for data in entry.get("items") or []:
+        # add_item enforces the per-invoice product uniqueness
+        invoice.add_item(InvoiceItem.from_primitive(data))
+    invoice.record_event("invoice.created", {"invoice_id": str(invoice.id.value), "customer": invoice.customer, "amount": invoice.amount.value, "status": invoice.status.value, "invoiceNumber": invoice.invoiceNumber.value})
+    return invoice
+
+
+async def createInvoicesHandler(entries: Sequence[Mapping[str, Any]], repo: Optional[InvoiceRepositoryPort] = None, publisher: Optional[EventPublisherPort] = None) -> List[CreateResult]:
+    """Create many draft invoices at once.
+
+    Each entry has `customer`, `invoiceNumber` and optional camelCase `items`.
+    Invalid entries and duplicate invoice numbers are reported per entry in
+    the result, in input order; the remaining invoices are still created.
+    """
+    if repo is None:
+        raise RuntimeError("Repository dependency not provided")
+    results: List[CreateResult] = []
+    valid: List[Invoice] = []
+    seen: set[str] = set()
+    for entry in entries:
+        try:
+            invoice = _build(entry)
+        except (KeyError, TypeError, ValueError) as exc:
+            results.append((None, str(exc)))
+            continue
+        number = invoice.invoiceNumber.value
+        if number in seen:
+            results.append((None, f"Invoice number '{number}' is repeated in the batch"))
+            continue
+        seen.add(number)
+        results.append((invoice, None))
+        valid.append(invoice)
+    errors = iter(await repo.save_many(valid))
+    for idx, (created, _) in enumerate(results):
+        if created is None:
+            continue
+        error = next(errors)
+        if error is not None:
+            results[idx] = (None, error)
+    if publisher is None:
+        raise RuntimeError("Event publisher dependency not provided")
+    # events still pending were not taken over by a transactional outbox
+    events: List[DomainEvent] = []
+    for created, _ in results:
+        if created is not None:
+            events.extend(created.pull_events())
+    if events:
+        await publisher.publish_batch(events)
+    return results
@@ -1,17 +1,28 @@
-from src.Application.Ports.Repositories import InvoiceRepositoryPort
+from src.Application.Ports.Repositories import InvoiceRepositoryPort, ItemChange
 from src.Application.Ports.Events import EventPublisherPort
+from src.Application.Commands.Retry import retryOnConflict
+from src.Application.Commands.Precondition import ExpectedVersion, requireVersion
+from src.Application.Ports.UnitOfWork import UnitOfWork
 from typing import Optional
-from src.Domain.Invoice.Invoice import Invoice
 
 
-async def deleteInvoiceItemHandler(invoice_id: str, product_id: str, repo: Optional[InvoiceRepositoryPort] = None, publisher: Optional[EventPublisherPort] = None) -> Invoice:
+async def deleteInvoiceItemHandler(invoice_id: str, product_id: str, repo: Optional[InvoiceRepositoryPort] = None, publisher: Optional[EventPublisherPort] = None, uow: Optional[UnitOfWork] = None, expected_version: ExpectedVersion = None) -> ItemChange:
+    if uow is not None:
+        # read and write inside the unit's transaction
+        repo = uow.invoices
     if repo is None:
         raise RuntimeError("Repository dependency not provided")
-    invoice = await repo.get(invoice_id)
-    if invoice is None:
-        raise ValueError("Invoice not found")
-    invoice.remove_item(product_id)
-    updated = await repo.save(invoice)
+
+    def record(change: ItemChange) -> None:
+        change.record_event("invoice.item.removed", {"invoice_id": change.invoice_id, "product_id": product_id, "items_count": change.items_count})
+
+    async def apply() -> ItemChange:
+        await requireVersion(repo, invoice_id, expected_version)
+        return await repo.remove_item(invoice_id, product_id, on_change=record)
+
+    updated = await retryOnConflict(apply, uow=uow)
     if publisher is not None:
-        await publisher.publish("invoice.item.removed", {"invoice_id": str(updated.id.value), "product_id": product_id, "items_count": len(updated.items)})
+        # events still pending were not taken over by a transactional outbox
+        for routing_key, payload in updated.pull_events():
+            await publisher.publish(routing_key, payload)
     return updated
@@ -1,18 +1,33 @@
 from src.Application.Ports.Repositories import InvoiceRepositoryPort
 from src.Application.Ports.Events import EventPublisherPort
+from src.Application.Commands.Retry import retryOnConflict
+from src.Application.Commands.Precondition import ExpectedVersion, checkVersion
+from src.Application.Ports.UnitOfWork import UnitOfWork
 from typing import Optional
 from src.Domain.Invoice.Invoice import Invoice
 
 
-async def payInvoiceHandler(invoice_id: str, repo: Optional[InvoiceRepositoryPort] = None, publisher: Optional[EventPublisherPort] = None) -> Invoice:
+async def payInvoiceHandler(invoice_id: str, repo: Optional[InvoiceRepositoryPort] = None, publisher: Optional[EventPublisherPort] = None, uow: Optional[UnitOfWork] = None, expected_version: ExpectedVersion = None) -> Invoice:
+    if uow is not None:
+        # read and write inside the unit's transaction
+        repo = uow.invoices
     if repo is None:
         raise RuntimeError("Repository dependency not provided")
-    invoice = await repo.get(invoice_id)
-    if invoice is None:
-        raise ValueError("Invoice not found")
-    invoice.pay()
-    updated = await repo.save(invoice)
+
+    async def apply() -> Invoice:
+        # re-run from a fresh read when a concurrent write wins the race
+        invoice = await repo.get(invoice_id)
+        if invoice is None:
+            raise ValueError("Invoice not found")
+        checkVersion(invoice, expected_version)
+        invoice.pay()
+        invoice.record_event("invoice.paid", {"invoice_id": str(invoice.id.value), "status": invoice.status.value})
+        return await repo.save(invoice)
+
+    updated = await retryOnConflict(apply, uow=uow)
     if publisher is None:
         raise RuntimeError("Event publisher dependency not provided")
-    await publisher.publish("invoice.paid", {"invoice_id": str(updated.id.value), "status": updated.status.value})
+    # events still pending were not taken over by a transactional outbox
+    for routing_key, payload in updated.pull_events():
+        await publisher.publish(routing_key, payload)
     return updated
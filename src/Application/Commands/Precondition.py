@@ -0,0 +1,39 @@
+from typing import Collection, Optional, Union
+from src.Application.Ports.Repositories import InvoiceRepositoryPort, PreconditionFailed
+from src.Domain.Invoice.Invoice import Invoice
+
+# the version a command is conditional on, or any of several (an `If-Match`
+# listing more than one ETag); None when unconditional
+ExpectedVersion = Optional[Union[int, Collection[int]]]
+
+
+def _matches(version: int, expected_version: Union[int, Collection[int]]) -> bool:
+    return version == expected_version if isinstance(expected_version, int) else version in expected_version
+
+
+def _describe(expected_version: Union[int, Collection[int]]) -> str:
+    if isinstance(expected_version, int):
+        return str(expected_version)
+    return " or ".join(str(v) for v in sorted(expected_version))
+
+
+async def requireVersion(repo: InvoiceRepositoryPort, invoice_id: str, expected_version: ExpectedVersion) -> None:
+    """Raise PreconditionFailed unless the invoice is at `expected_version`.
+
+    Call it at the start of a command attempt: the version row is locked for
+    the rest of the unit of work's transaction.
+    """
+    if expected_version is None:
+        return
+    version = await repo.get_version(invoice_id, lock=True)
+    if version is None:
+        raise ValueError("Invoice not found")
+    if not _matches(version, expected_version):
+        raise PreconditionFailed(f"Invoice {invoice_id} is at version {version}, not {_describe(expected_version)}")
+
+
+def checkVersion(invoice: Invoice, expected_version: ExpectedVersion) -> None:
+    """`requireVersion` for an aggregate already loaded in the attempt; the
+    version compare-and-swap of the save keeps it from changing meanwhile."""
+    if expected_version is not None and not _matches(invoice.version, expected_version):
+        raise PreconditionFailed(f"Invoice {invoice.id} is at version {invoice.version}, not {_describe(expected_version)}")
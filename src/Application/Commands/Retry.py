@@ -0,0 +1,36 @@
+import os
+from typing import Awaitable, Callable, Optional, TypeVar
+from src.Application.Ports.Repositories import ConcurrencyConflict
+from src.Application.Ports.UnitOfWork import UnitOfWork
+
+T = TypeVar("T")
+
+# how many times a command is re-run (re-loading the invoice) after losing an
+# optimistic concurrency race; 0 surfaces the first conflict to the caller
+CONFLICT_RETRIES = int(os.getenv("COMMAND_CONFLICT_RETRIES", "3"))
+
+
+async def retryOnConflict(operation: Callable[[], Awaitable[T]], retries: int = CONFLICT_RETRIES, uow: Optional[UnitOfWork] = None) -> T:
+    """Run `operation`, re-running it after a ConcurrencyConflict.
+
+    With a unit of work each attempt is one transaction: committed when
+    `operation` returns, rolled back when it raises so a retry reads fresh
+    rows instead of the failed attempt's snapshot.
+    """
+    attempt = 0
+    while True:
+        try:
+            result = await operation()
+            if uow is not None:
+                await uow.commit()
+            return result
+        except ConcurrencyConflict:
+            if uow is not None:
+                await uow.rollback()
+            attempt += 1
+            if attempt > retries:
+                raise
+        except BaseException:
+            if uow is not None:
+                await uow.rollback()
+            raise
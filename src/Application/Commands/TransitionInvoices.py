@@ -0,0 +1,49 @@
+from src.Application.Ports.Repositories import InvoiceRepositoryPort
+from src.Application.Ports.Events import EventPublisherPort, DomainEvent
+from typing import Dict, Optional, Sequence
+from datetime import datetime
+from src.Domain.Invoice.Invoice import Invoice
+
+# events are handed to the publisher in slices of this size
+EVENT_BATCH_SIZE = 1000
+
+
+def _event(invoice_id: str, status: str) -> DomainEvent:
+    # same routing keys and payloads as the single-invoice handlers
+    return f"invoice.{status}", {"invoice_id": invoice_id, "status": status}
+
+
+async def transitionInvoicesHandler(
+    action: str,
+    invoice_ids: Optional[Sequence[str]] = None,
+    status: Optional[str] = None,
+    customer: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    limit: Optional[int] = None,
+    repo: Optional[InvoiceRepositoryPort] = None,
+    publisher: Optional[EventPublisherPort] = None,
+) -> Dict[str, Optional[str]]:
+    """Issue, pay or cancel many invoices at once.
+
+    Targets are the given `invoice_ids` or, when None, every invoice matching
+    the filters from which `action` is allowed, oldest first and at most
+    `limit` of them; moved invoices no longer match, so repeating the call
+    moves the next ones. Returns the outcome per id:
+    None when the invoice moved, otherwise the reason it did not.
+    """
+    if repo is None:
+        raise RuntimeError("Repository dependency not provided")
+    if action not in Invoice.TRANSITIONS:
+        raise ValueError(f"Unknown transition '{action}'")
+    if invoice_ids is None:
+        allowed = Invoice.TRANSITIONS[action][0]
+        statuses = [s for s in allowed if status is None or s == status]
+        invoice_ids = await repo.list_ids(statuses, customer=customer, created_from=created_from, created_to=created_to, limit=limit) if statuses else []
+    outcomes, events = await repo.transition_many(action, list(dict.fromkeys(invoice_ids)), _event)
+    if publisher is None:
+        raise RuntimeError("Event publisher dependency not provided")
+    # events still pending were not taken over by a transactional outbox
+    for start in range(0, len(events), EVENT_BATCH_SIZE):
+        await publisher.publish_batch(events[start:start + EVENT_BATCH_SIZE])
+    return outcomes
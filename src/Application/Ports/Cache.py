@@ -0,0 +1,57 @@
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from typing import Any, Hashable, List, Optional, Sequence
+from src.Domain.Invoice.Invoice import Invoice
+
+
+class InvoiceCachePort(ABC):
+    """Read-through cache of invoice aggregates used by the query side.
+
+    Implementations return a fresh aggregate on every hit so callers may
+    mutate it freely. Writes are compare-and-set on the invoice's version: a
+    `set` never replaces a newer entry, nor the marker a write leaves behind.
+    """
+
+    @abstractmethod
+    async def get(self, invoice_id: str) -> Optional[Invoice]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set(self, invoice: Invoice) -> None:
+        """Cache the invoice unless the cache already holds a newer version."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def invalidate(self, invoice_id: str, version: Optional[int] = None) -> None:
+        """Drop the cached invoice.
+
+        With `version`, the invoice's version after the write, older copies
+        are also refused until the entry would have expired, so a read that
+        started before the write cannot put its state back.
+        """
+        raise NotImplementedError
+
+    async def get_many(self, invoice_ids: Sequence[str]) -> List[Optional[Invoice]]:
+        """Cached invoices in `invoice_ids` order (None for misses).
+
+        Default implementation calls `get` per id; remote caches fetch them in
+        one round trip.
+        """
+        return [await self.get(invoice_id) for invoice_id in invoice_ids]
+
+    async def set_many(self, invoices: Sequence[Invoice]) -> None:
+        """Cache every invoice; default implementation calls `set` per invoice."""
+        for invoice in invoices:
+            await self.set(invoice)
+
+
+class ReportCachePort(ABC):
+    """Short-lived cache of computed report results, keyed by the query."""
+
+    @abstractmethod
+    async def get(self, key: Hashable) -> Optional[Any]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set(self, key: Hashable, value: Any) -> None:
+        raise NotImplementedError
@@ -2,9 +2,17 @@ from __future__ import annotations
 from abc import ABC, abstractmethod
 from typing import Any
 
+# (routing_key, payload) pair as recorded by handlers and stored in the outbox
+DomainEvent = tuple[str, dict[str, Any]]
+
 
 class EventPublisherPort(ABC):
     @abstractmethod
     async def publish(self, routing_key: str, payload: dict[str, Any]) -> None:
         raise NotImplementedError
 
+    async def publish_batch(self, events: list[DomainEvent]) -> None:
+        """Publish several events; implementations may pipeline them."""
+        for routing_key, payload in events:
+            await self.publish(routing_key, payload)
+
@@ -1,18 +1,219 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import Optional
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
 from src.Domain.Invoice.Invoice import Invoice
+from src.Domain.Shared.ValueObject.Money import Money
+from src.Domain.ValueObject.InvoiceItem import InvoiceItem
+from src.Domain.ValueObject.ItemOperation import ItemOperation
+from src.Application.Ports.Events import DomainEvent
+
+class ConcurrencyConflict(Exception):
+    """The invoice was changed by someone else since it was loaded."""
+
+
+class PreconditionFailed(Exception):
+    """The invoice is not at the version the caller expected (If-Match)."""
+
+
+# Builds the event recorded for an invoice moved by a bulk transition, from its
+# id and new status.
+TransitionEvent = Callable[[str, str], DomainEvent]
+
+# Called with the updated aggregate before an item change is committed, so
+# handlers can record events that are persisted in the same transaction.
+OnChange = Optional[Callable[[Invoice], None]]
+
+
+@dataclass
+class ItemChange:
+    """Outcome of a single item edit: the invoice's new version and totals.
+
+    Returned instead of the aggregate so storage adapters can apply an item
+    edit without reloading the invoice's lines. Events are recorded on it
+    like on an `Invoice`.
+    """
+    invoice_id: str
+    version: int
+    amount: Money
+    items_count: int
+    pending_events: List[DomainEvent] = field(default_factory=list, repr=False, compare=False)
+
+    @classmethod
+    def of(cls, invoice: Invoice) -> "ItemChange":
+        return cls(str(invoice.id), invoice.version, invoice.amount, len(invoice.items))
+
+    def record_event(self, routing_key: str, payload: Dict[str, Any]) -> None:
+        self.pending_events.append((routing_key, payload))
+
+    def pull_events(self) -> List[DomainEvent]:
+        events, self.pending_events = self.pending_events, []
+        return events
+
+
+def invoice_summary(invoice: Invoice) -> Dict[str, Any]:
+    """The `get_summary` row of an aggregate."""
+    return {
+        "id": str(invoice.id),
+        "customer": invoice.customer,
+        "amount": invoice.amount.value,
+        "status": invoice.status.value,
+        "invoice_number": invoice.invoiceNumber.value,
+        "item_count": len(invoice.items),
+        "created_at": invoice.created_at,
+        "version": invoice.version,
+    }
+
+
+# Like OnChange, for the single item edits.
+OnItemChange = Optional[Callable[[ItemChange], None]]
 
 
 class InvoiceRepositoryPort(ABC):
+    # True when reads may lag committed writes (a read replica); what such a
+    # read returns must not be put into caches shared with other readers
+    stale_reads: bool = False
+
     @abstractmethod
-    async def save(self, invoice: Invoice) -> Invoice:
+    async def save(self, invoice: Invoice, reload: bool = False) -> Invoice:
+        """Persist the aggregate and return it.
+
+        Implementations may return the given aggregate itself; pass
+        `reload=True` to get a copy re-read from storage (server defaults
+        such as `created_at` filled in).
+        """
         raise NotImplementedError
 
     @abstractmethod
     async def get(self, invoice_id: str) -> Optional[Invoice]:
         raise NotImplementedError
 
+    async def get_many(self, invoice_ids: Sequence[str]) -> List[Optional[Invoice]]:
+        """Load several invoices; one entry per id in request order, None when missing.
+
+        The default loads them one by one.
+        """
+        return [await self.get(invoice_id) for invoice_id in invoice_ids]
+
+    async def get_summary(self, invoice_id: str) -> Optional[Mapping[str, Any]]:
+        """One invoice's summary row (keys as in `iter_summaries`, plus
+        `version`) without its items, or None when it does not exist.
+
+        The default builds it from the aggregate.
+        """
+        invoice = await self.get(invoice_id)
+        return invoice_summary(invoice) if invoice is not None else None
+
+    async def get_version(self, invoice_id: str, lock: bool = False) -> Optional[int]:
+        """Current version of the invoice, or None when it does not exist.
+
+        With `lock` the row stays locked until the caller's transaction ends,
+        so the version cannot change before the caller's write. The default
+        loads the aggregate and ignores `lock`.
+        """
+        invoice = await self.get(invoice_id)
+        return invoice.version if invoice is not None else None
+
+    async def save_many(self, invoices: Sequence[Invoice]) -> List[Optional[str]]:
+        """Insert new invoices in bulk.
+
+        Returns one entry per invoice: None when it was stored, otherwise the
+        reason it was rejected (e.g. a duplicate invoice number); the other
+        invoices are stored regardless. The default saves them one by one.
+        """
+        errors: List[Optional[str]] = []
+        for invoice in invoices:
+            try:
+                await self.save(invoice)
+                errors.append(None)
+            except ValueError as exc:
+                errors.append(str(exc))
+        return errors
+
+    async def transition_many(self, action: str, invoice_ids: Sequence[str], event: TransitionEvent) -> Tuple[Dict[str, Optional[str]], List[DomainEvent]]:
+        """Apply the `Invoice.TRANSITIONS` action to many invoices.
+
+        Returns the outcome per id (None when moved, otherwise why not) and
+        the recorded events the storage did not take over for publishing.
+        The default loads and saves the invoices one by one.
+        """
+        outcomes: Dict[str, Optional[str]] = {}
+        events: List[DomainEvent] = []
+        for invoice_id in invoice_ids:
+            try:
+                invoice = await self.get(invoice_id)
+                if invoice is None:
+                    raise ValueError("Invoice not found")
+                getattr(invoice, action)()
+                invoice.record_event(*event(invoice_id, invoice.status.value))
+                saved = await self.save(invoice)
+            except (ValueError, ConcurrencyConflict) as exc:
+                outcomes[invoice_id] = str(exc)
+                continue
+            outcomes[invoice_id] = None
+            events.extend(saved.pull_events())
+        return outcomes, events
+
+    async def list_ids(
+        self,
+        statuses: Sequence[str],
+        customer: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        limit: Optional[int] = None,
+    ) -> List[str]:
+        """Return the ids of the invoices in `statuses` matching the filters,
+        oldest first and at most `limit` of them.
+
+        Default implementation raises NotImplementedError.
+        """
+        raise NotImplementedError
+
+    # Item changes. The defaults load the aggregate, apply the domain method and
+    # save it; storage adapters override them with single-transaction statements.
+
+    async def add_item(self, invoice_id: str, item: InvoiceItem, on_change: OnItemChange = None) -> ItemChange:
+        invoice = await self._load_for_item_change(invoice_id)
+        invoice.add_item(item)
+        return await self._save_item_change(invoice, on_change)
+
+    async def update_item_quantity(self, invoice_id: str, product_id: str, quantity: int, on_change: OnItemChange = None) -> ItemChange:
+        invoice = await self._load_for_item_change(invoice_id)
+        invoice.update_item_quantity(product_id, quantity)
+        return await self._save_item_change(invoice, on_change)
+
+    async def remove_item(self, invoice_id: str, product_id: str, on_change: OnItemChange = None) -> ItemChange:
+        invoice = await self._load_for_item_change(invoice_id)
+        invoice.remove_item(product_id)
+        return await self._save_item_change(invoice, on_change)
+
+    async def _load_for_item_change(self, invoice_id: str) -> Invoice:
+        invoice = await self.get(invoice_id)
+        if invoice is None:
+            raise ValueError("Invoice not found")
+        return invoice
+
+    async def _save_item_change(self, invoice: Invoice, on_change: OnItemChange) -> ItemChange:
+        change = ItemChange.of(invoice)
+        if on_change is not None:
+            on_change(change)
+        invoice.pending_events.extend(change.pull_events())
+        saved = await self.save(invoice)
+        result = ItemChange.of(saved)
+        # events not taken over by a transactional outbox stay with the result
+        result.pending_events = saved.pull_events()
+        return result
+
+    async def apply_item_operations(self, invoice_id: str, operations: Sequence[ItemOperation], on_change: OnChange = None) -> Invoice:
+        invoice = await self.get(invoice_id)
+        if invoice is None:
+            raise ValueError("Invoice not found")
+        invoice.apply_item_operations(operations)
+        if on_change is not None:
+            on_change(invoice)
+        return await self.save(invoice)
+
     async def list_all(self) -> list[Invoice]:
         """Return all invoices.
 
@@ -21,3 +222,75 @@ class InvoiceRepositoryPort(ABC):
         """
         raise NotImplementedError
 
+    def iter_page(
+        self,
+        limit: int,
+        after: Optional[Tuple[datetime, str]] = None,
+        status: Optional[str] = None,
+        customer: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ) -> AsyncIterator[Invoice]:
+        """Stream up to `limit` invoices, newest first.
+
+        `after` is the `(created_at, id)` keyset of the last invoice of the
+        previous page; filters are applied by the storage layer. Default
+        implementation raises NotImplementedError.
+        """
+        raise NotImplementedError
+
+    def iter_summaries(
+        self,
+        limit: int,
+        after: Optional[Tuple[datetime, str]] = None,
+        status: Optional[str] = None,
+        customer: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ) -> AsyncIterator[Mapping[str, Any]]:
+        """Stream up to `limit` invoice summary rows, newest first.
+
+        Rows come from the denormalized read model (id, customer, status,
+        amount, item_count, invoice_number, created_at, updated_at); paging
+        and filters work as in `iter_page`. Default implementation raises
+        NotImplementedError.
+        """
+        raise NotImplementedError
+
+    async def summary_items(self, invoice_ids: Sequence[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """The camelCase item dicts of each invoice in `invoice_ids`, in line
+        order; invoices without lines are absent. Default implementation
+        raises NotImplementedError.
+        """
+        raise NotImplementedError
+
+    async def report_totals(
+        self,
+        group_by: Sequence[str],
+        period: str = "month",
+        status: Optional[str] = None,
+        customer: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ) -> List[Mapping[str, Any]]:
+        """Invoice count and amount per group, aggregated by the storage.
+
+        `group_by` names any of "customer", "status" and "period" (the
+        creation `day`, `month` or `year`). Default implementation raises
+        NotImplementedError.
+        """
+        raise NotImplementedError
+
+    def iter_export_rows(
+        self,
+        status: Optional[str] = None,
+        customer: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ) -> AsyncIterator[Mapping[str, Any]]:
+        """Stream raw invoice rows (column name -> value) for bulk export.
+
+        Rows are not turned into `Invoice` aggregates. Default implementation
+        raises NotImplementedError.
+        """
+        raise NotImplementedError
@@ -0,0 +1,22 @@
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from src.Application.Ports.Repositories import InvoiceRepositoryPort
+
+
+class UnitOfWork(ABC):
+    """One connection and one transaction shared by the steps of a command.
+
+    `invoices` reads and writes inside the transaction; nothing is persisted
+    until `commit()`. After `rollback()` the unit can be used again, e.g. to
+    retry the command from a fresh read.
+    """
+
+    invoices: InvoiceRepositoryPort
+
+    @abstractmethod
+    async def commit(self) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def rollback(self) -> None:
+        raise NotImplementedError
@@ -1,9 +1,70 @@
-from src.Application.Ports.Repositories import InvoiceRepositoryPort
-from typing import Optional
+from src.Application.Ports.Repositories import InvoiceRepositoryPort, invoice_summary
+from src.Application.Ports.Cache import InvoiceCachePort
+from typing import Any, Dict, List, Mapping, Optional, Sequence
 from src.Domain.Invoice.Invoice import Invoice
 
 
-async def getInvoiceHandler(invoice_id: str, repo: Optional[InvoiceRepositoryPort] = None) -> Invoice | None:
+async def getInvoiceHandler(invoice_id: str, repo: Optional[InvoiceRepositoryPort] = None, cache: Optional[InvoiceCachePort] = None) -> Invoice | None:
     if repo is None:
         raise RuntimeError("Repository dependency not provided")
-    return await repo.get(invoice_id)
+    if cache is None:
+        return await repo.get(invoice_id)
+    # read-through: writers replace or invalidate the entry after they
+    # commit, and a fill never replaces a newer version
+    invoice = await cache.get(invoice_id)
+    if invoice is not None:
+        return invoice
+    invoice = await repo.get(invoice_id)
+    # a lagging replica may return the state from before a write whose
+    # invalidation already happened; only primary reads fill the cache
+    if invoice is not None and not repo.stale_reads:
+        await cache.set(invoice)
+    return invoice
+
+
+async def getInvoiceSummaryHandler(invoice_id: str, repo: Optional[InvoiceRepositoryPort] = None, cache: Optional[InvoiceCachePort] = None) -> Optional[Mapping[str, Any]]:
+    """The invoice's summary row without its items (None if missing): a cached
+    aggregate when there is one, otherwise a single-row read."""
+    if repo is None:
+        raise RuntimeError("Repository dependency not provided")
+    if cache is not None:
+        cached = await cache.get(invoice_id)
+        if cached is not None:
+            return invoice_summary(cached)
+    return await repo.get_summary(invoice_id)
+
+
+async def getInvoicesHandler(invoice_ids: Sequence[str], repo: Optional[InvoiceRepositoryPort] = None, cache: Optional[InvoiceCachePort] = None) -> List[Optional[Invoice]]:
+    """Invoices in request order (None when missing); the cache is read in one
+    batch and its misses are loaded (and cached) in one batch."""
+    if repo is None:
+        raise RuntimeError("Repository dependency not provided")
+    unique = list(dict.fromkeys(invoice_ids))
+    found: Dict[str, Invoice] = {}
+    if cache is not None:
+        for invoice_id, cached in zip(unique, await cache.get_many(unique)):
+            if cached is not None:
+                found[invoice_id] = cached
+    missing = [invoice_id for invoice_id in unique if invoice_id not in found]
+    if missing:
+        loaded: List[Invoice] = []
+        for invoice_id, invoice in zip(missing, await repo.get_many(missing)):
+            if invoice is not None:
+                found[invoice_id] = invoice
+                loaded.append(invoice)
+        # as in getInvoiceHandler, only primary reads fill the cache
+        if cache is not None and loaded and not repo.stale_reads:
+            await cache.set_many(loaded)
+    return [found.get(invoice_id) for invoice_id in invoice_ids]
+
+
+async def getInvoiceVersionHandler(invoice_id: str, repo: Optional[InvoiceRepositoryPort] = None) -> Optional[int]:
+    """Version of the invoice without building the aggregate (None if missing).
+
+    Always read from the repository, never from the cache: another process's
+    cached copy may be older than a write it was not told about, which would
+    turn into a false 304.
+    """
+    if repo is None:
+        raise RuntimeError("Repository dependency not provided")
+    return await repo.get_version(invoice_id)
@@ -0,0 +1,38 @@
+from src.Application.Ports.Repositories import InvoiceRepositoryPort
+from src.Application.Ports.Cache import ReportCachePort
+from typing import Any, List, Mapping, Optional, Sequence
+from datetime import datetime
+
+GROUP_BY_FIELDS = ("customer", "status", "period")
+PERIODS = ("day", "month", "year")
+
+
+async def getTotalsHandler(
+    group_by: Sequence[str],
+    period: str = "month",
+    status: Optional[str] = None,
+    customer: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    repo: Optional[InvoiceRepositoryPort] = None,
+    cache: Optional[ReportCachePort] = None,
+) -> List[Mapping[str, Any]]:
+    """Invoice count and amount grouped by customer, status and/or period."""
+    if repo is None:
+        raise RuntimeError("Repository dependency not provided")
+    unknown = [field for field in group_by if field not in GROUP_BY_FIELDS]
+    if unknown:
+        raise ValueError(f"Cannot group by {', '.join(unknown)}")
+    if period not in PERIODS:
+        raise ValueError(f"Unknown period '{period}'")
+    # canonical order so equivalent queries share a cache entry
+    fields = [field for field in GROUP_BY_FIELDS if field in group_by]
+    key = (tuple(fields), period, status, customer, created_from, created_to)
+    if cache is not None:
+        cached = await cache.get(key)
+        if cached is not None:
+            return cached
+    totals = await repo.report_totals(fields, period=period, status=status, customer=customer, created_from=created_from, created_to=created_to)
+    if cache is not None:
+        await cache.set(key, totals)
+    return totals
@@ -1,11 +1,13 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
 from datetime import datetime
+from typing import Any, ClassVar, Optional, Sequence
 from src.Domain.Shared.ValueObject.Money import Money
 from src.Domain.ValueObject.InvoiceStatus import InvoiceStatus
 from src.Domain.ValueObject.InvoiceId import InvoiceId
 from src.Domain.ValueObject.InvoiceNumber import InvoiceNumber
 from src.Domain.ValueObject.InvoiceItem import InvoiceItem
+from src.Domain.ValueObject.ItemOperation import ItemOperation
 # InvoiceItem is used via forward-references in annotations and imported locally where needed.
 
 
@@ -15,53 +17,134 @@ class Invoice:
     customer: str
     amount: Money
     invoiceNumber: InvoiceNumber
-    status: InvoiceStatus = field(default_factory=lambda: InvoiceStatus("draft"))
+    status: InvoiceStatus = InvoiceStatus.DRAFT
     items: list["InvoiceItem"] = field(default_factory=list)
     created_at: datetime = field(default_factory=datetime.utcnow)
+    # optimistic concurrency token; bumped by the repository on every write
+    version: int = field(default=0, compare=False)
+    # set once the invoice exists in storage; the repository then updates it
+    # instead of inserting it
+    persisted: bool = field(default=False, init=False, repr=False, compare=False)
+    # domain events recorded by command handlers and not yet handed over to
+    # the outbox (repository) or a publisher
+    pending_events: list[tuple[str, dict[str, Any]]] = field(default_factory=list, init=False, repr=False, compare=False)
+    # product_id -> position in `items`; keeps item lookups O(1)
+    _positions: dict[str, int] = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    # status transitions: action -> (statuses it is allowed from, resulting status)
+    TRANSITIONS: ClassVar[dict[str, tuple[tuple[str, ...], str]]] = {
+        "issue": (("draft",), "issued"),
+        "pay": (("issued",), "paid"),
+        "cancel": (("draft", "issued"), "cancelled"),
+    }
 
     def __post_init__(self):
         # Type hints enforce value types; runtime checks removed for clarity.
 
+        self._positions = {it.product_id: idx for idx, it in enumerate(self.items)}
         # ensure amount consistency with items when items provided
         if self.items:
-            expected = sum(it.quantity * it.unit_price.value for it in self.items)
-            if abs(self.amount.value - expected) > 0.0001:
-                # if amount differs, set amount to sum of items
-                self.amount = Money(expected)
+            # summed in integer cents, so the total is exact
+            cents = sum(it.quantity * it.unit_price.cents for it in self.items)
+            if cents != self.amount.cents:
+                self.amount = Money.from_cents(cents, self.amount.currency)
+
+    @classmethod
+    def from_row(cls, id: str, customer: str, amount: float, status: str, invoice_number: str, created_at: Optional[datetime], version: int, items: list["InvoiceItem"]) -> "Invoice":
+        """Rebuild a persisted invoice from trusted storage values.
+
+        Skips value-object validation and the amount check of `__init__`: the
+        repository keeps `amount` equal to the items total. The item index is
+        built lazily on the first item lookup.
+        """
+        invoice = object.__new__(cls)
+        invoice.id = InvoiceId.trusted(id)
+        invoice.customer = customer
+        invoice.amount = Money.from_stored(amount)
+        invoice.invoiceNumber = InvoiceNumber.trusted(invoice_number)
+        invoice.status = InvoiceStatus(status)
+        invoice.items = items
+        invoice.created_at = created_at if created_at is not None else datetime.utcnow()
+        invoice.version = version
+        invoice.persisted = True
+        invoice.pending_events = []
+        invoice._positions = {}
+        return invoice
+
+    def _position(self, product_id: str) -> Optional[int]:
+        idx = self._positions.get(product_id)
+        stale = len(self._positions) != len(self.items) or (idx is not None and self.items[idx].product_id != product_id)
+        if stale:
+            # `items` was changed directly; re-index it
+            self._positions = {it.product_id: pos for pos, it in enumerate(self.items)}
+            idx = self._positions.get(product_id)
+        return idx
+
+    def _add_cents(self, cents: int) -> None:
+        # running total: item edits apply their delta instead of re-summing
+        self.amount = Money.from_cents(self.amount.cents + cents, self.amount.currency)
+
+    def record_event(self, routing_key: str, payload: dict[str, Any]) -> None:
+        """Record a domain event to be published once the invoice is persisted."""
+        self.pending_events.append((routing_key, payload))
+
+    def pull_events(self) -> list[tuple[str, dict[str, Any]]]:
+        """Return and clear the recorded domain events."""
+        events, self.pending_events = self.pending_events, []
+        return events
 
     # Domain behavior: status transitions
+    @classmethod
+    def transition_error(cls, action: str, status: str) -> Optional[str]:
+        """Return why `action` is not allowed from `status`, or None if it is."""
+        allowed, target = cls.TRANSITIONS[action]
+        if status in allowed:
+            return None
+        return f"Invoice cannot be {target} from status '{status}'"
+
+    def _transition(self, action: str) -> None:
+        error = self.transition_error(action, self.status.value)
+        if error is not None:
+            raise ValueError(error)
+        self.status = InvoiceStatus(self.TRANSITIONS[action][1])
+
     def issue(self) -> None:
         """Mark the invoice as issued.
 
         Allowed: draft -> issued
         """
-        if self.status.value != "draft":
-            raise ValueError(f"Invoice cannot be issued from status '{self.status.value}'")
-        self.status = InvoiceStatus("issued")
+        self._transition("issue")
 
     def pay(self) -> None:
         """Mark the invoice as paid.
 
         Allowed: issued -> paid
         """
-        if self.status.value != "issued":
-            raise ValueError(f"Invoice cannot be paid from status '{self.status.value}'")
-        self.status = InvoiceStatus("paid")
+        self._transition("pay")
 
     def cancel(self) -> None:
         """Cancel the invoice.
 
         Allowed: draft|issued -> cancelled
         """
-        if self.status.value not in ("draft", "issued"):
-            raise ValueError(f"Invoice cannot be cancelled from status '{self.status.value}'")
-        self.status = InvoiceStatus("cancelled")
+        self._transition("cancel")
 
     def add_item(self, item: "InvoiceItem") -> None:
-        """Add an InvoiceItem to the invoice and update the amount to match items total."""
+        """Add an InvoiceItem to the invoice and update the amount to match items total.
+
+        Allowed only in draft state. A product appears at most once per
+        invoice; change its quantity instead.
+        """
+        if self.status.value != "draft":
+            raise ValueError("Can only add items when invoice is in draft status")
+        if self._position(item.product_id) is not None:
+            raise ValueError(f"Item '{item.product_id}' already exists")
+        if not self.items:
+            # the first line replaces an amount given without items
+            self.amount = Money.from_cents(0, self.amount.currency)
+        self._positions[item.product_id] = len(self.items)
         self.items.append(item)
-        total = sum(it.quantity * it.unit_price.value for it in self.items)
-        self.amount = Money(total)
+        self._add_cents(item.quantity * item.unit_price.cents)
 
     def update_item_quantity(self, product_id: str, quantity: int) -> None:
         """Update the quantity of an existing item. Allowed only in draft state."""
@@ -69,25 +152,50 @@ class Invoice:
             raise ValueError("Can only modify items when invoice is in draft status")
         if quantity <= 0:
             raise ValueError("quantity must be positive")
-        
-        for idx, it in enumerate(self.items):
-            if it.product_id == product_id:
-                # replace item with new quantity
-                new_item = InvoiceItem(product_id=it.product_id, description=it.description, quantity=quantity, unit_price=it.unit_price)
-                self.items[idx] = new_item
-                total = sum(i.quantity * i.unit_price.value for i in self.items)
-                self.amount = Money(total)
-                return
-        raise ValueError("Item not found")
+        idx = self._position(product_id)
+        if idx is None:
+            raise ValueError("Item not found")
+        it = self.items[idx]
+        # replace item with new quantity
+        self.items[idx] = InvoiceItem(product_id=it.product_id, description=it.description, quantity=quantity, unit_price=it.unit_price)
+        self._add_cents((quantity - it.quantity) * it.unit_price.cents)
 
     def remove_item(self, product_id: str) -> None:
-        """Remove an item by product_id. Allowed only in draft state."""
+        """Remove an item by product_id. Allowed only in draft state.
+
+        The lookup is O(1), the removal O(n): lines keep their order (it is
+        the stored `position` order every read returns), so the lines after
+        the removed one move up and are re-indexed.
+        """
         if self.status.value != "draft":
             raise ValueError("Can only remove items when invoice is in draft status")
-        for idx, it in enumerate(self.items):
-            if it.product_id == product_id:
-                self.items.pop(idx)
-                total = sum(i.quantity * i.unit_price.value for i in self.items)
-                self.amount = Money(total)
-                return
-        raise ValueError("Item not found")
+        idx = self._position(product_id)
+        if idx is None:
+            raise ValueError("Item not found")
+        it = self.items.pop(idx)
+        del self._positions[product_id]
+        # no swap-with-last: that would reorder the invoice's lines
+        for later in range(idx, len(self.items)):
+            self._positions[self.items[later].product_id] = later
+        self._add_cents(-it.quantity * it.unit_price.cents)
+
+    def apply_item_operations(self, operations: Sequence[ItemOperation]) -> None:
+        """Apply add/update/remove operations in order, all or nothing.
+
+        Allowed only in draft state. When an operation fails the invoice is
+        left unchanged and the ValueError names the failing operation.
+        """
+        if self.status.value != "draft":
+            raise ValueError("Can only modify items when invoice is in draft status")
+        items, amount, positions = list(self.items), self.amount, dict(self._positions)
+        for index, operation in enumerate(operations):
+            try:
+                if operation.op == "add":
+                    self.add_item(operation.item)  # type: ignore[arg-type]
+                elif operation.op == "update":
+                    self.update_item_quantity(operation.product_id, operation.quantity)  # type: ignore[arg-type]
+                else:
+                    self.remove_item(operation.product_id)
+            except ValueError as e:
+                self.items, self.amount, self._positions = items, amount, positions
+                raise ValueError(f"Operation {index} ({operation.op} '{operation.product_id}'): {e}")
@@ -1,15 +1,79 @@
 from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from typing import Union
 
-@dataclass(frozen=True)
+DEFAULT_CURRENCY = "EUR"
+_CENT = Decimal("0.01")
+
+
+@dataclass(frozen=True, slots=True)
 class Money:
-    value: float
+    """An amount held as integer minor units (cents) of `currency`.
 
-    def __post_init__(self):
+    Built from a major-unit number (`Money(12.5)`) rounded half-up to the
+    cent, or exactly from cents with `Money.from_cents`. Arithmetic stays on
+    ints, so sums never drift.
+    """
+    cents: int
+    currency: str
+
+    def __init__(self, value: Union[int, float, str, Decimal] = 0, currency: str = DEFAULT_CURRENCY):
+        if isinstance(value, bool):
+            raise TypeError('Money value must be a number')
         try:
-            v = float(self.value)
-        except Exception:
+            # str() first so floats convert by their shortest repr (0.1 -> 0.10)
+            exact = value if isinstance(value, Decimal) else Decimal(str(value))
+            cents = int((exact / _CENT).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+        except (InvalidOperation, ValueError):
             raise TypeError('Money value must be a number')
-        object.__setattr__(self, 'value', float(v))
+        object.__setattr__(self, 'cents', cents)
+        object.__setattr__(self, 'currency', currency)
+
+    @classmethod
+    def from_cents(cls, cents: int, currency: str = DEFAULT_CURRENCY) -> "Money":
+        money = cls.__new__(cls)
+        object.__setattr__(money, 'cents', int(cents))
+        object.__setattr__(money, 'currency', currency)
+        return money
+
+    @classmethod
+    def exact(cls, value: Union[int, float, str, Decimal], currency: str = DEFAULT_CURRENCY) -> "Money":
+        """Like `Money(value)`, but fractions of a cent are a ValueError instead of being rounded."""
+        money = cls(value, currency)
+        if money.to_decimal() != (value if isinstance(value, Decimal) else Decimal(str(value))):
+            raise ValueError(f"{value} has more than 2 decimals")
+        return money
+
+    @classmethod
+    def from_stored(cls, value: float, currency: str = DEFAULT_CURRENCY) -> "Money":
+        """Trusted fast path for DECIMAL(14, 2) values read back as floats."""
+        # exact: such values are far below the float precision limit
+        return cls.from_cents(round(value * 100), currency)
+
+    @property
+    def value(self) -> float:
+        """Major units as a float, for JSON payloads."""
+        return self.cents / 100
+
+    def to_decimal(self) -> Decimal:
+        return Decimal(self.cents).scaleb(-2)
 
     def to_primitive(self) -> float:
-        return float(self.value)
+        return self.value
+
+    def _check_currency(self, other: "Money") -> None:
+        if other.currency != self.currency:
+            raise ValueError(f"Cannot combine {self.currency} and {other.currency} amounts")
+
+    def __add__(self, other: "Money") -> "Money":
+        self._check_currency(other)
+        return Money.from_cents(self.cents + other.cents, self.currency)
+
+    def __sub__(self, other: "Money") -> "Money":
+        self._check_currency(other)
+        return Money.from_cents(self.cents - other.cents, self.currency)
+
+    def __mul__(self, quantity: int) -> "Money":
+        return Money.from_cents(self.cents * int(quantity), self.currency)
+
+    __rmul__ = __mul__
@@ -1,27 +1,63 @@
-from dataclasses import dataclass
-from typing import Union
+from typing import Optional, Union
 import uuid
 
 
-@dataclass(frozen=True)
 class InvoiceId:
-    value: uuid.UUID
+    """Invoice identity, compared and hashed by its canonical UUID text.
+
+    Ids loaded from our own database come in through `trusted` and keep the
+    text only; the `uuid.UUID` is parsed on first access to `value`.
+    """
+    __slots__ = ("_text", "_uuid")
+    _text: str
+    _uuid: Optional[uuid.UUID]
 
     def __init__(self, value: Union[uuid.UUID, str]):
         if isinstance(value, uuid.UUID):
-            object.__setattr__(self, 'value', value)
+            parsed = value
         elif isinstance(value, str):
-            object.__setattr__(self, 'value', uuid.UUID(value))
+            parsed = uuid.UUID(value)
         else:
             raise TypeError('InvoiceId must be constructed from uuid.UUID or str')
+        object.__setattr__(self, '_uuid', parsed)
+        object.__setattr__(self, '_text', str(parsed))
+
+    @classmethod
+    def trusted(cls, text: str) -> "InvoiceId":
+        """Wrap a canonical id string read from storage without parsing it."""
+        invoice_id = object.__new__(cls)
+        object.__setattr__(invoice_id, '_text', text)
+        object.__setattr__(invoice_id, '_uuid', None)
+        return invoice_id
 
     @classmethod
     def generate(cls):
         return cls(uuid.uuid4())
 
+    @property
+    def value(self) -> uuid.UUID:
+        if self._uuid is None:
+            object.__setattr__(self, '_uuid', uuid.UUID(self._text))
+        return self._uuid  # type: ignore[return-value]
+
+    def __setattr__(self, name, value):
+        raise AttributeError('InvoiceId is immutable')
+
+    def __reduce__(self):
+        # copy/pickle through the trusted constructor (__setattr__ is blocked)
+        return (InvoiceId.trusted, (self._text,))
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, InvoiceId) and other._text == self._text
+
+    def __hash__(self) -> int:
+        return hash(self._text)
+
+    def __repr__(self) -> str:
+        return f"InvoiceId(value={self._text!r})"
+
     def to_primitive(self) -> str:
-        return str(self.value)
+        return self._text
 
     def __str__(self) -> str:
-        return str(self.value)
-"""Compatibility shim: old lowercase module name importing PascalCase implementation."""
+        return self._text
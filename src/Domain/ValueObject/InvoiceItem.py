@@ -3,7 +3,7 @@ from typing import Dict, Any
 from src.Domain.Shared.ValueObject.Money import Money
 
 
-@dataclass
+@dataclass(slots=True)
 class InvoiceItem:
     product_id: str
     description: str
@@ -14,6 +14,16 @@ class InvoiceItem:
         if not isinstance(self.unit_price, Money):
             raise TypeError('unit_price must be a Money instance')
 
+    @classmethod
+    def from_row(cls, product_id: str, description: str, quantity: int, unit_price: Money) -> "InvoiceItem":
+        """Build an item from trusted storage values, skipping validation."""
+        item = object.__new__(cls)
+        item.product_id = product_id
+        item.description = description
+        item.quantity = quantity
+        item.unit_price = unit_price
+        return item
+
     def to_primitive(self) -> Dict[str, Any]:
         # Emit camelCase keys for external consumers (API/JSON).
         return {
@@ -32,7 +42,7 @@ class InvoiceItem:
         quantity = int(data.get("quantity") or 0)
         # unit price may be present as number under snake or camel keys
         unit_price_val = data.get("unit_price") or data.get("unitPrice") or 0.0
-        unit_price = Money(float(unit_price_val))
+        unit_price = Money(unit_price_val)
         return cls(
             product_id=product_id,
             description=description,
@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class InvoiceNumber:
     value: str
 
@@ -12,6 +12,13 @@ class InvoiceNumber:
             raise ValueError('InvoiceNumber cannot be empty')
         object.__setattr__(self, 'value', value)
 
+    @classmethod
+    def trusted(cls, value: str) -> "InvoiceNumber":
+        """Wrap a number read from storage without re-validating it."""
+        number = object.__new__(cls)
+        object.__setattr__(number, 'value', value)
+        return number
+
     def to_primitive(self) -> str:
         return self.value
 
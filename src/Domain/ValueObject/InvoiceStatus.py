@@ -1,22 +1,21 @@
-from dataclasses import dataclass
+from enum import Enum
 
 
-@dataclass(frozen=True)
-class InvoiceStatus:
-    value: str
+class InvoiceStatus(str, Enum):
+    """Invoice status; `InvoiceStatus("draft")` returns the shared member."""
+    DRAFT = "draft"
+    ISSUED = "issued"
+    PAID = "paid"
+    CANCELLED = "cancelled"
 
-    ALLOWED = {"draft", "issued", "paid", "cancelled"}
-
-    def __init__(self, value: str):
+    @classmethod
+    def _missing_(cls, value: object) -> "InvoiceStatus":
         if not isinstance(value, str):
             raise TypeError('InvoiceStatus must be a string')
-        if value not in self.ALLOWED:
-            raise ValueError(f"Invalid invoice status '{value}'")
-        object.__setattr__(self, 'value', value)
+        raise ValueError(f"Invalid invoice status '{value}'")
 
     def to_primitive(self) -> str:
         return self.value
 
     def __str__(self) -> str:
         return self.value
-
@@ -0,0 +1,34 @@
+from dataclasses import dataclass
+from typing import Optional
+from src.Domain.ValueObject.InvoiceItem import InvoiceItem
+
+
+@dataclass(frozen=True)
+class ItemOperation:
+    """One step of a batch item edit: add `item`, set `quantity` or remove."""
+    op: str
+    product_id: str
+    item: Optional[InvoiceItem] = None
+    quantity: Optional[int] = None
+
+    OPS = ("add", "update", "remove")
+
+    def __post_init__(self):
+        if self.op not in self.OPS:
+            raise ValueError(f"Unknown item operation '{self.op}'")
+        if self.op == "add" and self.item is None:
+            raise ValueError("add operation needs an item")
+        if self.op == "update" and self.quantity is None:
+            raise ValueError("update operation needs a quantity")
+
+    @classmethod
+    def add(cls, item: InvoiceItem) -> "ItemOperation":
+        return cls("add", item.product_id, item=item)
+
+    @classmethod
+    def update(cls, product_id: str, quantity: int) -> "ItemOperation":
+        return cls("update", product_id, quantity=quantity)
+
+    @classmethod
+    def remove(cls, product_id: str) -> "ItemOperation":
+        return cls("remove", product_id)
@@ -4,5 +4,6 @@ from .InvoiceId import InvoiceId
 from .InvoiceNumber import InvoiceNumber
 from .InvoiceStatus import InvoiceStatus
 from .InvoiceItem import InvoiceItem
+from .ItemOperation import ItemOperation
 
-__all__ = ["InvoiceId", "InvoiceNumber", "InvoiceStatus", "InvoiceItem"]
+__all__ = ["InvoiceId", "InvoiceNumber", "InvoiceStatus", "InvoiceItem", "ItemOperation"]
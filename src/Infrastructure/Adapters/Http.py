@@ -1,31 +1,141 @@
-from typing import List, Optional
-
-from fastapi import APIRouter, HTTPException, Depends
+import base64
+import hashlib
+import csv
+import io
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from src.Application.Commands.CreateInvoice import createInvoiceHandler
-from src.Application.Queries.GetInvoice import getInvoiceHandler
+from src.Application.Commands.CreateInvoices import createInvoicesHandler
+from src.Application.Commands.TransitionInvoices import transitionInvoicesHandler
+from src.Application.Queries.GetInvoice import getInvoiceHandler, getInvoicesHandler, getInvoiceSummaryHandler, getInvoiceVersionHandler
+from src.Application.Queries.GetTotals import getTotalsHandler
 from src.Application.Commands.IssueInvoice import issueInvoiceHandler
 from src.Application.Commands.PayInvoice import payInvoiceHandler
 from src.Application.Commands.CancelInvoice import cancelInvoiceHandler
 from src.Application.Commands.AddItem import addInvoiceItemHandler
 from src.Application.Commands.UpdateItem import updateInvoiceItemHandler
 from src.Application.Commands.DeleteItem import deleteInvoiceItemHandler
+from src.Application.Commands.ApplyItemOperations import applyInvoiceItemOperationsHandler
 from src.Infrastructure.Repositories.InvoiceRepository import InvoiceRepository
-from src.Infrastructure.Events.EventPublisher import EventPublisher
-from src.Application.Ports.Repositories import InvoiceRepositoryPort
+from src.Infrastructure.Repositories.InvoiceReadRepository import InvoiceReadRepository
+from src.Infrastructure.Repositories.UnitOfWork import SqlAlchemyUnitOfWork
+from src.Infrastructure.Repositories.IdempotencyRepository import mark_applied
+from src.Infrastructure.Adapters.ReadYourWrites import recentlyWrote
+from src.Infrastructure.Adapters.Json import JsonResponse, dumps, invoice_to_json, summaries_to_json, summary_to_json
+from src.Infrastructure.Events.EventPublisher import event_publisher
+from src.Infrastructure.Cache.InvoiceCache import invoice_cache
+from src.Infrastructure.Cache.ReportCache import report_cache
+from src.Infrastructure.Database.Db import engine, read_engine
+from src.Infrastructure.Database.PoolMetrics import pool_stats
+from src.Application.Ports.Cache import InvoiceCachePort, ReportCachePort
+from src.Application.Ports.Repositories import InvoiceRepositoryPort, ConcurrencyConflict, PreconditionFailed
 from src.Application.Ports.Events import EventPublisherPort
+from src.Application.Ports.UnitOfWork import UnitOfWork
+from src.Domain.Invoice.Invoice import Invoice
+from src.Domain.Shared.ValueObject.Money import Money
+from src.Domain.ValueObject.InvoiceItem import InvoiceItem
+from src.Domain.ValueObject.ItemOperation import ItemOperation
 
 
 def getRepository():
-    return InvoiceRepository()
+    # writes outside a unit of work (create and the batch endpoints) commit in
+    # the repository; each of those transactions marks the request's
+    # Idempotency-Key applied, like SqlAlchemyUnitOfWork.commit
+    return InvoiceRepository(cache=invoice_cache, before_commit=mark_applied)
+
+
+def getReadRepository(request: Request):
+    # clients that just wrote read from the primary until replicas catch up
+    if recentlyWrote(request):
+        return getRepository()
+    return InvoiceReadRepository()
+
+
+def getCache(request: Request):
+    # likewise skip the cache: entries are filled from the primary only, but
+    # another process may still have filled it just before this client's write
+    if recentlyWrote(request):
+        return None
+    return invoice_cache
+
+
+def getReportCache():
+    return report_cache
+
+
+async def getUnitOfWork() -> AsyncIterator[UnitOfWork]:
+    uow = SqlAlchemyUnitOfWork(cache=invoice_cache)
+    try:
+        yield uow
+    finally:
+        # dependency teardown runs after the response is sent, so handlers
+        # commit themselves; this only releases the session
+        await uow.close()
 
 
 def getPublisher():
-    return EventPublisher()
+    return event_publisher
+
+
+def _etag(version: int) -> str:
+    # strong validator of one invoice: its optimistic concurrency version
+    return f'"{version}"'
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    """If-None-Match comparison (weak, per RFC 9110): any listed tag or `*`."""
+    if header is None:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+
+def getIfMatchVersion(if_match: Optional[str] = Header(None, alias="If-Match")) -> Optional[List[int]]:
+    """The invoice versions a write is conditional on (`If-Match: "<version>", ...`).
+
+    The write goes ahead when the invoice is at any listed version. Strong
+    comparison (RFC 9110): weak tags and tags that are not one of our ETags
+    never match, and a header with no usable tag is a 412 straight away.
+    """
+    if if_match is None:
+        return None
+    tags = [tag.strip() for tag in if_match.split(",")]
+    if "*" in tags:
+        return None
+    versions = [int(tag[1:-1]) for tag in tags if len(tag) > 2 and tag[0] == tag[-1] == '"' and tag[1:-1].isdigit()]
+    if not versions:
+        raise HTTPException(status_code=412, detail="If-Match lists no ETag of this invoice")
+    return versions
 
 router = APIRouter()
 
 
+def _encode_cursor(created_at: datetime, invoice_id: str) -> str:
+    raw = f"{created_at.isoformat()}|{invoice_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        created_at, invoice_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(created_at), invoice_id
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _unitPrice(value: float) -> Money:
+    # prices are whole cents; rounding a client's price silently would bill
+    # something else than was sent
+    try:
+        return Money.exact(value)
+    except ValueError:
+        raise ValueError("unitPrice must have at most 2 decimals")
+
+
 class CreateInvoiceDTO(BaseModel):
     customer: str
     invoiceNumber: str
@@ -42,6 +152,54 @@ class UpdateInvoiceItemDTO(BaseModel):
     quantity: int
 
 
+class ItemOperationDTO(BaseModel):
+    op: str
+    productId: str
+    description: str = ""
+    quantity: Optional[int] = None
+    unitPrice: Optional[float] = None
+
+    def to_operation(self) -> ItemOperation:
+        if self.op == "add":
+            if self.quantity is None or self.unitPrice is None:
+                raise ValueError("add operation needs quantity and unitPrice")
+            return ItemOperation.add(InvoiceItem(product_id=self.productId, description=self.description, quantity=self.quantity, unit_price=_unitPrice(self.unitPrice)))
+        return ItemOperation(self.op, self.productId, quantity=self.quantity)
+
+
+class BatchCreateInvoiceDTO(CreateInvoiceDTO):
+    items: List[CreateInvoiceItemDTO] = []
+
+
+class BatchCreateResult(BaseModel):
+    invoiceNumber: str
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BatchTransitionDTO(BaseModel):
+    # either explicit ids or a filter; the filter only selects invoices the
+    # transition is allowed from
+    ids: Optional[List[str]] = None
+    status: Optional[str] = None
+    customer: Optional[str] = None
+    createdFrom: Optional[datetime] = None
+    createdTo: Optional[datetime] = None
+
+
+class BatchTransitionResult(BaseModel):
+    id: str
+    status: Optional[str] = None
+    error: Optional[str] = None
+
+
+BATCH_MAX = 50000
+BATCH_GET_MAX = 1000
+
+
+class BatchGetDTO(BaseModel):
+    ids: List[str]
+
 
 class InvoiceItemResponse(BaseModel):
     productId: str
@@ -62,105 +220,234 @@ class InvoiceResponse(BaseModel):
     status: str
     invoiceNumber: str
     items: List[InvoiceItemResponse] = []
+    itemCount: Optional[int] = None
 
     class Config:
         schema_extra = {
             "example": {
-                "id": "uuid", "customer": "ACME", "amount": 100.0, "status": "draft", "invoiceNumber": "INV-1", "items": []
+                "id": "uuid", "customer": "ACME", "amount": 100.0, "status": "draft", "invoiceNumber": "INV-1", "items": [], "itemCount": 0
             }
         }
 
 
+class BatchGetResult(BaseModel):
+    id: str
+    invoice: Optional[InvoiceResponse] = None
+    error: Optional[str] = None
+
+
+class InvoiceSummaryResponse(BaseModel):
+    id: str
+    customer: str
+    amount: float
+    status: str
+    invoiceNumber: str
+    itemCount: int
+    createdAt: Optional[datetime] = None
+    updatedAt: Optional[datetime] = None
+    items: List[InvoiceItemResponse] = []
+
+
 @router.post("/invoices", response_model=InvoiceResponse)
-async def createInvoice(dto: CreateInvoiceDTO, repo: InvoiceRepositoryPort = Depends(getRepository), publisher: EventPublisherPort = Depends(getPublisher)) -> InvoiceResponse:
+async def createInvoice(dto: CreateInvoiceDTO, repo: InvoiceRepositoryPort = Depends(getRepository), publisher: EventPublisherPort = Depends(getPublisher)) -> JsonResponse:
     try:
         # amount is optional and defaults to 0.0 on creation
         invoice = await createInvoiceHandler(dto.customer, dto.invoiceNumber, 0.0, repo=repo, publisher=publisher)
-        id_value = str(invoice.id.value) if invoice.id is not None else None
-        resp = InvoiceResponse(
-            id=id_value,
-            customer=invoice.customer,
-            amount=invoice.amount.value,
-            status=invoice.status.value,
-            invoiceNumber=invoice.invoiceNumber.value,
-                items=[
-                    InvoiceItemResponse(
-                        productId=str(it.get("product_id") or it.get("productId") or ""),
-                        description=str(it.get("description") or ""),
-                        quantity=int(it.get("quantity") or 0),
-                        unitPrice=float(it.get("unit_price") or it.get("unitPrice") or 0.0),
-                    )
-                    for it in ([it.to_primitive() for it in invoice.items] if invoice.items else [])
-                ],
-        )
-        return resp
+        return JsonResponse(invoice_to_json(invoice))
     except Exception as e:
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/invoices:batchCreate", response_model=List[BatchCreateResult])
+async def batchCreateInvoices(dtos: List[BatchCreateInvoiceDTO], repo: InvoiceRepositoryPort = Depends(getRepository), publisher: EventPublisherPort = Depends(getPublisher)) -> List[BatchCreateResult]:
+    """Create many invoices in one request; results are in request order.
+
+    Rejected entries (e.g. duplicate invoice numbers) carry an `error` and do
+    not prevent the others from being created.
+    """
+    if len(dtos) > BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX} invoices per batch")
+    try:
+        for dto in dtos:
+            for item in dto.items:
+                _unitPrice(item.unitPrice)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    entries = [dto.dict() for dto in dtos]
+    results = await createInvoicesHandler(entries, repo=repo, publisher=publisher)
+    return [
+        BatchCreateResult(invoiceNumber=dto.invoiceNumber, id=str(invoice.id.value) if invoice is not None else None, error=error)
+        for dto, (invoice, error) in zip(dtos, results)
+    ]
+
+
 @router.get("/invoices/{invoice_id}", response_model=InvoiceResponse)
-async def getInvoice(invoice_id: str, repo: InvoiceRepositoryPort = Depends(getRepository)) -> InvoiceResponse:
-    invoice = await getInvoiceHandler(invoice_id, repo=repo)
+async def getInvoice(
+    invoice_id: str,
+    include_items: bool = Query(True, alias="includeItems"),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+    repo: InvoiceRepositoryPort = Depends(getReadRepository),
+    cache: Optional[InvoiceCachePort] = Depends(getCache),
+) -> Response:
+    """Return the invoice with its version as ETag; 304 when `If-None-Match` still matches.
+
+    The conditional check reads only the version, so validated requests skip
+    loading items and building the aggregate. With `includeItems=false` the
+    response carries `itemCount` and no lines, read from the summary row.
+    """
+    if if_none_match is not None:
+        version = await getInvoiceVersionHandler(invoice_id, repo=repo)
+        if version is None:
+            raise HTTPException(status_code=404, detail="Invoice not found")
+        if _etag_matches(if_none_match, _etag(version)):
+            return Response(status_code=304, headers={"ETag": _etag(version)})
+    if not include_items:
+        summary = await getInvoiceSummaryHandler(invoice_id, repo=repo, cache=cache)
+        if summary is None:
+            raise HTTPException(status_code=404, detail="Invoice not found")
+        return JsonResponse(summary_to_json(summary), headers={"ETag": _etag(summary["version"])})
+    invoice = await getInvoiceHandler(invoice_id, repo=repo, cache=cache)
     if invoice is None:
         raise HTTPException(status_code=404, detail="Invoice not found")
-    id_value = str(invoice.id.value) if invoice.id is not None else None
-    items = [it.to_primitive() for it in invoice.items] if invoice.items else []
-    resp = InvoiceResponse(
-        id=id_value,
-        customer=invoice.customer,
-        amount=invoice.amount.value,
-        status=invoice.status.value,
-        invoiceNumber=invoice.invoiceNumber.value,
-        items=[
-            InvoiceItemResponse(
-                productId=str(it.get("product_id") or it.get("productId") or ""),
-                description=str(it.get("description") or ""),
-                quantity=int(it.get("quantity") or 0),
-                unitPrice=float(it.get("unit_price") or it.get("unitPrice") or 0.0),
-            )
-            for it in items
-        ],
-    )
-    return resp
-
-
-@router.get("/invoices", response_model=List[InvoiceResponse])
-async def listInvoices(repo: InvoiceRepositoryPort = Depends(getRepository)) -> List[InvoiceResponse]:
+    return JsonResponse(invoice_to_json(invoice), headers={"ETag": _etag(invoice.version)})
+
+
+@router.post("/invoices:batchGet", response_model=List[BatchGetResult])
+async def batchGetInvoices(
+    dto: BatchGetDTO,
+    repo: InvoiceRepositoryPort = Depends(getReadRepository),
+    cache: Optional[InvoiceCachePort] = Depends(getCache),
+) -> JsonResponse:
+    """Return one entry per requested id, in request order; missing invoices carry an error."""
+    if len(dto.ids) > BATCH_GET_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_GET_MAX} invoices per batch")
+    invoices = await getInvoicesHandler(dto.ids, repo=repo, cache=cache)
+    return JsonResponse([
+        {"id": invoice_id, "invoice": invoice_to_json(invoice), "error": None} if invoice is not None
+        else {"id": invoice_id, "invoice": None, "error": "Invoice not found"}
+        for invoice_id, invoice in zip(dto.ids, invoices)
+    ])
+
+
+EXPORT_CHUNK_ROWS = 500
+EXPORT_CSV_COLUMNS = ["id", "invoiceNumber", "customer", "status", "amount", "createdAt"]
+
+
+def _export_ndjson_line(row: Mapping[str, Any]) -> bytes:
+    return dumps({
+        "id": row["id"],
+        "invoiceNumber": row["invoice_number"],
+        "customer": row["customer"],
+        "status": row["status"],
+        "amount": row["amount"],
+        "createdAt": row["created_at"].isoformat() if row["created_at"] else None,
+        "items": row["items"],
+    }) + b"\n"
+
+
+async def _export_ndjson(rows: AsyncIterator[Mapping[str, Any]]) -> AsyncIterator[bytes]:
+    chunk: List[bytes] = []
+    async for row in rows:
+        chunk.append(_export_ndjson_line(row))
+        if len(chunk) >= EXPORT_CHUNK_ROWS:
+            yield b"".join(chunk)
+            chunk = []
+    if chunk:
+        yield b"".join(chunk)
+
+
+async def _export_csv(rows: AsyncIterator[Mapping[str, Any]]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_CSV_COLUMNS)
+    count = 0
+    async for row in rows:
+        created_at = row["created_at"]
+        writer.writerow([row["id"], row["invoice_number"], row["customer"], row["status"], row["amount"], created_at.isoformat() if created_at else ""])
+        count += 1
+        if count % EXPORT_CHUNK_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+@router.get("/invoices:export")
+async def exportInvoices(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    status: Optional[str] = None,
+    customer: Optional[str] = None,
+    created_from: Optional[datetime] = Query(None, alias="createdFrom"),
+    created_to: Optional[datetime] = Query(None, alias="createdTo"),
+    repo: InvoiceRepositoryPort = Depends(getReadRepository),
+) -> StreamingResponse:
+    """Stream every matching invoice as NDJSON (with items) or CSV (header row, no items)."""
+    rows = repo.iter_export_rows(status=status, customer=customer, created_from=created_from, created_to=created_to)
+    if format == "csv":
+        return StreamingResponse(_export_csv(rows), media_type="text/csv", headers={"Content-Disposition": 'attachment; filename="invoices.csv"'})
+    return StreamingResponse(_export_ndjson(rows), media_type="application/x-ndjson")
+
+
+def _page_etag(rows: List[Mapping[str, Any]], include_items: bool, next_cursor: Optional[str]) -> str:
+    # every invoice write touches its summary row (status, amount, item
+    # count, updated_at), so these fields identify the page's content
+    digest = hashlib.sha1(f"{include_items}|{next_cursor}".encode())
+    for row in rows:
+        digest.update(f"|{row['id']},{row['updated_at']},{row['status']},{row['amount']},{row['item_count']}".encode())
+    return f'"{digest.hexdigest()}"'
+
+
+@router.get("/invoices", response_model=List[InvoiceSummaryResponse])
+async def listInvoices(
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    customer: Optional[str] = None,
+    created_from: Optional[datetime] = Query(None, alias="createdFrom"),
+    created_to: Optional[datetime] = Query(None, alias="createdTo"),
+    include_items: bool = Query(True, alias="includeItems"),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+    repo: InvoiceRepositoryPort = Depends(getReadRepository),
+) -> Response:
+    """List invoices newest first, one keyset page at a time.
+
+    Served from the `invoice_summaries` read model without building
+    aggregates; unless `includeItems=false` the page's items are fetched
+    with one extra query, once the page's ETag did not match. When more invoices
+    match, the opaque cursor for the next page is returned in the
+    `X-Next-Cursor` header; pass it back as `?cursor=`.
+    """
+    after = _decode_cursor(cursor) if cursor else None
     try:
-        invoices = await repo.list_all()
-        result: List[InvoiceResponse] = []
-        for invoice in invoices:
-            id_value = str(invoice.id.value) if invoice.id is not None else None
-            items = [it.to_primitive() for it in invoice.items] if invoice.items else []
-            resp = InvoiceResponse(
-                id=id_value,
-                customer=invoice.customer,
-                amount=invoice.amount.value,
-                status=invoice.status.value,
-                invoiceNumber=invoice.invoiceNumber.value,
-                items=[
-                    InvoiceItemResponse(
-                        productId=str(it.get("product_id") or it.get("productId") or ""),
-                        description=str(it.get("description") or ""),
-                        quantity=int(it.get("quantity") or 0),
-                        unitPrice=float(it.get("unit_price") or it.get("unitPrice") or 0.0),
-                    )
-                    for it in items
-                ],
-            )
-            result.append(resp)
-        return result
+        # fetch one extra row to learn whether another page exists
+        rows = [row async for row in repo.iter_summaries(limit + 1, after=after, status=status, customer=customer, created_from=created_from, created_to=created_to)]
+        headers = {}
+        if len(rows) > limit:
+            rows = rows[:limit]
+            headers["X-Next-Cursor"] = _encode_cursor(rows[-1]["created_at"], str(rows[-1]["id"]))
+        headers["ETag"] = _page_etag(rows, include_items, headers.get("X-Next-Cursor"))
+        if _etag_matches(if_none_match, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+        if include_items:
+            lines = await repo.summary_items([row["id"] for row in rows])
+            rows = [{**row, "items": lines.get(row["id"], [])} for row in rows]
+        return JsonResponse(summaries_to_json(rows), headers=headers)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/invoices/{invoice_id}:issue")
-async def issueInvoice(invoice_id: str, repo: InvoiceRepositoryPort = Depends(getRepository), publisher: EventPublisherPort = Depends(getPublisher)):
+async def issueInvoice(invoice_id: str, response: Response, uow: UnitOfWork = Depends(getUnitOfWork), publisher: EventPublisherPort = Depends(getPublisher), expected_version: Optional[List[int]] = Depends(getIfMatchVersion)):
     try:
-        invoice = await issueInvoiceHandler(invoice_id, repo=repo, publisher=publisher)
+        invoice = await issueInvoiceHandler(invoice_id, uow=uow, publisher=publisher, expected_version=expected_version)
+        response.headers["ETag"] = _etag(invoice.version)
         return {"id": str(invoice.id.value), "status": invoice.status.value}
+    except ConcurrencyConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except PreconditionFailed as e:
+        raise HTTPException(status_code=412, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -168,10 +455,15 @@ async def issueInvoice(invoice_id: str, repo: InvoiceRepositoryPort = Depends(ge
 
 
 @router.post("/invoices/{invoice_id}:pay")
-async def payInvoice(invoice_id: str, repo: InvoiceRepositoryPort = Depends(getRepository), publisher: EventPublisherPort = Depends(getPublisher)):
+async def payInvoice(invoice_id: str, response: Response, uow: UnitOfWork = Depends(getUnitOfWork), publisher: EventPublisherPort = Depends(getPublisher), expected_version: Optional[List[int]] = Depends(getIfMatchVersion)):
     try:
-        invoice = await payInvoiceHandler(invoice_id, repo=repo, publisher=publisher)
+        invoice = await payInvoiceHandler(invoice_id, uow=uow, publisher=publisher, expected_version=expected_version)
+        response.headers["ETag"] = _etag(invoice.version)
         return {"id": str(invoice.id.value), "status": invoice.status.value}
+    except ConcurrencyConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except PreconditionFailed as e:
+        raise HTTPException(status_code=412, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -179,34 +471,104 @@ async def payInvoice(invoice_id: str, repo: InvoiceRepositoryPort = Depends(getR
 
 
 @router.post("/invoices/{invoice_id}:cancel")
-async def cancelInvoice(invoice_id: str, repo: InvoiceRepositoryPort = Depends(getRepository), publisher: EventPublisherPort = Depends(getPublisher)):
+async def cancelInvoice(invoice_id: str, response: Response, uow: UnitOfWork = Depends(getUnitOfWork), publisher: EventPublisherPort = Depends(getPublisher), expected_version: Optional[List[int]] = Depends(getIfMatchVersion)):
     try:
-        invoice = await cancelInvoiceHandler(invoice_id, repo=repo, publisher=publisher)
+        invoice = await cancelInvoiceHandler(invoice_id, uow=uow, publisher=publisher, expected_version=expected_version)
+        response.headers["ETag"] = _etag(invoice.version)
         return {"id": str(invoice.id.value), "status": invoice.status.value}
+    except ConcurrencyConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except PreconditionFailed as e:
+        raise HTTPException(status_code=412, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+async def _batchTransition(action: str, dto: BatchTransitionDTO, repo: InvoiceRepositoryPort, publisher: EventPublisherPort) -> List[BatchTransitionResult]:
+    if dto.ids is None and dto.status is None and dto.customer is None and dto.createdFrom is None and dto.createdTo is None:
+        raise HTTPException(status_code=400, detail="Provide ids or at least one filter")
+    if dto.ids is not None and len(dto.ids) > BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX} invoices per batch")
+    outcomes = await transitionInvoicesHandler(
+        action,
+        invoice_ids=dto.ids,
+        status=dto.status,
+        customer=dto.customer,
+        created_from=dto.createdFrom,
+        created_to=dto.createdTo,
+        # a filter may match any number of invoices; cap it like explicit ids
+        limit=BATCH_MAX,
+        repo=repo,
+        publisher=publisher,
+    )
+    target = Invoice.TRANSITIONS[action][1]
+    return [BatchTransitionResult(id=invoice_id, status=target if error is None else None, error=error) for invoice_id, error in outcomes.items()]
+
+
+@router.post("/invoices:batchIssue", response_model=List[BatchTransitionResult])
+async def batchIssueInvoices(dto: BatchTransitionDTO, repo: InvoiceRepositoryPort = Depends(getRepository), publisher: EventPublisherPort = Depends(getPublisher)) -> List[BatchTransitionResult]:
+    return await _batchTransition("issue", dto, repo, publisher)
+
+
+@router.post("/invoices:batchPay", response_model=List[BatchTransitionResult])
+async def batchPayInvoices(dto: BatchTransitionDTO, repo: InvoiceRepositoryPort = Depends(getRepository), publisher: EventPublisherPort = Depends(getPublisher)) -> List[BatchTransitionResult]:
+    return await _batchTransition("pay", dto, repo, publisher)
+
+
+@router.post("/invoices:batchCancel", response_model=List[BatchTransitionResult])
+async def batchCancelInvoices(dto: BatchTransitionDTO, repo: InvoiceRepositoryPort = Depends(getRepository), publisher: EventPublisherPort = Depends(getPublisher)) -> List[BatchTransitionResult]:
+    return await _batchTransition("cancel", dto, repo, publisher)
+
+
 @router.post("/invoices/{invoice_id}/items")
-async def addInvoiceItem(invoice_id: str, dto: CreateInvoiceItemDTO, repo: InvoiceRepositoryPort = Depends(getRepository), publisher: EventPublisherPort = Depends(getPublisher)):
+async def addInvoiceItem(invoice_id: str, dto: CreateInvoiceItemDTO, response: Response, uow: UnitOfWork = Depends(getUnitOfWork), publisher: EventPublisherPort = Depends(getPublisher), expected_version: Optional[List[int]] = Depends(getIfMatchVersion)):
     try:
-        invoice = await addInvoiceItemHandler(invoice_id, dto.productId, dto.description, dto.quantity, dto.unitPrice, repo=repo, publisher=publisher)
-        return {"id": str(invoice.id.value), "items_count": len(invoice.items), "amount": invoice.amount.value}
+        _unitPrice(dto.unitPrice)
+        change = await addInvoiceItemHandler(invoice_id, dto.productId, dto.description, dto.quantity, dto.unitPrice, uow=uow, publisher=publisher, expected_version=expected_version)
+        response.headers["ETag"] = _etag(change.version)
+        return {"id": change.invoice_id, "items_count": change.items_count, "amount": change.amount.value}
+    except ConcurrencyConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except PreconditionFailed as e:
+        raise HTTPException(status_code=412, detail=str(e))
     except ValueError as e:
-        raise HTTPException(status_code=404, detail=str(e))
+        raise HTTPException(status_code=404 if str(e) == "Invoice not found" else 400, detail=str(e))
     except Exception as e:
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.patch("/invoices/{invoice_id}/items/{product_id}")
-async def updateInvoiceItem(invoice_id: str, product_id: str, dto: UpdateInvoiceItemDTO, repo: InvoiceRepositoryPort = Depends(getRepository), publisher: EventPublisherPort = Depends(getPublisher)):
+@router.post("/invoices/{invoice_id}/items:batch")
+async def batchInvoiceItems(invoice_id: str, dtos: List[ItemOperationDTO], response: Response, uow: UnitOfWork = Depends(getUnitOfWork), publisher: EventPublisherPort = Depends(getPublisher), expected_version: Optional[List[int]] = Depends(getIfMatchVersion)):
+    """Apply add/update/remove item operations in order, all or nothing, in one transaction."""
+    if len(dtos) > BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX} operations per batch")
     try:
-        invoice = await updateInvoiceItemHandler(invoice_id, product_id, dto.quantity, repo=repo, publisher=publisher)
+        operations = [dto.to_operation() for dto in dtos]
+        invoice = await applyInvoiceItemOperationsHandler(invoice_id, operations, uow=uow, publisher=publisher, expected_version=expected_version)
+        response.headers["ETag"] = _etag(invoice.version)
         return {"id": str(invoice.id.value), "items_count": len(invoice.items), "amount": invoice.amount.value}
+    except ConcurrencyConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except PreconditionFailed as e:
+        raise HTTPException(status_code=412, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=404 if str(e) == "Invoice not found" else 400, detail=str(e))
+
+
+@router.patch("/invoices/{invoice_id}/items/{product_id}")
+async def updateInvoiceItem(invoice_id: str, product_id: str, dto: UpdateInvoiceItemDTO, response: Response, uow: UnitOfWork = Depends(getUnitOfWork), publisher: EventPublisherPort = Depends(getPublisher), expected_version: Optional[List[int]] = Depends(getIfMatchVersion)):
+    try:
+        change = await updateInvoiceItemHandler(invoice_id, product_id, dto.quantity, uow=uow, publisher=publisher, expected_version=expected_version)
+        response.headers["ETag"] = _etag(change.version)
+        return {"id": change.invoice_id, "items_count": change.items_count, "amount": change.amount.value}
+    except ConcurrencyConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except PreconditionFailed as e:
+        raise HTTPException(status_code=412, detail=str(e))
     except ValueError as e:
         # invoice not found or business rule
         raise HTTPException(status_code=404 if str(e) == "Invoice not found" else 400, detail=str(e))
@@ -215,11 +577,52 @@ async def updateInvoiceItem(invoice_id: str, product_id: str, dto: UpdateInvoice
 
 
 @router.delete("/invoices/{invoice_id}/items/{product_id}")
-async def deleteInvoiceItem(invoice_id: str, product_id: str, repo: InvoiceRepositoryPort = Depends(getRepository), publisher: EventPublisherPort = Depends(getPublisher)):
+async def deleteInvoiceItem(invoice_id: str, product_id: str, response: Response, uow: UnitOfWork = Depends(getUnitOfWork), publisher: EventPublisherPort = Depends(getPublisher), expected_version: Optional[List[int]] = Depends(getIfMatchVersion)):
     try:
-        invoice = await deleteInvoiceItemHandler(invoice_id, product_id, repo=repo, publisher=publisher)
-        return {"id": str(invoice.id.value), "items_count": len(invoice.items), "amount": invoice.amount.value}
+        change = await deleteInvoiceItemHandler(invoice_id, product_id, uow=uow, publisher=publisher, expected_version=expected_version)
+        response.headers["ETag"] = _etag(change.version)
+        return {"id": change.invoice_id, "items_count": change.items_count, "amount": change.amount.value}
+    except ConcurrencyConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except PreconditionFailed as e:
+        raise HTTPException(status_code=412, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=404 if str(e) == "Invoice not found" else 400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+
+class TotalsRow(BaseModel):
+    customer: Optional[str] = None
+    status: Optional[str] = None
+    period: Optional[str] = None
+    count: int
+    amount: float
+
+
+@router.get("/reports/totals", response_model=List[TotalsRow], response_model_exclude_none=True)
+async def reportTotals(
+    group_by: str = Query("customer,status,period", alias="groupBy"),
+    period: str = Query("month", pattern="^(day|month|year)$"),
+    status: Optional[str] = None,
+    customer: Optional[str] = None,
+    created_from: Optional[datetime] = Query(None, alias="createdFrom"),
+    created_to: Optional[datetime] = Query(None, alias="createdTo"),
+    repo: InvoiceRepositoryPort = Depends(getReadRepository),
+    cache: ReportCachePort = Depends(getReportCache),
+) -> List[Mapping[str, Any]]:
+    """Invoice count and amount grouped by any of customer, status and period, aggregated in SQL."""
+    fields = [field.strip() for field in group_by.split(",") if field.strip()]
+    try:
+        return await getTotalsHandler(fields, period=period, status=status, customer=customer, created_from=created_from, created_to=created_to, repo=repo, cache=cache)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/metrics/db-pool")
+async def dbPoolMetrics() -> Dict[str, Any]:
+    """Connection pool gauges (size, checked out, idle, overflow) and checkout wait counters."""
+    stats = pool_stats(engine.pool)
+    if read_engine is not engine:
+        stats["replica"] = pool_stats(read_engine.pool)
+    return stats
@@ -0,0 +1,179 @@
+import os
+import asyncio
+import hashlib
+import logging
+from uuid import uuid4
+from typing import Any, Awaitable, Callable, List, MutableMapping, Optional
+
+from src.Infrastructure.Repositories.IdempotencyRepository import (
+    Claim,
+    Headers,
+    IdempotencyKeyInProgress,
+    IdempotencyKeyReused,
+    IdempotencyRepository,
+    StoredResponse,
+    current_claim,
+)
+
+# how long a finished request's response is replayed to retries
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+# how long a claimed key blocks other requests before it is considered abandoned
+IDEMPOTENCY_LOCK_SECONDS = float(os.getenv("IDEMPOTENCY_LOCK_SECONDS", "60"))
+IDEMPOTENCY_SWEEP_INTERVAL = float(os.getenv("IDEMPOTENCY_SWEEP_INTERVAL", "60"))
+IDEMPOTENCY_SWEEP_BATCH_SIZE = 1000
+HEADER_NAME = b"idempotency-key"
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+# answers telling the client to try again later are not stored, like 5xx
+RETRYABLE_STATUSES = {409, 429}
+# per-client or per-transfer headers are not replayed
+UNSTORED_HEADERS = {"set-cookie", "content-length", "date", "server"}
+
+Scope = MutableMapping[str, Any]
+Message = MutableMapping[str, Any]
+ASGIApp = Callable[[Scope, Callable[[], Awaitable[Message]], Callable[[Message], Awaitable[None]]], Awaitable[None]]
+
+
+class IdempotencyMiddleware:
+    """Run each write sent with an `Idempotency-Key` header at most once.
+
+    The first request claims the key and its response is stored, so retries
+    with the same key and request get that response back (with an
+    `Idempotent-Replayed: true` header) without re-running the handler or
+    re-publishing its events. A retry arriving while the first request is
+    still running gets 409; reusing a key for a different request gets 422.
+    5xx, 409 and 429 responses are not stored, so such requests can be
+    retried, unless the command already committed: its transaction marks the
+    key applied (`mark_applied`), and that response is stored whatever it is.
+    """
+
+    def __init__(self, app: ASGIApp, store: Optional[Any] = None) -> None:
+        self.app = app
+        self.store = store if store is not None else IdempotencyRepository()
+
+    async def __call__(self, scope: Scope, receive: Callable[[], Awaitable[Message]], send: Callable[[Message], Awaitable[None]]) -> None:
+        key = dict(scope.get("headers", [])).get(HEADER_NAME) if scope["type"] == "http" else None
+        if key is None or scope["method"] not in WRITE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        # the body is read up front: it is part of the request fingerprint
+        chunks: List[bytes] = []
+        more = True
+        while more:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            more = message.get("more_body", False)
+        body = b"".join(chunks)
+        digest = hashlib.sha256(f"{scope['method']} {scope['path']}?{scope.get('query_string', b'').decode()}\n".encode())
+        digest.update(body)
+
+        token = uuid4().hex
+        try:
+            stored = await self.store.claim(key.decode(), digest.hexdigest(), token, IDEMPOTENCY_LOCK_SECONDS)
+        except IdempotencyKeyInProgress as e:
+            await _send_error(send, 409, str(e))
+            return
+        except IdempotencyKeyReused as e:
+            await _send_error(send, 422, str(e))
+            return
+        if stored is not None:
+            replay = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in stored.headers]
+            replay.append((b"idempotent-replayed", b"true"))
+            await send({"type": "http.response.start", "status": stored.status_code, "headers": replay})
+            await send({"type": "http.response.body", "body": stored.body})
+            return
+
+        replayed = False
+
+        async def receive_body() -> Message:
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        status = 500
+        headers: Headers = []
+        parts: List[bytes] = []
+
+        async def send_and_capture(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers.extend(
+                    (name.decode("latin-1"), value.decode("latin-1"))
+                    for name, value in message.get("headers", [])
+                    if name.decode("latin-1").lower() not in UNSTORED_HEADERS
+                )
+            elif message["type"] == "http.response.body":
+                parts.append(message.get("body", b""))
+            await send(message)
+
+        claimed = current_claim.set(Claim(key.decode(), token, IDEMPOTENCY_TTL_SECONDS))
+        try:
+            await self.app(scope, receive_body, send_and_capture)
+        except BaseException:
+            await self.store.release(key.decode(), token)
+            raise
+        finally:
+            current_claim.reset(claimed)
+        if (status >= 500 or status in RETRYABLE_STATUSES) and await self.store.release(key.decode(), token):
+            return
+        if not await self.store.complete(key.decode(), token, StoredResponse(status, headers, b"".join(parts)), IDEMPOTENCY_TTL_SECONDS):
+            logging.getLogger("invoicing.idempotency").warning("response for Idempotency-Key '%s' not stored: the key was taken over", key.decode())
+
+
+async def _send_error(send: Callable[[Message], Awaitable[None]], status: int, detail: str) -> None:
+    from src.Infrastructure.Adapters.Json import dumps
+
+    await send({"type": "http.response.start", "status": status, "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": dumps({"detail": detail})})
+
+
+class IdempotencyKeySweeper:
+    """Background task deleting expired idempotency keys in batches."""
+
+    def __init__(self, store: Any, interval: float = IDEMPOTENCY_SWEEP_INTERVAL, batch_size: int = IDEMPOTENCY_SWEEP_BATCH_SIZE):
+        self._store = store
+        self._interval = interval
+        self._batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+        self._logger = logging.getLogger("invoicing.idempotency")
+
+    async def sweep_once(self) -> int:
+        """Delete every expired key; return how many were deleted."""
+        total = 0
+        while True:
+            deleted = await self._store.sweep(self._batch_size)
+            total += deleted
+            if deleted < self._batch_size:
+                return total
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.sweep_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                self._logger.warning("idempotency key sweep failed: %s", exc)
+            await asyncio.sleep(self._interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+
+# Process-wide store and sweeper used by `src/Main.py`.
+idempotency_store = IdempotencyRepository()
+idempotency_sweeper = IdempotencyKeySweeper(idempotency_store)
@@ -0,0 +1,79 @@
+"""Direct Invoice/row -> JSON bytes serialization for hot HTTP responses.
+
+Routes returning a `JsonResponse` keep their `response_model` for the
+OpenAPI schema, but FastAPI skips re-validating and re-encoding the content.
+"""
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Mapping
+
+import orjson
+from fastapi.responses import Response
+
+from src.Domain.Invoice.Invoice import Invoice
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default)
+
+
+class JsonResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def invoice_to_json(invoice: Invoice) -> Dict[str, Any]:
+    """The `InvoiceResponse` shape of an aggregate."""
+    return {
+        "id": str(invoice.id),
+        "customer": invoice.customer,
+        "amount": invoice.amount.value,
+        "status": invoice.status.value,
+        "invoiceNumber": invoice.invoiceNumber.value,
+        "items": [
+            {"productId": it.product_id, "description": it.description, "quantity": it.quantity, "unitPrice": it.unit_price.value}
+            for it in invoice.items
+        ],
+        "itemCount": len(invoice.items),
+    }
+
+
+def summary_to_json(row: Mapping[str, Any]) -> Dict[str, Any]:
+    """The `InvoiceResponse` shape of a `get_summary` row, without items."""
+    return {
+        "id": str(row["id"]),
+        "customer": row["customer"],
+        "amount": row["amount"],
+        "status": row["status"],
+        "invoiceNumber": row["invoice_number"],
+        "items": [],
+        "itemCount": row["item_count"],
+    }
+
+
+def summaries_to_json(rows: List[Mapping[str, Any]]) -> List[Dict[str, Any]]:
+    """The `InvoiceSummaryResponse` shape of `iter_summaries` rows."""
+    return [
+        {
+            "id": row["id"],
+            "customer": row["customer"],
+            "amount": row["amount"],
+            "status": row["status"],
+            "invoiceNumber": row["invoice_number"],
+            "itemCount": row["item_count"],
+            "createdAt": row["created_at"],
+            "updatedAt": row["updated_at"],
+            "items": row.get("items", []),
+        }
+        for row in rows
+    ]
@@ -0,0 +1,67 @@
+import os
+import time
+from typing import Any, Awaitable, Callable, MutableMapping
+
+from fastapi import Request
+
+# After a successful write the client reads from the primary (and skips the
+# cache) for this many seconds, long enough for replicas to catch up.
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+COOKIE_NAME = "last_write"
+# the same stamp as a response header, for clients without a cookie jar
+# (other services, mobile apps) to echo on their next reads
+HEADER_NAME = "X-Last-Write"
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+# POSTs that only read
+READ_ONLY_SUFFIXES = (":batchGet",)
+
+Scope = MutableMapping[str, Any]
+Message = MutableMapping[str, Any]
+ASGIApp = Callable[[Scope, Callable[[], Awaitable[Message]], Callable[[Message], Awaitable[None]]], Awaitable[None]]
+
+
+class ReadYourWritesMiddleware:
+    """Stamp successful write responses with a short-lived `last_write` cookie
+    and an `X-Last-Write` header carrying the same timestamp.
+
+    The stamp travels with the client, so any API process can honour it
+    without shared state. Plain ASGI, so streamed responses pass through
+    untouched.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Callable[[], Awaitable[Message]], send: Callable[[Message], Awaitable[None]]) -> None:
+        if scope["type"] != "http" or not _is_write(scope) or READ_YOUR_WRITES_SECONDS <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                stamp = f"{time.time():.3f}"
+                cookie = f"{COOKIE_NAME}={stamp}; Max-Age={int(READ_YOUR_WRITES_SECONDS) or 1}; Path=/; HttpOnly; SameSite=Lax"
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"set-cookie", cookie.encode()),
+                    (HEADER_NAME.lower().encode(), stamp.encode()),
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
+
+
+def _is_write(scope: Scope) -> bool:
+    return scope["method"] in WRITE_METHODS and not scope["path"].endswith(READ_ONLY_SUFFIXES)
+
+
+def recentlyWrote(request: Request) -> bool:
+    """Whether the client made a write within READ_YOUR_WRITES_SECONDS, going
+    by the `X-Last-Write` header it echoed or else its `last_write` cookie."""
+    raw = request.headers.get(HEADER_NAME) or request.cookies.get(COOKIE_NAME)
+    if raw is None:
+        return False
+    try:
+        written_at = float(raw)
+    except ValueError:
+        return False
+    return time.time() - written_at < READ_YOUR_WRITES_SECONDS
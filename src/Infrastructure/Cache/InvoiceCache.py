@@ -0,0 +1,175 @@
+import os
+import json
+import time
+from datetime import datetime
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src.Application.Ports.Cache import InvoiceCachePort
+from src.Domain.Invoice.Invoice import Invoice
+from src.Domain.Shared.ValueObject.Money import Money
+from src.Domain.ValueObject.InvoiceId import InvoiceId
+from src.Domain.ValueObject.InvoiceItem import InvoiceItem
+from src.Domain.ValueObject.InvoiceNumber import InvoiceNumber
+from src.Domain.ValueObject.InvoiceStatus import InvoiceStatus
+
+CACHE_URL = os.getenv("INVOICE_CACHE_URL", "")
+CACHE_SIZE = int(os.getenv("INVOICE_CACHE_SIZE", "10000"))
+# drafts and issued invoices still change, so other processes may see a stale
+# copy until the TTL expires; paid/cancelled invoices are final and kept longer
+CACHE_TTL = float(os.getenv("INVOICE_CACHE_TTL", "30"))
+CACHE_FINAL_TTL = float(os.getenv("INVOICE_CACHE_FINAL_TTL", "3600"))
+FINAL_STATUSES = {"paid", "cancelled"}
+
+
+def _ttl_for(invoice: Invoice) -> float:
+    return CACHE_FINAL_TTL if invoice.status.value in FINAL_STATUSES else CACHE_TTL
+
+
+def invoice_to_primitive(invoice: Invoice) -> Dict[str, Any]:
+    return {
+        "id": str(invoice.id),
+        "customer": invoice.customer,
+        "amount": invoice.amount.value,
+        "status": invoice.status.value,
+        "invoiceNumber": invoice.invoiceNumber.value,
+        "items": [it.to_primitive() for it in invoice.items],
+        "createdAt": invoice.created_at.isoformat(),
+        "version": invoice.version,
+    }
+
+
+def invoice_from_primitive(data: Dict[str, Any]) -> Invoice:
+    invoice = Invoice(
+        id=InvoiceId(data["id"]),
+        customer=data["customer"],
+        amount=Money(data["amount"]),
+        status=InvoiceStatus(data["status"]),
+        invoiceNumber=InvoiceNumber(data["invoiceNumber"]),
+        items=[InvoiceItem.from_primitive(it) for it in data["items"]],
+    )
+    invoice.created_at = datetime.fromisoformat(data["createdAt"])
+    invoice.version = int(data["version"])
+    # only stored invoices are cached
+    invoice.persisted = True
+    return invoice
+
+
+class InMemoryInvoiceCache(InvoiceCachePort):
+    """Per-process LRU cache with a size bound and per-entry TTL.
+
+    Entries are `(expires_at, version, data)`; a write's marker has no data.
+    """
+
+    def __init__(self, max_size: int = CACHE_SIZE):
+        self._max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[float, int, Optional[Dict[str, Any]]]]" = OrderedDict()
+
+    async def get(self, invoice_id: str) -> Optional[Invoice]:
+        entry = self._entries.get(invoice_id)
+        if entry is None:
+            return None
+        expires_at, _, data = entry
+        if expires_at <= time.monotonic():
+            del self._entries[invoice_id]
+            return None
+        if data is None:
+            return None
+        self._entries.move_to_end(invoice_id)
+        return invoice_from_primitive(data)
+
+    async def set(self, invoice: Invoice) -> None:
+        self._put(str(invoice.id.value), _ttl_for(invoice), invoice.version, invoice_to_primitive(invoice))
+
+    async def invalidate(self, invoice_id: str, version: Optional[int] = None) -> None:
+        if version is None:
+            self._entries.pop(invoice_id, None)
+        else:
+            self._put(invoice_id, CACHE_TTL, version, None)
+
+    def _put(self, key: str, ttl: float, version: int, data: Optional[Dict[str, Any]]) -> None:
+        now = time.monotonic()
+        current = self._entries.get(key)
+        if current is not None and current[0] > now and current[1] > version:
+            return
+        self._entries[key] = (now + ttl, version, data)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+
+class SharedInvoiceCache(InvoiceCachePort):
+    """Cache shared by all API processes, stored as JSON in a key-value server.
+
+    `client` follows the `redis.asyncio.Redis` calls used here (`get`,
+    `mget`, `eval`, `delete`, `pipeline`); use `from_url` to connect to
+    Redis. Writes go through a script that compares versions on the server.
+    Batches take one round trip: MGET to read, a pipeline to write.
+    """
+
+    def __init__(self, client: Any, prefix: str = "invoice:"):
+        self._client = client
+        self._prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str) -> "SharedInvoiceCache":
+        # optional dependency: only needed when a shared cache is configured
+        from redis.asyncio import from_url
+
+        return cls(from_url(url))
+
+    async def get(self, invoice_id: str) -> Optional[Invoice]:
+        return _from_raw(await self._client.get(self._prefix + invoice_id))
+
+    async def set(self, invoice: Invoice) -> None:
+        await self._client.eval(*self._set_args(invoice))
+
+    async def get_many(self, invoice_ids: Sequence[str]) -> List[Optional[Invoice]]:
+        if not invoice_ids:
+            return []
+        raws = await self._client.mget([self._prefix + invoice_id for invoice_id in invoice_ids])
+        return [_from_raw(raw) for raw in raws]
+
+    async def set_many(self, invoices: Sequence[Invoice]) -> None:
+        if not invoices:
+            return
+        async with self._client.pipeline(transaction=False) as pipe:
+            for invoice in invoices:
+                pipe.eval(*self._set_args(invoice))
+            await pipe.execute()
+
+    async def invalidate(self, invoice_id: str, version: Optional[int] = None) -> None:
+        if version is None:
+            await self._client.delete(self._prefix + invoice_id)
+        else:
+            await self._client.eval(_SET_IF_NOT_OLDER, 1, self._prefix + invoice_id, version, json.dumps({"version": version}), int(CACHE_TTL))
+
+    def _set_args(self, invoice: Invoice) -> Tuple[Any, ...]:
+        payload = json.dumps(invoice_to_primitive(invoice))
+        return (_SET_IF_NOT_OLDER, 1, self._prefix + str(invoice.id.value), invoice.version, payload, int(_ttl_for(invoice)))
+
+
+# KEYS[1] = key, ARGV = version, JSON value, TTL in seconds; the stored value
+# (an invoice or a write's `{"version": n}` marker) is kept when it is newer
+_SET_IF_NOT_OLDER = """
+local current = redis.call('GET', KEYS[1])
+if current and cjson.decode(current)['version'] > tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+
+def _from_raw(raw: Any) -> Optional[Invoice]:
+    if raw is None:
+        return None
+    data = json.loads(raw)
+    # a write's marker: nothing cached
+    if "id" not in data:
+        return None
+    return invoice_from_primitive(data)
+
+
+# Process-wide cache: shared when INVOICE_CACHE_URL is set, otherwise in-process.
+invoice_cache: InvoiceCachePort = SharedInvoiceCache.from_url(CACHE_URL) if CACHE_URL else InMemoryInvoiceCache()
@@ -0,0 +1,43 @@
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+from src.Application.Ports.Cache import ReportCachePort
+
+# reports tolerate being this many seconds old; repeated queries are then
+# answered without touching the database, whatever the invoice count
+REPORT_CACHE_TTL = float(os.getenv("REPORT_CACHE_TTL", "60"))
+REPORT_CACHE_SIZE = 256
+
+
+class InMemoryReportCache(ReportCachePort):
+    """Per-process LRU of report results with a fixed TTL."""
+
+    def __init__(self, ttl: float = REPORT_CACHE_TTL, max_size: int = REPORT_CACHE_SIZE):
+        self._ttl = ttl
+        self._max_size = max_size
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    async def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: Hashable, value: Any) -> None:
+        if self._ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self._ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+
+# Process-wide report cache used by the HTTP adapter.
+report_cache = InMemoryReportCache()
@@ -2,10 +2,12 @@ import os
 import asyncio
 import logging
 import warnings
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy import Column, String, Float, DateTime, func
+from sqlalchemy import Boolean, Column, String, Numeric, Integer, DateTime, BigInteger, Text, LargeBinary, Index, ForeignKey, func
+from sqlalchemy.dialects.mysql import LONGBLOB
 import atexit
+from src.Infrastructure.Database.PoolMetrics import InstrumentedAsyncPool
 # Suppress SQLAlchemy SAWarning about async DB connection objects being
 # garbage-collected after the event loop is closed; best practice is to
 # explicitly close sessions and dispose the engine, but tests sometimes
@@ -28,20 +30,130 @@ DATABASE_URL = os.getenv(
     f"mysql+aiomysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}",
 )
 
-engine = create_async_engine(DATABASE_URL, echo=False)
+# Connection pool, sized per process. Keep (size + overflow) x processes below
+# MySQL's max_connections; recycle below wait_timeout (or any proxy idle
+# timeout) and pre-ping so stale connections are replaced, not handed out.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") == "1"
+
+# Optional read replica for the query side; falls back to the primary.
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL", "")
+
+
+def _create_engine(url: str) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        echo=False,
+        poolclass=InstrumentedAsyncPool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+    )
+
+
+engine = _create_engine(DATABASE_URL)
 AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+read_engine = _create_engine(DATABASE_READ_URL) if DATABASE_READ_URL else engine
+ReadSessionLocal = sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False) if DATABASE_READ_URL else AsyncSessionLocal
 Base = declarative_base()
 
+# money is stored exactly as DECIMAL; result rows come back as floats (the
+# API's number type) and the domain converts them to integer cents
+MoneyColumn = Numeric(14, 2, asdecimal=False)
+
 
 class InvoiceModel(Base):
     __tablename__ = "invoices"
     id = Column(String(36), primary_key=True, index=True)
     customer = Column(String(255), nullable=False)
-    amount = Column(Float, nullable=False)
+    amount = Column(MoneyColumn, nullable=False)
     status = Column(String(50), nullable=False, server_default="draft")
     invoice_number = Column(String(64), nullable=False, unique=True)
-    items = Column(String(2000), nullable=True)
     created_at = Column(DateTime, server_default=func.now())
+    version = Column(Integer, nullable=False, server_default="0")
+
+    __table_args__ = (
+        # keyset pagination of GET /invoices walks (created_at, id)
+        Index("ix_invoices_created_at_id", "created_at", "id"),
+        # filtered scans and GROUP BYs of GET /reports/totals
+        Index("ix_invoices_status_created_at", "status", "created_at"),
+        Index("ix_invoices_customer_created_at", "customer", "created_at"),
+    )
+
+
+class InvoiceItemModel(Base):
+    """One invoice line; rows are inserted/updated/deleted individually so an
+    item change costs a single-row write regardless of invoice size."""
+    __tablename__ = "invoice_items"
+    invoice_id = Column(String(36), ForeignKey("invoices.id", ondelete="CASCADE"), primary_key=True)
+    product_id = Column(String(64), primary_key=True)
+    description = Column(String(255), nullable=False, server_default="")
+    quantity = Column(Integer, nullable=False)
+    unit_price = Column(MoneyColumn, nullable=False)
+    # keeps items in the order they were added
+    position = Column(Integer, nullable=False, server_default="0")
+
+
+class InvoiceSummaryModel(Base):
+    """Denormalized read model behind GET /invoices, kept in step with the
+    invoice events by `InvoiceSummaryProjector` in the writing transaction."""
+    __tablename__ = "invoice_summaries"
+    id = Column(String(36), primary_key=True)
+    customer = Column(String(255), nullable=False)
+    status = Column(String(50), nullable=False)
+    amount = Column(MoneyColumn, nullable=False)
+    item_count = Column(Integer, nullable=False, server_default="0")
+    invoice_number = Column(String(64), nullable=False)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        # one index per list filter, each ending in the (created_at, id) keyset
+        Index("ix_invoice_summaries_created_at_id", "created_at", "id"),
+        Index("ix_invoice_summaries_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_invoice_summaries_customer_created_at_id", "customer", "created_at", "id"),
+    )
+
+
+class OutboxModel(Base):
+    """Domain events committed together with the invoice change that caused
+    them; drained to RabbitMQ by the outbox relay. A relay claims a row by
+    setting `claim_token` and a lease in `claimed_until`; published rows get
+    `sent_at` and are purged once older than the retention period."""
+    __tablename__ = "outbox_events"
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    routing_key = Column(String(255), nullable=False)
+    payload = Column(Text, nullable=False)
+    created_at = Column(DateTime, server_default=func.now())
+    claim_token = Column(String(32))
+    claimed_until = Column(DateTime)
+    sent_at = Column(DateTime)
+
+    __table_args__ = (
+        # pending rows (sent_at IS NULL) in id order, and the retention purge
+        Index("ix_outbox_events_sent_at_id", "sent_at", "id"),
+    )
+
+
+class IdempotencyKeyModel(Base):
+    """Responses of mutation requests sent with an `Idempotency-Key` header,
+    replayed to retries until `expires_at`. A row without `status_code` is a
+    request still in flight, owned by `claim_token`; `applied` is set in the
+    transaction that commits its command."""
+    __tablename__ = "idempotency_keys"
+    idempotency_key = Column(String(255), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)
+    claim_token = Column(String(32))
+    applied = Column(Boolean, nullable=False, default=False, server_default="0")
+    status_code = Column(Integer)
+    headers = Column(Text)
+    body = Column(LargeBinary().with_variant(LONGBLOB, "mysql"))
+    expires_at = Column(DateTime, nullable=False, index=True)
 
 
 async def init_db(retries: int = 12, delay: float = 2.0):
@@ -76,6 +188,7 @@ async def init_db(retries: int = 12, delay: float = 2.0):
 def _dispose_engine_at_exit():
     try:
         engine.sync_engine.dispose()
+        read_engine.sync_engine.dispose()
     except Exception as exc:
         logging.getLogger("invoicing.db").warning("dispose at exit failed: %s", exc)
 
@@ -0,0 +1,54 @@
+import time
+from typing import Any, Dict
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long checkouts wait.
+
+    The wait covers queueing for a free connection, opening an overflow
+    connection and the pre-ping, i.e. everything a request spends before it
+    can send its first statement. Counters are cumulative and reset when the
+    engine is disposed (the pool is recreated).
+    """
+
+    def __init__(self, *args: Any, **kw: Any) -> None:
+        super().__init__(*args, **kw)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def connect(self) -> Any:
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+
+def pool_stats(pool: Any) -> Dict[str, Any]:
+    """Gauges and counters of an engine pool, JSON-ready."""
+    stats: Dict[str, Any] = {
+        "size": pool.size(),
+        "checkedOut": pool.checkedout(),
+        "idle": pool.checkedin(),
+        # QueuePool counts overflow from -size; only connections beyond size are overflow
+        "overflow": max(pool.overflow(), 0),
+    }
+    if isinstance(pool, InstrumentedAsyncPool):
+        stats.update({
+            "checkouts": pool.checkouts,
+            "timeouts": pool.timeouts,
+            "waitSecondsTotal": pool.wait_seconds_total,
+            "waitSecondsMax": pool.wait_seconds_max,
+        })
+    return stats
@@ -2,6 +2,6 @@
 
 Re-exports the real implementations from `src.Infrastructure.Database.Db`.
 """
-from src.Infrastructure.Database.Db import AsyncSessionLocal, InvoiceModel, init_db
+from src.Infrastructure.Database.Db import DATABASE_READ_URL, AsyncSessionLocal, ReadSessionLocal, InvoiceModel, InvoiceItemModel, InvoiceSummaryModel, OutboxModel, IdempotencyKeyModel, init_db
 
-__all__ = ["AsyncSessionLocal", "InvoiceModel", "init_db"]
+__all__ = ["DATABASE_READ_URL", "AsyncSessionLocal", "ReadSessionLocal", "InvoiceModel", "InvoiceItemModel", "InvoiceSummaryModel", "OutboxModel", "IdempotencyKeyModel", "init_db"]
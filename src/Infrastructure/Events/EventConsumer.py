@@ -0,0 +1,223 @@
+import os
+import json
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Sequence, Set, Tuple
+
+from src.Infrastructure.Events.EventPublisher import EXCHANGE_NAME
+
+EVENT_QUEUE = os.getenv("EVENT_QUEUE", "invoicing.events")
+EVENT_BINDINGS = [key.strip() for key in os.getenv("EVENT_BINDINGS", "invoice.#").split(",") if key.strip()]
+CONSUMER_PREFETCH = int(os.getenv("CONSUMER_PREFETCH", "100"))
+CONSUMER_CONCURRENCY = int(os.getenv("CONSUMER_CONCURRENCY", "20"))
+CONSUMER_ACK_BATCH_SIZE = int(os.getenv("CONSUMER_ACK_BATCH_SIZE", "25"))
+CONSUMER_ACK_INTERVAL = float(os.getenv("CONSUMER_ACK_INTERVAL", "0.5"))
+# seconds before the 1st, 2nd, ... retry of a failed message; it is
+# dead-lettered when it fails once more after the last one
+CONSUMER_RETRY_DELAYS = [float(delay) for delay in os.getenv("CONSUMER_RETRY_DELAYS", "1,10,60").split(",") if delay.strip()]
+# failed attempts so far, and the event's routing key (retries come back
+# through the default exchange, addressed to the queue)
+ATTEMPTS_HEADER = "x-attempts"
+ROUTING_KEY_HEADER = "x-routing-key"
+
+# Handles one event: called with its routing key and decoded payload.
+EventHandler = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+
+def topic_matches(pattern: str, routing_key: str) -> bool:
+    """AMQP topic matching: `*` is exactly one word, `#` zero or more."""
+    def match(p: Sequence[str], k: Sequence[str]) -> bool:
+        if not p:
+            return not k
+        if p[0] == "#":
+            return any(match(p[1:], k[i:]) for i in range(len(k) + 1))
+        return bool(k) and (p[0] == "*" or p[0] == k[0]) and match(p[1:], k[1:])
+
+    return match(pattern.split("."), routing_key.split("."))
+
+
+class EventConsumer:
+    """Consume `domain_events` from a durable queue and dispatch them to handlers.
+
+    The queue is bound once per handler pattern (e.g. `invoice.#`). RabbitMQ
+    delivers at most `prefetch` unacknowledged messages and at most
+    `concurrency` of them are handled at a time. Successes are acknowledged in
+    batches with one `multiple` ack covering every message settled before
+    it. A failed message is republished to `<queue>.retry.<n>`, which holds it
+    for the n-th of `retry_delays` and then dead-letters it back to the queue;
+    the attempts so far travel in its `x-attempts` header. When it has used
+    every delay, or is not valid JSON, it is rejected to the `<queue>.dead`
+    dead-letter queue. Delivery is at-least-once, so handlers must be
+    idempotent.
+    """
+
+    def __init__(
+        self,
+        handlers: Sequence[Tuple[str, EventHandler]],
+        queue_name: str = EVENT_QUEUE,
+        prefetch: int = CONSUMER_PREFETCH,
+        concurrency: int = CONSUMER_CONCURRENCY,
+        ack_batch_size: int = CONSUMER_ACK_BATCH_SIZE,
+        ack_interval: float = CONSUMER_ACK_INTERVAL,
+        retry_delays: Sequence[float] = CONSUMER_RETRY_DELAYS,
+    ):
+        self._handlers = list(handlers)
+        self._queue_name = queue_name
+        self._prefetch = prefetch
+        self._slots = asyncio.Semaphore(concurrency)
+        # a batch larger than the prefetch window would never fill up
+        self._ack_batch_size = max(1, min(ack_batch_size, prefetch))
+        self._ack_interval = ack_interval
+        self._retry_delays = list(retry_delays)
+        self._channel: Optional[Any] = None
+        self._queue: Optional[Any] = None
+        self._consumer_tag: Optional[str] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._flusher: Optional[asyncio.Task] = None
+        # deliveries in arrival order, with whether each one was settled and
+        # whether it still needs the (batched) ack
+        self._unsettled: Deque[List[Any]] = deque()
+        self._ready = 0
+        self._logger = logging.getLogger("invoicing.consumer")
+
+    async def start(self, connection: Any) -> None:
+        """Declare the topology on a new channel of `connection` and start consuming."""
+        from aio_pika import ExchangeType
+
+        channel = await connection.channel()
+        await channel.set_qos(prefetch_count=self._prefetch)
+        exchange = await channel.declare_exchange(EXCHANGE_NAME, ExchangeType.TOPIC)
+        dead_letters = await channel.declare_exchange(f"{EXCHANGE_NAME}.dlx", ExchangeType.FANOUT, durable=True)
+        dead_queue = await channel.declare_queue(f"{self._queue_name}.dead", durable=True)
+        await dead_queue.bind(dead_letters)
+        queue = await channel.declare_queue(
+            self._queue_name,
+            durable=True,
+            arguments={"x-dead-letter-exchange": f"{EXCHANGE_NAME}.dlx"},
+        )
+        for pattern in dict.fromkeys(pattern for pattern, _ in self._handlers):
+            await queue.bind(exchange, routing_key=pattern)
+        for attempt, delay in enumerate(self._retry_delays, start=1):
+            # per-queue TTL: every message in it waits the same time, so
+            # none is held back behind a longer delay
+            await channel.declare_queue(
+                f"{self._queue_name}.retry.{attempt}",
+                durable=True,
+                arguments={"x-message-ttl": int(delay * 1000), "x-dead-letter-exchange": "", "x-dead-letter-routing-key": self._queue_name},
+            )
+        self._channel, self._queue = channel, queue
+        self._flusher = asyncio.get_running_loop().create_task(self._flush_periodically())
+        self._consumer_tag = await queue.consume(self._on_message)
+
+    async def stop(self) -> None:
+        """Stop consuming, finish in-flight messages and send the pending acks."""
+        if self._queue is not None and self._consumer_tag is not None:
+            await self._queue.cancel(self._consumer_tag)
+        self._consumer_tag = None
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        flusher, self._flusher = self._flusher, None
+        if flusher is not None:
+            flusher.cancel()
+            try:
+                await flusher
+            except asyncio.CancelledError:
+                pass
+        await self._flush()
+        channel, self._channel, self._queue = self._channel, None, None
+        if channel is not None:
+            await channel.close()
+
+    async def _on_message(self, message: Any) -> None:
+        entry = [message, False, False]
+        self._unsettled.append(entry)
+        await self._slots.acquire()
+        task = asyncio.get_running_loop().create_task(self._process(entry))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _process(self, entry: List[Any]) -> None:
+        try:
+            needs_ack = await self._handle(entry[0])
+        except Exception as exc:
+            # settling failed; the broker redelivers once the channel closes
+            self._logger.warning("settling %s message failed: %s", entry[0].routing_key, exc)
+            needs_ack = False
+        finally:
+            self._slots.release()
+        entry[1], entry[2] = True, needs_ack
+        if needs_ack:
+            self._ready += 1
+            if self._ready >= self._ack_batch_size:
+                try:
+                    await self._flush()
+                except Exception as exc:
+                    self._logger.warning("batched ack failed: %s", exc)
+
+    async def _handle(self, message: Any) -> bool:
+        """Run the matching handlers; False when the message was rejected or requeued instead.
+
+        A message scheduled for a retry needs the ack too: its copy waits in
+        a retry queue.
+        """
+        headers = message.headers or {}
+        routing_key = headers.get(ROUTING_KEY_HEADER, message.routing_key)
+        try:
+            payload = json.loads(message.body)
+        except ValueError:
+            self._logger.error("dead-lettering undecodable %s message", routing_key)
+            await message.reject(requeue=False)
+            return False
+        try:
+            for pattern, handler in self._handlers:
+                if topic_matches(pattern, routing_key):
+                    await handler(routing_key, payload)
+        except Exception as exc:
+            attempts = int(headers.get(ATTEMPTS_HEADER, 0)) + 1
+            if attempts > len(self._retry_delays):
+                self._logger.error("dead-lettering %s message after %d attempts: %s", routing_key, attempts, exc)
+                await message.reject(requeue=False)
+                return False
+            self._logger.warning("retrying %s message in %ss (attempt %d): %s", routing_key, self._retry_delays[attempts - 1], attempts, exc)
+            try:
+                await self._schedule_retry(message, routing_key, attempts)
+            except Exception as publish_exc:
+                self._logger.warning("scheduling a retry failed, requeueing: %s", publish_exc)
+                await message.nack(requeue=True)
+                return False
+        return True
+
+    async def _schedule_retry(self, message: Any, routing_key: str, attempts: int) -> None:
+        from aio_pika import DeliveryMode, Message
+
+        retry = Message(
+            message.body,
+            headers={**(message.headers or {}), ATTEMPTS_HEADER: attempts, ROUTING_KEY_HEADER: routing_key},
+            content_type=message.content_type,
+            message_id=message.message_id,
+            delivery_mode=DeliveryMode.PERSISTENT,
+        )
+        if self._channel is None:
+            raise RuntimeError("Consumer is not started")
+        await self._channel.default_exchange.publish(retry, routing_key=f"{self._queue_name}.retry.{attempts}")
+
+    async def _flush(self) -> None:
+        """Ack every handled message up to the first one still in flight."""
+        last = None
+        while self._unsettled and self._unsettled[0][1]:
+            message, _, needs_ack = self._unsettled.popleft()
+            if needs_ack:
+                last = message
+                self._ready -= 1
+        if last is not None:
+            # settles `last` and every earlier delivery still unacknowledged
+            await last.ack(multiple=True)
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self._ack_interval)
+            try:
+                await self._flush()
+            except Exception as exc:
+                self._logger.warning("batched ack failed: %s", exc)
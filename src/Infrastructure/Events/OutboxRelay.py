@@ -0,0 +1,154 @@
+import os
+import json
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+
+from sqlalchemy import select, update, delete, or_
+
+from src.Application.Ports.Events import EventPublisherPort
+from src.Infrastructure.Db import AsyncSessionLocal, OutboxModel
+from src.Infrastructure.Events.EventPublisher import event_publisher
+
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "500"))
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", "0.5"))
+# a claimed batch not marked sent within this many seconds (its relay died
+# mid-publish) is claimed again by the next pass
+OUTBOX_LEASE_SECONDS = float(os.getenv("OUTBOX_LEASE_SECONDS", "30"))
+# sent rows are kept this long (for inspection and replays), then purged
+OUTBOX_RETENTION_SECONDS = float(os.getenv("OUTBOX_RETENTION_SECONDS", "86400"))
+OUTBOX_PURGE_INTERVAL = float(os.getenv("OUTBOX_PURGE_INTERVAL", "60"))
+
+
+class OutboxRelay:
+    """Background worker draining `outbox_events` to the event publisher.
+
+    Each pass claims up to `batch_size` of the oldest pending rows with a
+    lease (`SKIP LOCKED`, so several API processes can run a relay side by
+    side) and commits the claim, so no row lock is held while publishing. The
+    batch is then published as one confirmed batch and marked sent. A failed
+    publish releases the claim; a relay that dies leaves it to expire. Either
+    way the rows are retried, so delivery is at-least-once. Sent rows are
+    purged once older than `retention` seconds.
+    """
+
+    def __init__(
+        self,
+        publisher: EventPublisherPort,
+        batch_size: int = OUTBOX_BATCH_SIZE,
+        poll_interval: float = OUTBOX_POLL_INTERVAL,
+        lease: float = OUTBOX_LEASE_SECONDS,
+        retention: float = OUTBOX_RETENTION_SECONDS,
+        purge_interval: float = OUTBOX_PURGE_INTERVAL,
+    ):
+        self._publisher = publisher
+        self._batch_size = batch_size
+        self._poll_interval = poll_interval
+        self._lease = lease
+        self._retention = retention
+        self._purge_interval = purge_interval
+        self._task: Optional[asyncio.Task] = None
+        self._logger = logging.getLogger("invoicing.outbox")
+
+    async def relay_once(self) -> int:
+        """Publish one batch of pending events; return how many were relayed."""
+        token = uuid4().hex
+        rows = await self._claim(token)
+        if not rows:
+            return 0
+        ids = [row.id for row in rows]
+        try:
+            await self._publisher.publish_batch([(row.routing_key, json.loads(row.payload)) for row in rows])
+        except Exception:
+            await self._finish(ids, token, sent=False)
+            raise
+        await self._finish(ids, token, sent=True)
+        return len(rows)
+
+    async def _claim(self, token: str) -> List[Any]:
+        now = datetime.utcnow()
+        async with AsyncSessionLocal() as session:  # type: ignore
+            async with session.begin():
+                stmt = (
+                    select(OutboxModel.id, OutboxModel.routing_key, OutboxModel.payload)
+                    .where(OutboxModel.sent_at.is_(None), or_(OutboxModel.claimed_until.is_(None), OutboxModel.claimed_until < now))
+                    .order_by(OutboxModel.id)
+                    .limit(self._batch_size)
+                    .with_for_update(skip_locked=True)
+                )
+                rows = (await session.execute(stmt)).all()
+                if rows:
+                    await session.execute(
+                        update(OutboxModel)
+                        .where(OutboxModel.id.in_([row.id for row in rows]))
+                        .values(claim_token=token, claimed_until=now + timedelta(seconds=self._lease))
+                    )
+        return rows
+
+    async def _finish(self, ids: List[int], token: str, sent: bool) -> None:
+        """Mark the claimed rows sent, or release them for the next pass."""
+        values: Dict[str, Any] = {"claim_token": None, "claimed_until": None}
+        if sent:
+            values["sent_at"] = datetime.utcnow()
+        async with AsyncSessionLocal() as session:  # type: ignore
+            async with session.begin():
+                # rows whose lease expired and were claimed again keep the new claim
+                await session.execute(update(OutboxModel).where(OutboxModel.id.in_(ids), OutboxModel.claim_token == token).values(**values))
+
+    async def purge_once(self) -> int:
+        """Delete sent rows older than the retention period, in batches; return how many."""
+        cutoff = datetime.utcnow() - timedelta(seconds=self._retention)
+        total = 0
+        while True:
+            async with AsyncSessionLocal() as session:  # type: ignore
+                async with session.begin():
+                    stmt = select(OutboxModel.id).where(OutboxModel.sent_at < cutoff).order_by(OutboxModel.sent_at, OutboxModel.id).limit(self._batch_size)
+                    ids = list((await session.execute(stmt)).scalars())
+                    if ids:
+                        await session.execute(delete(OutboxModel).where(OutboxModel.id.in_(ids)))
+            total += len(ids)
+            if len(ids) < self._batch_size:
+                return total
+
+    async def run(self) -> None:
+        purged_at = 0.0
+        while True:
+            try:
+                relayed = await self.relay_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                self._logger.warning("outbox relay pass failed: %s", exc)
+                relayed = 0
+            if time.monotonic() - purged_at >= self._purge_interval:
+                purged_at = time.monotonic()
+                try:
+                    await self.purge_once()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as exc:
+                    self._logger.warning("outbox purge failed: %s", exc)
+            # keep draining while there is a backlog; otherwise poll
+            if relayed < self._batch_size:
+                await asyncio.sleep(self._poll_interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+
+# Process-wide relay started by `src/Main.py`; it shares the pooled publisher.
+outbox_relay = OutboxRelay(event_publisher)
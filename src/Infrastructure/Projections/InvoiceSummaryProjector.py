@@ -0,0 +1,78 @@
+from typing import Any, Dict, List, Sequence
+
+from sqlalchemy import select, update, func
+
+from src.Application.Ports.Events import DomainEvent
+from src.Infrastructure.Db import InvoiceModel, InvoiceItemModel, InvoiceSummaryModel
+
+STATUS_EVENTS = {"invoice.issued", "invoice.paid", "invoice.cancelled"}
+ITEM_EVENTS = {"invoice.item.added", "invoice.item.updated", "invoice.item.removed", "invoice.items.changed"}
+
+
+class InvoiceSummaryProjector:
+    """Maintains `invoice_summaries` from the events the command handlers record.
+
+    The repository calls `apply` with the events it writes to the outbox, in
+    the same transaction, so the read model never lags the invoices. Events
+    only say which invoices changed and how: created and item events refresh
+    the row from the just-written invoice tables, status events set the
+    status. Events of one kind are applied with a single set-wise statement.
+    """
+
+    async def apply(self, session: Any, events: Sequence[DomainEvent]) -> None:
+        created: List[str] = []
+        items_changed: List[str] = []
+        statuses: Dict[str, List[str]] = {}
+        for routing_key, payload in events:
+            invoice_id = str(payload.get("invoice_id", ""))
+            if routing_key == "invoice.created":
+                created.append(invoice_id)
+            elif routing_key in ITEM_EVENTS:
+                items_changed.append(invoice_id)
+            elif routing_key in STATUS_EVENTS:
+                statuses.setdefault(str(payload["status"]), []).append(invoice_id)
+        if created:
+            await self._insert(session, created)
+        if items_changed:
+            await self._refresh_items(session, list(dict.fromkeys(items_changed)))
+        for status, ids in statuses.items():
+            summaries = InvoiceSummaryModel.__table__
+            await session.execute(update(summaries).where(summaries.c.id.in_(ids)).values(status=status, updated_at=func.now()))
+
+    @staticmethod
+    async def _insert(session: Any, ids: Sequence[str]) -> None:
+        invoices = InvoiceModel.__table__
+        summaries = InvoiceSummaryModel.__table__
+        source = select(
+            invoices.c.id,
+            invoices.c.customer,
+            invoices.c.status,
+            invoices.c.amount,
+            _item_count(invoices.c.id),
+            invoices.c.invoice_number,
+            invoices.c.created_at,
+            func.now(),
+        ).where(invoices.c.id.in_(ids))
+        columns = ["id", "customer", "status", "amount", "item_count", "invoice_number", "created_at", "updated_at"]
+        # IGNORE: replaying a created event leaves the existing row alone
+        await session.execute(summaries.insert().prefix_with("IGNORE").from_select(columns, source))
+
+    @staticmethod
+    async def _refresh_items(session: Any, ids: Sequence[str]) -> None:
+        invoices = InvoiceModel.__table__
+        summaries = InvoiceSummaryModel.__table__
+        amount = select(invoices.c.amount).where(invoices.c.id == summaries.c.id).scalar_subquery()
+        await session.execute(
+            update(summaries)
+            .where(summaries.c.id.in_(ids))
+            .values(amount=amount, item_count=_item_count(summaries.c.id), updated_at=func.now())
+        )
+
+
+def _item_count(invoice_id: Any) -> Any:
+    items = InvoiceItemModel.__table__
+    return select(func.count()).where(items.c.invoice_id == invoice_id).scalar_subquery()
+
+
+# Shared, stateless projector used by the repositories.
+invoice_summary_projector = InvoiceSummaryProjector()
@@ -0,0 +1,141 @@
+import json
+import logging
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import select, insert, update, delete
+
+from src.Infrastructure.Db import AsyncSessionLocal, IdempotencyKeyModel
+
+Headers = List[Tuple[str, str]]
+
+
+class IdempotencyKeyInProgress(Exception):
+    """Another request with the same key has not finished yet."""
+
+
+class IdempotencyKeyReused(Exception):
+    """The key was used before for a different request."""
+
+
+class IdempotencyClaimLost(Exception):
+    """The request's claim on its key was taken over; its command must not commit."""
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    status_code: int
+    headers: Headers
+    body: bytes
+
+
+@dataclass(frozen=True)
+class Claim:
+    key: str
+    token: str
+    # how long the response is replayed once the command committed
+    ttl: float
+
+
+# The claim of the request being handled, set by `IdempotencyMiddleware`.
+current_claim: ContextVar[Optional[Claim]] = ContextVar("idempotency_claim", default=None)
+
+_logger = logging.getLogger("invoicing.idempotency")
+
+
+async def mark_applied(session: Any) -> None:
+    """Record in `session`'s transaction, before it commits, that the current
+    request's command was applied; no-op outside an idempotent request.
+
+    Raises IdempotencyClaimLost when another request took the key over, so
+    the command rolls back instead of running twice.
+    """
+    claim = current_claim.get()
+    if claim is None:
+        return
+    table = IdempotencyKeyModel.__table__
+    result = await session.execute(
+        update(table)
+        .where(table.c.idempotency_key == claim.key, table.c.claim_token == claim.token, table.c.status_code.is_(None))
+        # kept for the replay window even if the response is never stored
+        .values(applied=True, expires_at=datetime.utcnow() + timedelta(seconds=claim.ttl))
+    )
+    if result.rowcount == 0:
+        raise IdempotencyClaimLost(f"Idempotency-Key '{claim.key}' was taken over by another request")
+
+
+class IdempotencyRepository:
+    """Claims idempotency keys and keeps the responses sent for them.
+
+    `claim` inserts a pending row owned by `token` and returns None, or
+    returns the stored response of a finished request with the same key. A
+    pending claim that expired is taken over only when its command never
+    committed (`mark_applied`). `complete` stores the response for `ttl`;
+    `release` forgets a claim whose command was not applied, so the request
+    can be retried. Both only act while `token` still owns the key.
+    """
+
+    async def claim(self, key: str, fingerprint: str, token: str, lock_seconds: float) -> Optional[StoredResponse]:
+        table = IdempotencyKeyModel.__table__
+        now = datetime.utcnow()
+        pending = {"fingerprint": fingerprint, "claim_token": token, "applied": False, "status_code": None, "headers": None, "body": None, "expires_at": now + timedelta(seconds=lock_seconds)}
+        async with AsyncSessionLocal() as session:  # type: ignore
+            async with session.begin():
+                inserted = await session.execute(insert(table).prefix_with("IGNORE").values(idempotency_key=key, **pending))
+                if inserted.rowcount == 1:
+                    return None
+                row = (await session.execute(select(table).where(table.c.idempotency_key == key).with_for_update())).first()
+                if row is None:
+                    # swept in the meantime
+                    await session.execute(insert(table).values(idempotency_key=key, **pending))
+                    return None
+                if row.expires_at <= now and (row.status_code is not None or row.applied):
+                    # past its replay window: a new request
+                    await session.execute(update(table).where(table.c.idempotency_key == key).values(**pending))
+                    return None
+                if row.fingerprint != fingerprint:
+                    raise IdempotencyKeyReused(f"Idempotency-Key '{key}' was used for a different request")
+                if row.status_code is not None:
+                    return StoredResponse(row.status_code, [tuple(pair) for pair in json.loads(row.headers or "[]")], row.body or b"")
+                if row.applied or row.expires_at > now:
+                    raise IdempotencyKeyInProgress(f"A request with Idempotency-Key '{key}' is still in progress")
+                # abandoned before its command committed; the new token keeps
+                # the old request from committing it now
+                _logger.warning("taking over abandoned Idempotency-Key '%s'", key)
+                await session.execute(update(table).where(table.c.idempotency_key == key).values(**pending))
+                return None
+
+    async def complete(self, key: str, token: str, response: StoredResponse, ttl: float) -> bool:
+        """Store the response; False when `token` no longer owns the key."""
+        table = IdempotencyKeyModel.__table__
+        async with AsyncSessionLocal() as session:  # type: ignore
+            async with session.begin():
+                result = await session.execute(
+                    update(table)
+                    .where(table.c.idempotency_key == key, table.c.claim_token == token, table.c.status_code.is_(None))
+                    .values(status_code=response.status_code, headers=json.dumps(response.headers), body=response.body, expires_at=datetime.utcnow() + timedelta(seconds=ttl))
+                )
+        return result.rowcount == 1
+
+    async def release(self, key: str, token: str) -> bool:
+        """Forget the claim unless its command was applied; False when kept."""
+        table = IdempotencyKeyModel.__table__
+        async with AsyncSessionLocal() as session:  # type: ignore
+            async with session.begin():
+                result = await session.execute(
+                    delete(table).where(table.c.idempotency_key == key, table.c.claim_token == token, table.c.status_code.is_(None), table.c.applied.is_(False))
+                )
+        return result.rowcount == 1
+
+    async def sweep(self, batch_size: int) -> int:
+        """Delete up to `batch_size` expired keys; return how many."""
+        table = IdempotencyKeyModel.__table__
+        now = datetime.utcnow()
+        async with AsyncSessionLocal() as session:  # type: ignore
+            async with session.begin():
+                keys = list((await session.execute(select(table.c.idempotency_key).where(table.c.expires_at < now).limit(batch_size))).scalars())
+                if keys:
+                    await session.execute(delete(table).where(table.c.idempotency_key.in_(keys), table.c.expires_at < now))
+        return len(keys)
@@ -0,0 +1,26 @@
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+from src.Infrastructure.Db import DATABASE_READ_URL, ReadSessionLocal
+from src.Infrastructure.Repositories.InvoiceRepository import InvoiceRepository
+
+
+class InvoiceReadRepository(InvoiceRepository):
+    """Query-side repository reading from the replica (`DATABASE_READ_URL`).
+
+    Replicas may lag the primary, so callers that must see their own recent
+    writes use `InvoiceRepository` instead. Every write raises RuntimeError.
+    """
+
+    # without a replica configured this reads the primary
+    stale_reads = bool(DATABASE_READ_URL)
+
+    @asynccontextmanager
+    async def _reading(self) -> AsyncIterator[Any]:
+        async with ReadSessionLocal() as session:  # type: ignore
+            yield session
+
+    @asynccontextmanager
+    async def _transaction(self) -> AsyncIterator[Any]:
+        raise RuntimeError("InvoiceReadRepository is read-only")
+        yield
@@ -1,104 +1,667 @@
-from typing import Optional, List, cast
+from typing import Any, Awaitable, Callable, Dict, Optional, List, Mapping, Sequence, Tuple, AsyncIterator, cast
+from contextlib import asynccontextmanager
+from datetime import datetime
 import json
 
-from sqlalchemy import select
+from sqlalchemy import select, insert, update, delete, func, literal, tuple_
+from sqlalchemy.exc import IntegrityError
 
-from src.Infrastructure.Db import AsyncSessionLocal, InvoiceModel
+from src.Infrastructure.Db import AsyncSessionLocal, InvoiceModel, InvoiceItemModel, InvoiceSummaryModel, OutboxModel
 from src.Domain.Invoice.Invoice import Invoice
 from src.Domain.Shared.ValueObject.Money import Money
-from src.Domain.ValueObject.InvoiceStatus import InvoiceStatus
-from src.Domain.ValueObject.InvoiceId import InvoiceId
-from src.Domain.ValueObject.InvoiceNumber import InvoiceNumber
 from src.Domain.ValueObject.InvoiceItem import InvoiceItem
-from src.Application.Ports.Repositories import InvoiceRepositoryPort
+from src.Application.Ports.Repositories import InvoiceRepositoryPort, ItemChange, OnItemChange, ConcurrencyConflict, TransitionEvent
+from src.Application.Ports.Events import DomainEvent
+from src.Application.Ports.Cache import InvoiceCachePort
+from src.Infrastructure.Projections.InvoiceSummaryProjector import invoice_summary_projector
+
+EXPORT_BATCH_SIZE = 1000
+# MySQL DATE_FORMAT patterns of the report periods
+PERIOD_FORMATS = {"day": "%Y-%m-%d", "month": "%Y-%m", "year": "%Y"}
+
+# invoices written per transaction by save_many / transition_many
+SAVE_MANY_CHUNK_SIZE = 1000
+
+# ids per `WHERE id IN (...)` query of get_many
+GET_MANY_CHUNK_SIZE = 1000
+
+# persisted state of one item row: (description, quantity, unit price in cents, position)
+ItemRow = Tuple[str, int, int, int]
 
 
 class InvoiceRepository(InvoiceRepositoryPort):
-    async def save(self, invoice: Invoice) -> Invoice:
-        async with AsyncSessionLocal() as session:  # type: ignore
-            # invoice.amount is Money, invoice.status is InvoiceStatus, invoice.invoiceNumber is InvoiceNumber
-            id_value: str = str(invoice.id.value)
-            items_json: Optional[str] = None
-            if invoice.items:
-                items_json = json.dumps([it.to_primitive() for it in invoice.items])
-            # prepare concrete primitives for ORM model to avoid Unknown typing
-            customer_val: str = str(invoice.customer)
-            amount_val: float = float(invoice.amount.value)
-            status_val: str = str(invoice.status.value)
-            invoice_number_val: str = str(invoice.invoiceNumber.value)
-            # if exists, update; otherwise create
-            obj: Optional[InvoiceModel] = await session.get(InvoiceModel, id_value)
-            if obj is None:
-                obj = InvoiceModel()
-                obj.id = id_value
-                obj.customer = customer_val
-                obj.amount = amount_val
-                obj.status = status_val
-                obj.invoice_number = invoice_number_val
-                obj.items = items_json
-                session.add(obj)
+    def __init__(self, cache: Optional[InvoiceCachePort] = None, session: Optional[Any] = None, before_commit: Optional[Callable[[Any], Awaitable[None]]] = None) -> None:
+        # cached aggregates are replaced (saves of stored invoices) or
+        # invalidated after every committed write, keyed by the new version
+        self._cache = cache
+        # session of the unit of work this repository is bound to; without
+        # one every call runs in its own session and transaction
+        self._session = session
+        # run with the session inside each of those own transactions, just
+        # before it commits; the caller's hook (a unit of work has its own)
+        self._before_commit = before_commit
+        # ids written in the unit of work -> (version after the write, the
+        # saved aggregate if any), applied to the cache once it commits
+        self._stale: Dict[str, Tuple[int, Optional[Invoice]]] = {}
+        # item rows per invoice id as this repository last saved them, or read
+        # them inside its unit of work (forgotten when that ends); lets save()
+        # write only the rows that changed without re-reading the items.
+        # Plain reads (lists, pages, batch gets) never fill it
+        self._item_rows: Dict[str, Dict[str, ItemRow]] = {}
+
+    async def save(self, invoice: Invoice, reload: bool = False) -> Invoice:
+        """Persist the aggregate and return it.
+
+        Persisted invoices (`invoice.persisted`) are written with a single
+        compare-and-swap UPDATE on `version` (ConcurrencyConflict when another
+        writer got there first), new ones with a single INSERT; only changed
+        item rows are touched. The caller's aggregate is returned
+        as-is, with its version bumped, unless `reload` is set, which re-reads
+        the row to pick up server defaults such as `created_at`.
+        """
+        invoices = InvoiceModel.__table__
+        id_value: str = str(invoice.id)
+        # prepare concrete primitives for the row to avoid Unknown typing
+        values = {
+            "customer": str(invoice.customer),
+            "amount": invoice.amount.to_decimal(),
+            "status": str(invoice.status.value),
+            "invoice_number": str(invoice.invoiceNumber.value),
+        }
+        version = invoice.version
+        updating = invoice.persisted
+        async with self._transaction() as session:
+            if not updating:
+                await session.execute(insert(invoices).values(id=id_value, version=invoice.version, **values))
+                previous: Dict[str, ItemRow] = {}
             else:
-                obj.customer = customer_val
-                obj.amount = amount_val
-                obj.status = status_val
-                obj.invoice_number = invoice_number_val
-                obj.items = items_json
-            await session.commit()
-            await session.refresh(obj)
-            obj = cast(InvoiceModel, obj)
-            items: List[InvoiceItem] = []
-            if obj.items:
-                s: str = str(obj.items)
-                items = [InvoiceItem.from_primitive(d) for d in json.loads(s)]
-            id_val: str = str(obj.id)
-            customer_val_db: str = str(obj.customer)
-            amount_val_db: float = float(obj.amount)
-            status_val_db: str = str(obj.status)
-            invoice_number_val_db: str = str(obj.invoice_number)
-            return Invoice(id=InvoiceId(id_val), customer=customer_val_db, amount=Money(amount_val_db), status=InvoiceStatus(status_val_db), invoiceNumber=InvoiceNumber(invoice_number_val_db), items=items)
+                result = await session.execute(
+                    update(invoices)
+                    .where(invoices.c.id == id_value, invoices.c.version == invoice.version)
+                    .values(version=invoices.c.version + 1, **values)
+                )
+                if result.rowcount == 0:
+                    # nothing written yet; the transaction gets rolled back
+                    self._item_rows.pop(id_value, None)
+                    raise ConcurrencyConflict(f"Invoice {id_value} was modified concurrently")
+                version += 1
+                known = self._item_rows.get(id_value)
+                # loaded elsewhere (cache, another repository): read the rows
+                # under the version just claimed
+                previous = known if known is not None else await self._load_item_rows(session, id_value)
+            rows = await self._write_item_changes(session, id_value, invoice.items, previous)
+            await self._write_events(session, invoice.pull_events())
+        invoice.version = version
+        invoice.persisted = True
+        # a new invoice's created_at is the database's, so only updates are
+        # written through to the cache
+        await self._invalidate(id_value, version, invoice if updating else None)
+        self._item_rows[id_value] = rows
+        if not reload:
+            return invoice
+        async with self._reading() as session:
+            obj: Optional[InvoiceModel] = await session.get(InvoiceModel, id_value, populate_existing=True)
+            return self._to_invoice(cast(InvoiceModel, obj), list(invoice.items))
 
-    async def get(self, invoice_id: str) -> Optional[Invoice]:
+    async def save_many(self, invoices: Sequence[Invoice]) -> List[Optional[str]]:
+        """Insert new invoices with multi-row INSERTs, one transaction per chunk.
+
+        Invoice numbers already taken are reported instead of aborting the
+        chunk; if a concurrent writer takes one between the check and the
+        INSERT, the chunk is retried invoice by invoice.
+        """
+        errors: List[Optional[str]] = []
+        for start in range(0, len(invoices), SAVE_MANY_CHUNK_SIZE):
+            chunk = invoices[start:start + SAVE_MANY_CHUNK_SIZE]
+            try:
+                errors.extend(await self._insert_chunk(chunk))
+            except IntegrityError:
+                for invoice in chunk:
+                    try:
+                        errors.extend(await self._insert_chunk([invoice]))
+                    except IntegrityError:
+                        errors.append(f"Invoice number '{invoice.invoiceNumber.value}' already exists")
+        return errors
+
+    async def _insert_chunk(self, chunk: Sequence[Invoice]) -> List[Optional[str]]:
+        invoices = InvoiceModel.__table__
+        numbers = [str(inv.invoiceNumber.value) for inv in chunk]
+        async with self._transaction() as session:
+            taken = set((await session.execute(select(invoices.c.invoice_number).where(invoices.c.invoice_number.in_(numbers)))).scalars())
+            errors: List[Optional[str]] = [f"Invoice number '{number}' already exists" if number in taken else None for number in numbers]
+            fresh = [inv for inv, error in zip(chunk, errors) if error is None]
+            if fresh:
+                await self._insert_invoices(session, fresh)
+        # committed: the rows and outbox events are now owned by the database
+        for inv in fresh:
+            inv.pending_events.clear()
+            inv.persisted = True
+        return errors
+
+    async def _insert_invoices(self, session: Any, fresh: Sequence[Invoice]) -> None:
+        invoice_rows = [
+            {
+                "id": str(inv.id),
+                "customer": str(inv.customer),
+                "amount": inv.amount.to_decimal(),
+                "status": str(inv.status.value),
+                "invoice_number": str(inv.invoiceNumber.value),
+                "version": inv.version,
+            }
+            for inv in fresh
+        ]
+        item_rows = [
+            {"invoice_id": str(inv.id), "product_id": it.product_id, "description": it.description, "quantity": int(it.quantity), "unit_price": it.unit_price.to_decimal(), "position": position}
+            for inv in fresh
+            for position, it in enumerate(inv.items)
+        ]
+        await session.execute(insert(InvoiceModel.__table__), invoice_rows)
+        if item_rows:
+            await session.execute(insert(InvoiceItemModel.__table__), item_rows)
+        # events are copied rather than pulled so a rolled back chunk keeps them
+        await self._write_events(session, [event for inv in fresh for event in inv.pending_events])
+
+    async def transition_many(self, action: str, invoice_ids: Sequence[str], event: TransitionEvent) -> Tuple[Dict[str, Optional[str]], List[DomainEvent]]:
+        """Move invoices with one guarded UPDATE per chunk.
+
+        The chunk's rows are locked and read first so every id gets an
+        outcome (MySQL has no UPDATE ... RETURNING); the UPDATE still carries
+        the `status IN (...)` guard. Events go to the outbox in the same
+        transaction, so none are returned.
+        """
+        invoices = InvoiceModel.__table__
+        allowed, target = Invoice.TRANSITIONS[action]
+        outcomes: Dict[str, Optional[str]] = {}
+        for start in range(0, len(invoice_ids), SAVE_MANY_CHUNK_SIZE):
+            chunk = invoice_ids[start:start + SAVE_MANY_CHUNK_SIZE]
+            async with self._transaction() as session:
+                rows = (await session.execute(select(invoices.c.id, invoices.c.status, invoices.c.version).where(invoices.c.id.in_(chunk)).with_for_update())).all()
+                current = {str(row.id): str(row.status) for row in rows}
+                versions = {str(row.id): int(row.version) for row in rows}
+                moved = [invoice_id for invoice_id in chunk if current.get(invoice_id) in allowed]
+                if moved:
+                    await session.execute(
+                        update(invoices)
+                        .where(invoices.c.id.in_(moved), invoices.c.status.in_(allowed))
+                        .values(status=target, version=invoices.c.version + 1)
+                    )
+                    await self._write_events(session, [event(invoice_id, target) for invoice_id in moved])
+            for invoice_id in chunk:
+                status = current.get(invoice_id)
+                outcomes[invoice_id] = "Invoice not found" if status is None else Invoice.transition_error(action, status)
+            for invoice_id in moved:
+                await self._invalidate(invoice_id, versions[invoice_id] + 1)
+        return outcomes, []
+
+    async def list_ids(
+        self,
+        statuses: Sequence[str],
+        customer: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        limit: Optional[int] = None,
+    ) -> List[str]:
+        stmt = select(InvoiceModel.id).where(InvoiceModel.status.in_(statuses)).order_by(InvoiceModel.created_at, InvoiceModel.id)
+        if customer is not None:
+            stmt = stmt.where(InvoiceModel.customer == customer)
+        if created_from is not None:
+            stmt = stmt.where(InvoiceModel.created_at >= created_from)
+        if created_to is not None:
+            stmt = stmt.where(InvoiceModel.created_at < created_to)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        async with self._reading() as session:
+            return [str(invoice_id) for invoice_id in (await session.execute(stmt)).scalars()]
+
+    async def get_version(self, invoice_id: str, lock: bool = False) -> Optional[int]:
+        invoices = InvoiceModel.__table__
+        stmt = select(invoices.c.version).where(invoices.c.id == invoice_id)
+        if lock:
+            async with self._transaction() as session:
+                return (await session.execute(stmt.with_for_update())).scalar()
+        async with self._reading() as session:
+            return (await session.execute(stmt)).scalar()
+
+    # Item edits: the guarded item statement plus one UPDATE applying the
+    # amount delta in SQL, then a single-row read of the new totals; the
+    # invoice's lines are never reloaded.
+
+    async def add_item(self, invoice_id: str, item: InvoiceItem, on_change: OnItemChange = None) -> ItemChange:
+        items = InvoiceItemModel.__table__
+        invoices = InvoiceModel.__table__
+        # INSERT ... SELECT guarded by the draft status in the WHERE clause; the
+        # new row is positioned after the invoice's last item
+        next_position = (
+            select(func.coalesce(func.max(items.c.position), -1) + 1)
+            .where(items.c.invoice_id == invoice_id)
+            .scalar_subquery()
+        )
+        source = select(
+            invoices.c.id,
+            literal(item.product_id),
+            literal(item.description),
+            literal(int(item.quantity)),
+            literal(item.unit_price.to_decimal()),
+            next_position,
+        ).where(invoices.c.id == invoice_id, invoices.c.status == "draft")
+        stmt = insert(items).from_select(["invoice_id", "product_id", "description", "quantity", "unit_price", "position"], source)
+        delta = (item.unit_price * int(item.quantity)).to_decimal()
+        async with self._transaction() as session:
+            try:
+                result = await session.execute(stmt)
+            except IntegrityError:
+                raise ValueError(f"Item '{item.product_id}' already exists")
+            if result.rowcount == 0:
+                raise await self._item_change_error(session, invoice_id, "Can only add items when invoice is in draft status")
+            await session.execute(
+                update(invoices).where(invoices.c.id == invoice_id).values(amount=invoices.c.amount + delta, version=invoices.c.version + 1)
+            )
+            change = await self._finish_item_change(session, invoice_id, on_change)
+        await self._invalidate(invoice_id, change.version)
+        return change
+
+    async def update_item_quantity(self, invoice_id: str, product_id: str, quantity: int, on_change: OnItemChange = None) -> ItemChange:
+        if quantity <= 0:
+            raise ValueError("quantity must be positive")
+        items = InvoiceItemModel.__table__
+        # applied before the line changes, while it still holds the old quantity
+        delta = self._line_amount(invoice_id, product_id, (literal(int(quantity)) - items.c.quantity) * items.c.unit_price)
+        async with self._transaction() as session:
+            await self._apply_amount_delta(session, invoice_id, delta, "Can only modify items when invoice is in draft status")
+            result = await session.execute(
+                update(items).where(items.c.invoice_id == invoice_id, items.c.product_id == product_id).values(quantity=quantity)
+            )
+            if result.rowcount == 0:
+                # the amount UPDATE is rolled back with the transaction
+                raise ValueError("Item not found")
+            change = await self._finish_item_change(session, invoice_id, on_change)
+        await self._invalidate(invoice_id, change.version)
+        return change
+
+    async def remove_item(self, invoice_id: str, product_id: str, on_change: OnItemChange = None) -> ItemChange:
+        items = InvoiceItemModel.__table__
+        delta = self._line_amount(invoice_id, product_id, -(items.c.quantity * items.c.unit_price))
+        async with self._transaction() as session:
+            await self._apply_amount_delta(session, invoice_id, delta, "Can only remove items when invoice is in draft status")
+            result = await session.execute(delete(items).where(items.c.invoice_id == invoice_id, items.c.product_id == product_id))
+            if result.rowcount == 0:
+                raise ValueError("Item not found")
+            change = await self._finish_item_change(session, invoice_id, on_change)
+        await self._invalidate(invoice_id, change.version)
+        return change
+
+    @asynccontextmanager
+    async def _transaction(self) -> AsyncIterator[Any]:
+        """Session for a write: the unit of work's (committed by its owner) or a new, self-committing one."""
+        if self._session is not None:
+            yield self._session
+            return
+        async with AsyncSessionLocal() as session:  # type: ignore
+            async with session.begin():
+                yield session
+                if self._before_commit is not None:
+                    await self._before_commit(session)
+
+    @asynccontextmanager
+    async def _reading(self) -> AsyncIterator[Any]:
+        if self._session is not None:
+            yield self._session
+            return
         async with AsyncSessionLocal() as session:  # type: ignore
-            obj: Optional[InvoiceModel] = await session.get(InvoiceModel, invoice_id)
+            yield session
+
+    async def on_commit(self) -> None:
+        """Called by the unit of work after its transaction committed."""
+        stale, self._stale = self._stale, {}
+        self._item_rows.clear()
+        for invoice_id, (version, invoice) in stale.items():
+            # an aggregate changed again after its last save is not cached
+            await self._refresh(invoice_id, version, invoice if invoice is not None and invoice.version == version else None)
+
+    def on_rollback(self) -> None:
+        """Called by the unit of work after its transaction rolled back."""
+        # nothing written in the transaction exists any more
+        self._stale.clear()
+        self._item_rows.clear()
+
+    async def _invalidate(self, invoice_id: str, version: int, invoice: Optional[Invoice] = None) -> None:
+        if self._session is not None:
+            self._stale[invoice_id] = (version, invoice)
+        else:
+            await self._refresh(invoice_id, version, invoice)
+
+    async def _refresh(self, invoice_id: str, version: int, invoice: Optional[Invoice]) -> None:
+        """Put the committed state in the cache, or keep older copies out of it."""
+        if self._cache is None:
+            return
+        if invoice is not None:
+            await self._cache.set(invoice)
+        else:
+            await self._cache.invalidate(invoice_id, version)
+
+    @staticmethod
+    async def _item_change_error(session: Any, invoice_id: str, not_draft_message: str) -> ValueError:
+        """Explain why a guarded item statement matched no row."""
+        invoices = InvoiceModel.__table__
+        status = (await session.execute(select(invoices.c.status).where(invoices.c.id == invoice_id))).scalar()
+        if status is None:
+            return ValueError("Invoice not found")
+        if status != "draft":
+            return ValueError(not_draft_message)
+        return ValueError("Item not found")
+
+    @staticmethod
+    def _line_amount(invoice_id: str, product_id: str, expression: Any) -> Any:
+        """Scalar subquery of `expression` over one item row (0 when there is none)."""
+        items = InvoiceItemModel.__table__
+        return func.coalesce(
+            select(expression).where(items.c.invoice_id == invoice_id, items.c.product_id == product_id).scalar_subquery(),
+            0,
+        )
+
+    async def _apply_amount_delta(self, session: Any, invoice_id: str, delta: Any, not_draft_message: str) -> None:
+        """Add `delta` to a draft invoice's amount and bump its version."""
+        invoices = InvoiceModel.__table__
+        result = await session.execute(
+            update(invoices)
+            .where(invoices.c.id == invoice_id, invoices.c.status == "draft")
+            .values(amount=invoices.c.amount + delta, version=invoices.c.version + 1)
+        )
+        if result.rowcount == 0:
+            raise await self._item_change_error(session, invoice_id, not_draft_message)
+
+    async def _finish_item_change(self, session: Any, invoice_id: str, on_change: OnItemChange) -> ItemChange:
+        """Read the new totals of the invoice and write the change's events."""
+        invoices = InvoiceModel.__table__
+        items = InvoiceItemModel.__table__
+        count = select(func.count()).where(items.c.invoice_id == invoice_id).scalar_subquery()
+        row = (await session.execute(select(invoices.c.version, invoices.c.amount, count).where(invoices.c.id == invoice_id))).one()
+        # the item rows this repository remembered no longer match
+        self._item_rows.pop(invoice_id, None)
+        change = ItemChange(invoice_id, int(row[0]), Money.from_stored(row[1]), int(row[2]))
+        if on_change is not None:
+            on_change(change)
+        await self._write_events(session, change.pull_events())
+        return change
+
+    @staticmethod
+    async def _write_events(session: Any, events: Sequence[DomainEvent]) -> None:
+        """Append events to the outbox and apply them to the read model, in the caller's transaction."""
+        if not events:
+            return
+        # transactional outbox: recorded events commit atomically with the invoice
+        await session.execute(insert(OutboxModel.__table__), [{"routing_key": routing_key, "payload": json.dumps(payload)} for routing_key, payload in events])
+        await invoice_summary_projector.apply(session, events)
+
+    async def get(self, invoice_id: str) -> Optional[Invoice]:
+        async with self._reading() as session:
+            obj: Optional[InvoiceModel] = await session.get(InvoiceModel, invoice_id, populate_existing=True)
             if obj is None:
                 return None
-            obj = cast(InvoiceModel, obj)
-            items: List[InvoiceItem] = []
-            if obj.items:
-                s: str = str(obj.items)
-                items = [InvoiceItem.from_primitive(d) for d in json.loads(s)]
-            id_val: str = str(obj.id)
-            customer_val_db: str = str(obj.customer)
-            amount_val_db: float = float(obj.amount)
-            status_val_db: str = str(obj.status)
-            invoice_number_val_db: str = str(obj.invoice_number)
-            return Invoice(id=InvoiceId(id_val), customer=customer_val_db, amount=Money(amount_val_db), status=InvoiceStatus(status_val_db), invoiceNumber=InvoiceNumber(invoice_number_val_db), items=items)
+            # inside a unit of work the aggregate is usually saved next; keep
+            # its item rows to diff against until the transaction ends
+            items = await self._load_items(session, [invoice_id], self._item_rows if self._session is not None else None)
+            return self._to_invoice(cast(InvoiceModel, obj), items.get(invoice_id, []))
+
+    async def get_summary(self, invoice_id: str) -> Optional[Mapping[str, Any]]:
+        # one primary key lookup on the read model; the version comes from the
+        # invoice row, which the same transactions write
+        summaries = InvoiceSummaryModel.__table__
+        invoices = InvoiceModel.__table__
+        stmt = select(summaries, invoices.c.version).join(invoices, invoices.c.id == summaries.c.id).where(summaries.c.id == invoice_id)
+        async with self._reading() as session:
+            return (await session.execute(stmt)).mappings().first()
+
+    async def get_many(self, invoice_ids: Sequence[str]) -> List[Optional[Invoice]]:
+        """Load invoices with one invoice and one item query per chunk of ids."""
+        unique = list(dict.fromkeys(invoice_ids))
+        found: Dict[str, Invoice] = {}
+        async with self._reading() as session:
+            for start in range(0, len(unique), GET_MANY_CHUNK_SIZE):
+                chunk = unique[start:start + GET_MANY_CHUNK_SIZE]
+                result = await session.execute(
+                    select(InvoiceModel).where(InvoiceModel.id.in_(chunk)).execution_options(populate_existing=True)
+                )
+                objs: List[InvoiceModel] = result.scalars().all()
+                items = await self._load_items(session, [str(obj.id) for obj in objs])
+                for obj in objs:
+                    found[str(obj.id)] = self._to_invoice(obj, items.get(str(obj.id), []))
+        return [found.get(invoice_id) for invoice_id in invoice_ids]
 
     async def list_all(self) -> List[Invoice]:
-        async with AsyncSessionLocal() as session:  # type: ignore
+        async with self._reading() as session:
             result = await session.execute(select(InvoiceModel))
             objs: List[InvoiceModel] = result.scalars().all()
-            invoices: List[Invoice] = []
-            for obj in objs:
-                obj = cast(InvoiceModel, obj)
-                items: List[InvoiceItem] = []
-                if obj.items:
-                    s: str = str(obj.items)
-                    items = [InvoiceItem.from_primitive(d) for d in json.loads(s)]
-                id_val: str = str(obj.id)
-                customer_val_db: str = str(obj.customer)
-                amount_val_db: float = float(obj.amount)
-                status_val_db: str = str(obj.status)
-                invoice_number_val_db: str = str(obj.invoice_number)
-                invoices.append(
-                    Invoice(
-                        id=InvoiceId(id_val),
-                        customer=customer_val_db,
-                        amount=Money(amount_val_db),
-                        status=InvoiceStatus(status_val_db),
-                        invoiceNumber=InvoiceNumber(invoice_number_val_db),
-                        items=items,
-                    )
+            items = await self._load_items(session, [str(obj.id) for obj in objs])
+            return [self._to_invoice(obj, items.get(str(obj.id), [])) for obj in objs]
+
+    async def iter_page(
+        self,
+        limit: int,
+        after: Optional[Tuple[datetime, str]] = None,
+        status: Optional[str] = None,
+        customer: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ) -> AsyncIterator[Invoice]:
+        # newest first; keyset on (created_at, id) so deep pages cost the same
+        # as the first one (served by ix_invoices_created_at_id)
+        stmt = select(InvoiceModel).order_by(InvoiceModel.created_at.desc(), InvoiceModel.id.desc()).limit(limit)
+        if after is not None:
+            stmt = stmt.where(tuple_(InvoiceModel.created_at, InvoiceModel.id) < tuple_(after[0], after[1]))
+        if status is not None:
+            stmt = stmt.where(InvoiceModel.status == status)
+        if customer is not None:
+            stmt = stmt.where(InvoiceModel.customer == customer)
+        if created_from is not None:
+            stmt = stmt.where(InvoiceModel.created_at >= created_from)
+        if created_to is not None:
+            stmt = stmt.where(InvoiceModel.created_at < created_to)
+        async with self._reading() as session:
+            objs: List[InvoiceModel] = (await session.execute(stmt)).scalars().all()
+            # one IN query for the items of the whole page
+            items = await self._load_items(session, [str(obj.id) for obj in objs])
+        for obj in objs:
+            yield self._to_invoice(obj, items.get(str(obj.id), []))
+
+    async def iter_summaries(
+        self,
+        limit: int,
+        after: Optional[Tuple[datetime, str]] = None,
+        status: Optional[str] = None,
+        customer: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ) -> AsyncIterator[Mapping[str, Any]]:
+        # a single range scan of one invoice_summaries index: (status|customer,)
+        # created_at, id; rows are returned as-is, no aggregates are built
+        summaries = InvoiceSummaryModel.__table__
+        stmt = select(summaries).order_by(summaries.c.created_at.desc(), summaries.c.id.desc()).limit(limit)
+        if after is not None:
+            stmt = stmt.where(tuple_(summaries.c.created_at, summaries.c.id) < tuple_(after[0], after[1]))
+        if status is not None:
+            stmt = stmt.where(summaries.c.status == status)
+        if customer is not None:
+            stmt = stmt.where(summaries.c.customer == customer)
+        if created_from is not None:
+            stmt = stmt.where(summaries.c.created_at >= created_from)
+        if created_to is not None:
+            stmt = stmt.where(summaries.c.created_at < created_to)
+        async with self._reading() as session:
+            rows = (await session.execute(stmt)).mappings().all()
+        for row in rows:
+            yield row
+
+    async def summary_items(self, invoice_ids: Sequence[str]) -> Dict[str, List[Dict[str, Any]]]:
+        # a page's lines in one IN query on the invoice_items primary key
+        lines: Dict[str, List[Dict[str, Any]]] = {}
+        if not invoice_ids:
+            return lines
+        items = InvoiceItemModel.__table__
+        stmt = (
+            select(items.c.invoice_id, items.c.product_id, items.c.description, items.c.quantity, items.c.unit_price)
+            .where(items.c.invoice_id.in_(list(invoice_ids)))
+            .order_by(items.c.invoice_id, items.c.position)
+        )
+        async with self._reading() as session:
+            for line in await session.execute(stmt):
+                lines.setdefault(line.invoice_id, []).append({"productId": line.product_id, "description": line.description, "quantity": line.quantity, "unitPrice": line.unit_price})
+        return lines
+
+    async def report_totals(
+        self,
+        group_by: Sequence[str],
+        period: str = "month",
+        status: Optional[str] = None,
+        customer: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ) -> List[Mapping[str, Any]]:
+        invoices = InvoiceModel.__table__
+        keys: List[Any] = []
+        for field in group_by:
+            if field == "period":
+                keys.append(func.date_format(invoices.c.created_at, PERIOD_FORMATS[period]).label("period"))
+            else:
+                keys.append(invoices.c[field])
+        stmt = select(*keys, func.count().label("count"), func.coalesce(func.sum(invoices.c.amount), 0).label("amount"))
+        if keys:
+            stmt = stmt.group_by(*keys).order_by(*keys)
+        if status is not None:
+            stmt = stmt.where(invoices.c.status == status)
+        if customer is not None:
+            stmt = stmt.where(invoices.c.customer == customer)
+        if created_from is not None:
+            stmt = stmt.where(invoices.c.created_at >= created_from)
+        if created_to is not None:
+            stmt = stmt.where(invoices.c.created_at < created_to)
+        async with self._reading() as session:
+            return [dict(row) for row in (await session.execute(stmt)).mappings()]
+
+    async def iter_export_rows(
+        self,
+        status: Optional[str] = None,
+        customer: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ) -> AsyncIterator[Mapping[str, Any]]:
+        # invoices LEFT JOIN items in (invoice, position) order: consecutive rows
+        # of one invoice are folded into a single export row as they stream by
+        stmt = (
+            select(
+                InvoiceModel.id,
+                InvoiceModel.invoice_number,
+                InvoiceModel.customer,
+                InvoiceModel.status,
+                InvoiceModel.amount,
+                InvoiceModel.created_at,
+                InvoiceItemModel.product_id,
+                InvoiceItemModel.description,
+                InvoiceItemModel.quantity,
+                InvoiceItemModel.unit_price,
+            )
+            .outerjoin(InvoiceItemModel, InvoiceItemModel.invoice_id == InvoiceModel.id)
+            .order_by(InvoiceModel.created_at, InvoiceModel.id, InvoiceItemModel.position)
+        )
+        if status is not None:
+            stmt = stmt.where(InvoiceModel.status == status)
+        if customer is not None:
+            stmt = stmt.where(InvoiceModel.customer == customer)
+        if created_from is not None:
+            stmt = stmt.where(InvoiceModel.created_at >= created_from)
+        if created_to is not None:
+            stmt = stmt.where(InvoiceModel.created_at < created_to)
+        async with self._reading() as session:
+            # server-side cursor: rows are fetched from MySQL in EXPORT_BATCH_SIZE
+            # chunks instead of buffering the whole result set
+            result = await session.stream(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+            current: Optional[Dict[str, Any]] = None
+            async for row in result:
+                if current is None or current["id"] != row.id:
+                    if current is not None:
+                        yield current
+                    current = {
+                        "id": row.id,
+                        "invoice_number": row.invoice_number,
+                        "customer": row.customer,
+                        "status": row.status,
+                        "amount": row.amount,
+                        "created_at": row.created_at,
+                        "items": [],
+                    }
+                if row.product_id is not None:
+                    current["items"].append({"productId": row.product_id, "description": row.description, "quantity": row.quantity, "unitPrice": row.unit_price})
+            if current is not None:
+                yield current
+
+    async def _load_items(self, session: Any, invoice_ids: Sequence[str], item_rows: Optional[Dict[str, Dict[str, ItemRow]]] = None) -> Dict[str, List[InvoiceItem]]:
+        """Load the lines of `invoice_ids`, recording their stored rows in `item_rows` if given."""
+        items: Dict[str, List[InvoiceItem]] = {}
+        if not invoice_ids:
+            return items
+        if item_rows is not None:
+            for invoice_id in invoice_ids:
+                item_rows[invoice_id] = {}
+        table = InvoiceItemModel.__table__
+        # plain rows rather than ORM objects: lines are hydrated straight into
+        # value objects through the trusted constructors
+        stmt = (
+            select(table.c.invoice_id, table.c.product_id, table.c.description, table.c.quantity, table.c.unit_price, table.c.position)
+            .where(table.c.invoice_id.in_(invoice_ids))
+            .order_by(table.c.invoice_id, table.c.position)
+        )
+        for invoice_id, product_id, description, quantity, unit_price, position in (await session.execute(stmt)).all():
+            price = Money.from_stored(unit_price)
+            items.setdefault(invoice_id, []).append(InvoiceItem.from_row(product_id, description, quantity, price))
+            if item_rows is not None:
+                item_rows[invoice_id][product_id] = (description, quantity, price.cents, position)
+        return items
+
+    async def _load_item_rows(self, session: Any, invoice_id: str) -> Dict[str, ItemRow]:
+        item_rows: Dict[str, Dict[str, ItemRow]] = {}
+        await self._load_items(session, [invoice_id], item_rows)
+        return item_rows[invoice_id]
+
+    async def _write_item_changes(self, session: Any, invoice_id: str, items: Sequence[InvoiceItem], previous: Dict[str, ItemRow]) -> Dict[str, ItemRow]:
+        """Insert, update or delete only the item rows that differ from `previous`."""
+        table = InvoiceItemModel.__table__
+        current = {it.product_id for it in items}
+        removed = [product_id for product_id in previous if product_id not in current]
+        if removed:
+            await session.execute(delete(table).where(table.c.invoice_id == invoice_id, table.c.product_id.in_(removed)))
+        next_position = max((row[3] for row in previous.values()), default=-1) + 1
+        rows: Dict[str, ItemRow] = {}
+        added: List[Dict[str, Any]] = []
+        for it in items:
+            values = (it.description, int(it.quantity), it.unit_price.cents)
+            old = previous.get(it.product_id)
+            if old is None:
+                added.append({"invoice_id": invoice_id, "product_id": it.product_id, "description": values[0], "quantity": values[1], "unit_price": it.unit_price.to_decimal(), "position": next_position})
+                rows[it.product_id] = values + (next_position,)
+                next_position += 1
+                continue
+            if old[:3] != values:
+                await session.execute(
+                    update(table)
+                    .where(table.c.invoice_id == invoice_id, table.c.product_id == it.product_id)
+                    .values(description=values[0], quantity=values[1], unit_price=it.unit_price.to_decimal())
                 )
-            return invoices
+            rows[it.product_id] = values + (old[3],)
+        if added:
+            # one multi-row INSERT for all new lines
+            await session.execute(insert(table), added)
+        return rows
 
+    @staticmethod
+    def _to_invoice(obj: InvoiceModel, items: List[InvoiceItem]) -> Invoice:
+        # our own rows: skip re-validation and UUID parsing
+        return Invoice.from_row(
+            id=cast(str, obj.id),
+            customer=cast(str, obj.customer),
+            amount=cast(float, obj.amount),
+            status=cast(str, obj.status),
+            invoice_number=cast(str, obj.invoice_number),
+            created_at=cast(Optional[datetime], obj.created_at),
+            version=cast(int, obj.version or 0),
+            items=items,
+        )
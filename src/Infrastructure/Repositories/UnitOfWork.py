@@ -0,0 +1,34 @@
+from typing import Any, Optional
+
+from src.Application.Ports.Cache import InvoiceCachePort
+from src.Application.Ports.UnitOfWork import UnitOfWork
+from src.Infrastructure.Db import AsyncSessionLocal
+from src.Infrastructure.Repositories.IdempotencyRepository import mark_applied
+from src.Infrastructure.Repositories.InvoiceRepository import InvoiceRepository
+
+
+class SqlAlchemyUnitOfWork(UnitOfWork):
+    """Unit of work over one `AsyncSession`.
+
+    The session checks a connection out of the pool on its first statement
+    and keeps it until commit/rollback; `close()` rolls back anything left
+    uncommitted and releases the session.
+    """
+
+    def __init__(self, cache: Optional[InvoiceCachePort] = None, session_factory: Any = AsyncSessionLocal) -> None:
+        self._session = session_factory()
+        self.invoices: InvoiceRepository = InvoiceRepository(cache=cache, session=self._session)
+
+    async def commit(self) -> None:
+        # an idempotent request's key is marked applied atomically with its command
+        await mark_applied(self._session)
+        await self._session.commit()
+        await self.invoices.on_commit()
+
+    async def rollback(self) -> None:
+        await self._session.rollback()
+        self.invoices.on_rollback()
+
+    async def close(self) -> None:
+        await self._session.close()
+        self.invoices.on_rollback()
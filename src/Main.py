@@ -8,24 +8,44 @@ import logging
 
 from fastapi import FastAPI
 from src.Infrastructure.Adapters.Http import router as api_router
-from src.Infrastructure.Database.Db import init_db, engine
+from src.Infrastructure.Database.Db import init_db, engine, read_engine
+from src.Infrastructure.Adapters.ReadYourWrites import ReadYourWritesMiddleware
+from src.Infrastructure.Adapters.Idempotency import IdempotencyMiddleware, idempotency_store, idempotency_sweeper
+from src.Infrastructure.Events.EventPublisher import event_publisher
+from src.Infrastructure.Events.OutboxRelay import outbox_relay
 
 
 app = FastAPI(title="Invoicing API")
 app.include_router(api_router, prefix="/api")
+app.add_middleware(IdempotencyMiddleware, store=idempotency_store)
+# added last so it wraps replayed responses too
+app.add_middleware(ReadYourWritesMiddleware)
 
 
 @app.on_event("startup")
 async def startup() -> None:
     """Startup event: initialize database tables and other resources."""
     await init_db()
+    await event_publisher.connect()
+    # drain the transactional outbox to RabbitMQ in the background; in test
+    # mode publishing is a no-op, but rows are still marked sent and purged
+    outbox_relay.start()
+    if not event_publisher.test_mode:
+        idempotency_sweeper.start()
 
 
 @app.on_event("shutdown")
 async def shutdown() -> None:
-    """Shutdown event: dispose the SQLAlchemy engine to close connections."""
+    """Shutdown event: close the broker connection and dispose the SQLAlchemy engine."""
+    try:
+        await outbox_relay.stop()
+        await idempotency_sweeper.stop()
+        await event_publisher.close()
+    except Exception as exc:  # log instead of silencing
+        logging.getLogger("invoicing.app").warning("event_publisher.close() failed: %s", exc)
     try:
         # dispose underlying sync engine to close connection pools
         engine.sync_engine.dispose()
+        read_engine.sync_engine.dispose()
     except Exception as exc:  # log instead of silencing
         logging.getLogger("invoicing.app").warning("engine.dispose() failed: %s", exc)
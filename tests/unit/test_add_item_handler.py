@@ -27,5 +27,33 @@ async def test_add_item_handler():
     inv = Invoice(id=InvoiceId(uuid4()), customer="C", amount=Money(0.0), invoiceNumber=InvoiceNumber("INV-200"), items=[])
     await repo.save(inv)
     updated = await addInvoiceItemHandler(str(inv.id.value), "P1", "Prod 1", 2, 5.0, repo=repo)
-    assert len(updated.items) == 1
+    assert updated.items_count == 1
     assert updated.amount.value == 10.0
+    assert len(repo.store[str(inv.id.value)].items) == 1
+
+
+class FakePublisher:
+    def __init__(self):
+        self.published = []
+
+    async def publish(self, topic, payload):
+        self.published.append((topic, payload))
+
+
+@pytest.mark.asyncio
+async def test_add_item_handler_records_event_and_guards_status():
+    from src.Domain.ValueObject.InvoiceStatus import InvoiceStatus
+
+    repo = FakeRepo()
+    pub = FakePublisher()
+    inv = Invoice(id=InvoiceId(uuid4()), customer="C", amount=Money(0.0), invoiceNumber=InvoiceNumber("INV-201"), items=[])
+    await repo.save(inv)
+    await addInvoiceItemHandler(str(inv.id.value), "P1", "Prod 1", 1, 5.0, repo=repo, publisher=pub)
+    assert pub.published == [("invoice.item.added", {"invoice_id": str(inv.id.value), "items_count": 1})]
+
+    issued = Invoice(id=InvoiceId(uuid4()), customer="C", amount=Money(0.0), invoiceNumber=InvoiceNumber("INV-202"), status=InvoiceStatus("issued"))
+    await repo.save(issued)
+    with pytest.raises(ValueError):
+        await addInvoiceItemHandler(str(issued.id.value), "P1", "Prod 1", 1, 5.0, repo=repo, publisher=pub)
+    with pytest.raises(ValueError):
+        await addInvoiceItemHandler("missing", "P1", "Prod 1", 1, 5.0, repo=repo, publisher=pub)
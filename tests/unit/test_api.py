@@ -53,3 +53,29 @@ async def test_create_and_get_invoice():
         assert data.get("invoiceNumber") == invoice_number
     finally:
         await client.__aexit__(None, None, None)
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not _HAS_HTTPX, reason="httpx/httpcore import failed (incompatible Python)")
+async def test_sub_cent_unit_prices_are_rejected():
+    from src.Infrastructure.Adapters.Http import getUnitOfWork
+    app.dependency_overrides[getRepository] = lambda: InMemoryRepo()
+    app.dependency_overrides[getUnitOfWork] = lambda: None
+    app.dependency_overrides[getPublisher] = lambda: DummyPublisher()
+    try:
+        client = AsyncClient(app=app, base_url="http://test")
+    except TypeError:
+        from httpx import ASGITransport
+        client = AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+
+    await client.__aenter__()
+    try:
+        item = {"productId": "P1", "description": "X", "quantity": 1, "unitPrice": 10.005}
+        resp = await client.post("/api/invoices/some-id/items", json=item)
+        assert resp.status_code == 400
+        assert resp.json()["detail"] == "unitPrice must have at most 2 decimals"
+        resp = await client.post("/api/invoices:batchCreate", json=[{"customer": "C", "invoiceNumber": "INV-P1", "items": [item]}])
+        assert resp.status_code == 400
+    finally:
+        await client.__aexit__(None, None, None)
+        app.dependency_overrides.clear()
@@ -0,0 +1,159 @@
+import pytest
+try:
+    from httpx import AsyncClient
+    _HAS_HTTPX = True
+except Exception:
+    _HAS_HTTPX = False
+from src.Main import app
+from src.Infrastructure.Adapters.Http import getRepository, getPublisher
+from src.Infrastructure.Repositories.InvoiceRepository import InvoiceRepository
+from src.Application.Commands.CreateInvoices import createInvoicesHandler
+from src.Application.Ports.Repositories import InvoiceRepositoryPort
+from src.Application.Ports.Events import EventPublisherPort
+
+
+class NumberedRepo(InvoiceRepositoryPort):
+    """Rejects invoice numbers already stored, like the unique key does."""
+
+    def __init__(self, taken=()):
+        self.store = {}
+        self.numbers = set(taken)
+
+    async def save(self, invoice, reload=False):
+        if invoice.invoiceNumber.value in self.numbers:
+            raise ValueError(f"Invoice number '{invoice.invoiceNumber.value}' already exists")
+        self.numbers.add(invoice.invoiceNumber.value)
+        self.store[str(invoice.id.value)] = invoice
+        return invoice
+
+    async def get(self, invoice_id):
+        return self.store.get(invoice_id)
+
+
+class BatchPublisher(EventPublisherPort):
+    def __init__(self):
+        self.batches = []
+
+    async def publish(self, routing_key, payload):
+        raise AssertionError("events must be published as one batch")
+
+    async def publish_batch(self, events):
+        self.batches.append(list(events))
+
+
+@pytest.mark.asyncio
+async def test_batch_create_reports_errors_per_entry_and_publishes_once():
+    repo = NumberedRepo(taken={"INV-OLD"})
+    publisher = BatchPublisher()
+    entries = [
+        {"customer": "A", "invoiceNumber": "INV-B1", "items": [{"productId": "P1", "description": "X", "quantity": 2, "unitPrice": 5.0}]},
+        {"customer": "B", "invoiceNumber": "INV-OLD"},
+        {"customer": "C", "invoiceNumber": "INV-B1"},
+        {"customer": "D", "invoiceNumber": ""},
+        {"customer": "E", "invoiceNumber": "INV-B2"},
+    ]
+    results = await createInvoicesHandler(entries, repo=repo, publisher=publisher)
+
+    created = [inv for inv, _ in results]
+    errors = [err for _, err in results]
+    assert created[0].amount.value == 10.0
+    assert created[4] is not None
+    assert created[1] is None and "already exists" in errors[1]
+    assert created[2] is None and "repeated" in errors[2]
+    assert created[3] is None and errors[3]
+    assert len(repo.store) == 2
+    assert len(publisher.batches) == 1
+    assert [key for key, _ in publisher.batches[0]] == ["invoice.created", "invoice.created"]
+
+
+class Result:
+    def __init__(self, values=()):
+        self.values = values
+
+    def scalars(self):
+        return iter(self.values)
+
+
+class BulkSession:
+    def __init__(self, taken):
+        self.taken = taken
+        self.inserts = []
+
+    async def execute(self, stmt, params=None):
+        if stmt.__visit_name__ == "select":
+            return Result(self.taken)
+        if params is not None:
+            self.inserts.append((stmt.table.name, len(params)))
+        return Result()
+
+    def begin(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.mark.asyncio
+async def test_save_many_uses_multi_row_inserts(monkeypatch):
+    import src.Infrastructure.Repositories.InvoiceRepository as module
+    from src.Application.Commands.CreateInvoices import _build
+
+    session = BulkSession(taken=["INV-S1"])
+    monkeypatch.setattr(module, "AsyncSessionLocal", lambda: session)
+    monkeypatch.setattr(module, "SAVE_MANY_CHUNK_SIZE", 2)
+
+    item = {"productId": "P1", "description": "X", "quantity": 1, "unitPrice": 1.0}
+    invoices = [_build({"customer": "C", "invoiceNumber": f"INV-S{i}", "items": [item]}) for i in range(5)]
+    hooked = []
+
+    async def before_commit(s):
+        hooked.append(len(s.inserts))
+
+    errors = await InvoiceRepository(before_commit=before_commit).save_many(invoices)
+
+    assert errors[1] == "Invoice number 'INV-S1' already exists"
+    assert [e for i, e in enumerate(errors) if i != 1] == [None] * 4
+    # three chunks; the first one has only one fresh invoice
+    assert session.inserts[:3] == [("invoices", 1), ("invoice_items", 1), ("outbox_events", 1)]
+    assert session.inserts[3:6] == [("invoices", 2), ("invoice_items", 2), ("outbox_events", 2)]
+    assert len(session.inserts) == 9
+    assert invoices[0].pending_events == []
+    assert invoices[1].pending_events != []
+    # the caller's hook runs inside every chunk's transaction, after its writes
+    assert hooked == [3, 6, 9]
+
+
+def _client():
+    try:
+        return AsyncClient(app=app, base_url="http://test")
+    except TypeError:
+        from httpx import ASGITransport
+        return AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not _HAS_HTTPX, reason="httpx/httpcore import failed (incompatible Python)")
+async def test_batch_create_endpoint():
+    repo = NumberedRepo(taken={"INV-E0"})
+    app.dependency_overrides[getRepository] = lambda: repo
+    app.dependency_overrides[getPublisher] = lambda: BatchPublisher()
+
+    client = _client()
+    await client.__aenter__()
+    try:
+        body = [
+            {"customer": "A", "invoiceNumber": "INV-E0"},
+            {"customer": "B", "invoiceNumber": "INV-E1", "items": [{"productId": "P1", "description": "X", "quantity": 1, "unitPrice": 3.0}]},
+        ]
+        r = await client.post("/api/invoices:batchCreate", json=body)
+        assert r.status_code == 200
+        data = r.json()
+        assert data[0]["id"] is None and "already exists" in data[0]["error"]
+        assert data[1]["error"] is None
+        assert data[1]["id"] in repo.store
+    finally:
+        await client.__aexit__(None, None, None)
+        app.dependency_overrides.clear()
@@ -0,0 +1,79 @@
+import pytest
+from uuid import uuid4
+try:
+    from httpx import AsyncClient
+    _HAS_HTTPX = True
+except Exception:
+    _HAS_HTTPX = False
+from src.Main import app
+from src.Infrastructure.Adapters.Http import getReadRepository, getCache
+from src.Infrastructure.Cache.InvoiceCache import InMemoryInvoiceCache
+from src.Application.Ports.Repositories import InvoiceRepositoryPort
+from src.Application.Queries.GetInvoice import getInvoicesHandler
+from src.Domain.Invoice.Invoice import Invoice
+from src.Domain.Shared.ValueObject.Money import Money
+from src.Domain.ValueObject.InvoiceId import InvoiceId
+from src.Domain.ValueObject.InvoiceItem import InvoiceItem
+from src.Domain.ValueObject.InvoiceNumber import InvoiceNumber
+
+
+class BatchRepo(InvoiceRepositoryPort):
+    def __init__(self, invoices):
+        self.store = {str(inv.id): inv for inv in invoices}
+        self.batches = []
+
+    async def save(self, invoice, reload=False):
+        return invoice
+
+    async def get(self, invoice_id):
+        raise AssertionError("batch reads must not load invoices one by one")
+
+    async def get_many(self, invoice_ids):
+        self.batches.append(list(invoice_ids))
+        return [self.store.get(invoice_id) for invoice_id in invoice_ids]
+
+
+def _invoice(number):
+    items = [InvoiceItem(product_id="P1", description="X", quantity=2, unit_price=Money(1.5))]
+    return Invoice(id=InvoiceId(uuid4()), customer="C", amount=Money(0), invoiceNumber=InvoiceNumber(number), items=items)
+
+
+@pytest.mark.asyncio
+async def test_handler_loads_cache_misses_in_one_batch():
+    first, second = _invoice("INV-B1"), _invoice("INV-B2")
+    repo = BatchRepo([first, second])
+    cache = InMemoryInvoiceCache()
+    await cache.set(first)
+    missing = str(uuid4())
+
+    invoices = await getInvoicesHandler([str(second.id), missing, str(first.id), str(second.id)], repo=repo, cache=cache)
+
+    assert [inv and inv.invoiceNumber.value for inv in invoices] == ["INV-B2", None, "INV-B1", "INV-B2"]
+    assert repo.batches == [[str(second.id), missing]]
+    assert await cache.get(str(second.id)) is not None
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not _HAS_HTTPX, reason="httpx/httpcore import failed (incompatible Python)")
+async def test_batch_get_returns_request_order_with_not_found_markers():
+    first, second = _invoice("INV-B1"), _invoice("INV-B2")
+    repo = BatchRepo([first, second])
+    app.dependency_overrides[getReadRepository] = lambda: repo
+    app.dependency_overrides[getCache] = lambda: None
+    missing = str(uuid4())
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            r = await ac.post("/api/invoices:batchGet", json={"ids": [str(second.id), missing, str(first.id)]})
+            too_many = await ac.post("/api/invoices:batchGet", json={"ids": ["x"] * 1001})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert r.status_code == 200
+    body = r.json()
+    assert [entry["id"] for entry in body] == [str(second.id), missing, str(first.id)]
+    assert body[0]["invoice"]["invoiceNumber"] == "INV-B2"
+    assert body[0]["invoice"]["items"][0]["unitPrice"] == 1.5
+    assert body[1] == {"id": missing, "invoice": None, "error": "Invoice not found"}
+    assert body[2]["error"] is None
+    assert len(repo.batches) == 1
+    assert too_many.status_code == 400
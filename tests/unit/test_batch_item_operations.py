@@ -0,0 +1,166 @@
+import copy
+import pytest
+from uuid import uuid4
+try:
+    from httpx import AsyncClient
+    _HAS_HTTPX = True
+except Exception:
+    _HAS_HTTPX = False
+
+from src.Main import app
+from src.Infrastructure.Adapters import Http
+from src.Infrastructure.Adapters.Http import getUnitOfWork, getPublisher
+from src.Application.Commands.ApplyItemOperations import applyInvoiceItemOperationsHandler
+from src.Application.Ports.Repositories import ConcurrencyConflict, InvoiceRepositoryPort
+from src.Application.Ports.UnitOfWork import UnitOfWork
+from src.Domain.Invoice.Invoice import Invoice
+from src.Domain.Shared.ValueObject.Money import Money
+from src.Domain.ValueObject.InvoiceId import InvoiceId
+from src.Domain.ValueObject.InvoiceItem import InvoiceItem
+from src.Domain.ValueObject.InvoiceNumber import InvoiceNumber
+from src.Domain.ValueObject.ItemOperation import ItemOperation
+
+
+class FakeRepo(InvoiceRepositoryPort):
+    def __init__(self):
+        self.store = {}
+        self.saves = 0
+
+    async def save(self, invoice: Invoice) -> Invoice:
+        self.saves += 1
+        self.store[str(invoice.id.value)] = invoice
+        return invoice
+
+    async def get(self, invoice_id: str) -> Invoice | None:
+        return self.store.get(invoice_id)
+
+
+class VersionedRepo(FakeRepo):
+    def __init__(self, conflicts=0):
+        super().__init__()
+        self.conflicts = conflicts
+
+    async def save(self, invoice: Invoice) -> Invoice:
+        if self.conflicts:
+            self.conflicts -= 1
+            raise ConcurrencyConflict("Invoice was modified concurrently")
+        invoice.version += 1
+        return await super().save(invoice)
+
+    async def get(self, invoice_id: str) -> Invoice | None:
+        return copy.deepcopy(self.store.get(invoice_id))
+
+    async def get_version(self, invoice_id, lock=False):
+        invoice = self.store.get(invoice_id)
+        return invoice.version if invoice is not None else None
+
+
+class NoopUnitOfWork(UnitOfWork):
+    def __init__(self, invoices):
+        self.invoices = invoices
+
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        pass
+
+
+class NullPublisher:
+    async def publish(self, routing_key, payload):
+        pass
+
+
+def _client():
+    try:
+        return AsyncClient(app=app, base_url="http://test")
+    except TypeError:
+        from httpx import ASGITransport
+        return AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+
+
+def _item(product_id, quantity=1, price=2.0):
+    return InvoiceItem(product_id=product_id, description="X", quantity=quantity, unit_price=Money(price))
+
+
+@pytest.mark.asyncio
+async def test_batch_applies_operations_in_one_save_and_event():
+    repo = FakeRepo()
+    inv = Invoice(id=InvoiceId(uuid4()), customer="C", amount=Money(0.0), invoiceNumber=InvoiceNumber("INV-B1"), items=[_item("OLD")])
+    await repo.save(inv)
+    operations = [ItemOperation.add(_item(f"P{i}")) for i in range(500)] + [ItemOperation.update("P0", 5), ItemOperation.remove("OLD")]
+
+    updated = await applyInvoiceItemOperationsHandler(str(inv.id.value), operations, repo=repo)
+
+    assert repo.saves == 2
+    assert len(updated.items) == 500
+    assert updated.amount == Money(2.0 * 504)
+    events = updated.pull_events()
+    assert [key for key, _ in events] == ["invoice.items.changed"]
+    payload = events[0][1]
+    assert len(payload["added"]) == 500 and payload["updated"] == ["P0"] and payload["removed"] == ["OLD"]
+
+
+@pytest.mark.asyncio
+async def test_batch_is_all_or_nothing():
+    repo = FakeRepo()
+    inv = Invoice(id=InvoiceId(uuid4()), customer="C", amount=Money(0.0), invoiceNumber=InvoiceNumber("INV-B2"), items=[_item("P1")])
+    await repo.save(inv)
+
+    with pytest.raises(ValueError, match="Operation 2"):
+        await applyInvoiceItemOperationsHandler(str(inv.id.value), [ItemOperation.add(_item("P2")), ItemOperation.remove("P1"), ItemOperation.update("P1", 3)], repo=repo)
+
+    assert [it.product_id for it in inv.items] == ["P1"]
+    assert inv.amount == Money(2.0)
+    assert repo.saves == 1
+    # the index was restored with the items
+    inv.update_item_quantity("P1", 2)
+    assert inv.amount == Money(4.0)
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not _HAS_HTTPX, reason="httpx/httpcore import failed (incompatible Python)")
+async def test_batch_items_endpoint(monkeypatch):
+    repo = VersionedRepo()
+    inv = Invoice(id=InvoiceId(uuid4()), customer="C", amount=Money(0.0), invoiceNumber=InvoiceNumber("INV-B3"), items=[_item("P1")], version=2)
+    repo.store[str(inv.id.value)] = inv
+    app.dependency_overrides[getUnitOfWork] = lambda: NoopUnitOfWork(repo)
+    app.dependency_overrides[getPublisher] = lambda: NullPublisher()
+    client = _client()
+    await client.__aenter__()
+    try:
+        url = f"/api/invoices/{inv.id}/items:batch"
+        ops = [
+            {"op": "add", "productId": "P2", "description": "Y", "quantity": 2, "unitPrice": 1.5},
+            {"op": "update", "productId": "P1", "quantity": 3},
+            {"op": "remove", "productId": "P2"},
+        ]
+        r = await client.post(url, json=ops, headers={"If-Match": '"2"'})
+        assert r.status_code == 200 and r.headers["ETag"] == '"3"'
+        assert r.json() == {"id": str(inv.id), "items_count": 1, "amount": 6.0}
+
+        # malformed operations are rejected by the DTOs before anything is loaded
+        assert (await client.post(url, json=[{"op": "add"}])).status_code == 422
+        for bad in (
+            {"op": "add", "productId": "P3", "quantity": 1},
+            {"op": "update", "productId": "P1"},
+            {"op": "rename", "productId": "P1"},
+            {"op": "add", "productId": "P3", "quantity": 1, "unitPrice": 0.125},
+        ):
+            assert (await client.post(url, json=[bad])).status_code == 400
+        # a failing operation rolls back the whole batch
+        r = await client.post(url, json=[ops[0], {"op": "remove", "productId": "P9"}])
+        assert r.status_code == 400
+        monkeypatch.setattr(Http, "BATCH_MAX", 2)
+        assert (await client.post(url, json=ops)).status_code == 400
+        monkeypatch.undo()
+
+        assert (await client.post(f"/api/invoices/{uuid4()}/items:batch", json=ops[1:2])).status_code == 404
+        assert (await client.post(url, json=ops[1:2], headers={"If-Match": '"2"'})).status_code == 412
+        repo.conflicts = 10
+        assert (await client.post(url, json=ops[1:2])).status_code == 409
+
+        assert [it.quantity for it in repo.store[str(inv.id.value)].items] == [3]
+    finally:
+        await client.__aexit__(None, None, None)
+        app.dependency_overrides.clear()
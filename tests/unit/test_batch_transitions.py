@@ -0,0 +1,163 @@
+import pytest
+from uuid import uuid4
+try:
+    from httpx import AsyncClient
+    _HAS_HTTPX = True
+except Exception:
+    _HAS_HTTPX = False
+from src.Main import app
+from src.Infrastructure.Adapters.Http import getRepository, getPublisher
+from src.Infrastructure.Repositories.InvoiceRepository import InvoiceRepository
+from src.Application.Commands.TransitionInvoices import transitionInvoicesHandler, _event
+from src.Application.Ports.Repositories import InvoiceRepositoryPort
+from src.Application.Ports.Events import EventPublisherPort
+from src.Domain.Invoice.Invoice import Invoice
+from src.Domain.ValueObject.InvoiceId import InvoiceId
+from src.Domain.ValueObject.InvoiceNumber import InvoiceNumber
+from src.Domain.ValueObject.InvoiceStatus import InvoiceStatus
+from src.Domain.Shared.ValueObject.Money import Money
+
+
+class InMemoryRepo(InvoiceRepositoryPort):
+    def __init__(self, invoices):
+        self.store = {str(inv.id.value): inv for inv in invoices}
+
+    async def save(self, invoice, reload=False):
+        self.store[str(invoice.id.value)] = invoice
+        return invoice
+
+    async def get(self, invoice_id):
+        return self.store.get(invoice_id)
+
+    async def list_ids(self, statuses, customer=None, created_from=None, created_to=None, limit=None):
+        return [i for i, inv in self.store.items() if inv.status.value in statuses and customer in (None, inv.customer)][:limit]
+
+
+class BatchPublisher(EventPublisherPort):
+    def __init__(self):
+        self.batches = []
+
+    async def publish(self, routing_key, payload):
+        raise AssertionError("events must be published in batches")
+
+    async def publish_batch(self, events):
+        self.batches.append(list(events))
+
+
+def _invoice(status, customer="C"):
+    return Invoice(id=InvoiceId(uuid4()), customer=customer, amount=Money(0.0), invoiceNumber=InvoiceNumber(f"INV-{uuid4()}"), status=InvoiceStatus(status))
+
+
+@pytest.mark.asyncio
+async def test_batch_issue_by_ids_reports_outcomes():
+    draft, paid = _invoice("draft"), _invoice("paid")
+    repo = InMemoryRepo([draft, paid])
+    publisher = BatchPublisher()
+    missing = str(uuid4())
+    ids = [str(draft.id.value), str(paid.id.value), missing, str(draft.id.value)]
+
+    outcomes = await transitionInvoicesHandler("issue", invoice_ids=ids, repo=repo, publisher=publisher)
+
+    assert outcomes == {
+        str(draft.id.value): None,
+        str(paid.id.value): "Invoice cannot be issued from status 'paid'",
+        missing: "Invoice not found",
+    }
+    assert draft.status.value == "issued"
+    assert publisher.batches == [[("invoice.issued", {"invoice_id": str(draft.id.value), "status": "issued"})]]
+
+
+@pytest.mark.asyncio
+async def test_batch_cancel_by_filter_selects_allowed_statuses():
+    invoices = [_invoice("draft"), _invoice("issued"), _invoice("paid"), _invoice("draft", customer="other")]
+    repo = InMemoryRepo(invoices)
+    outcomes = await transitionInvoicesHandler("cancel", customer="C", repo=repo, publisher=BatchPublisher())
+    assert set(outcomes) == {str(invoices[0].id.value), str(invoices[1].id.value)}
+    assert [inv.status.value for inv in invoices] == ["cancelled", "cancelled", "paid", "draft"]
+
+
+@pytest.mark.asyncio
+async def test_batch_by_filter_is_capped_and_resumable():
+    invoices = [_invoice("draft") for _ in range(5)]
+    repo = InMemoryRepo(invoices)
+    first = await transitionInvoicesHandler("issue", status="draft", limit=3, repo=repo, publisher=BatchPublisher())
+    assert len(first) == 3
+    second = await transitionInvoicesHandler("issue", status="draft", limit=3, repo=repo, publisher=BatchPublisher())
+    assert len(second) == 2 and not set(first) & set(second)
+    assert await transitionInvoicesHandler("issue", status="draft", limit=3, repo=repo, publisher=BatchPublisher()) == {}
+
+
+class Row:
+    def __init__(self, id, status, version=0):
+        self.id = id
+        self.status = status
+        self.version = version
+
+
+class Rows(list):
+    def all(self):
+        return self
+
+
+class LockingSession:
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    async def execute(self, stmt, params=None):
+        self.statements.append((stmt.__visit_name__, params))
+        return self.rows if stmt.__visit_name__ == "select" else None
+
+    def begin(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.mark.asyncio
+async def test_sql_transition_many_uses_one_guarded_update(monkeypatch):
+    import src.Infrastructure.Repositories.InvoiceRepository as module
+
+    session = LockingSession(Rows([Row("a", "issued"), Row("b", "draft"), Row("c", "issued")]))
+    monkeypatch.setattr(module, "AsyncSessionLocal", lambda: session)
+
+    outcomes, events = await InvoiceRepository().transition_many("pay", ["a", "b", "c", "d"], _event)
+
+    assert outcomes == {"a": None, "b": "Invoice cannot be paid from status 'draft'", "c": None, "d": "Invoice not found"}
+    assert events == []
+    # lock/read, guarded update, outbox rows, read model status update
+    assert [name for name, _ in session.statements] == ["select", "update", "insert", "update"]
+    assert [row["routing_key"] for row in session.statements[2][1]] == ["invoice.paid", "invoice.paid"]
+
+
+def _client():
+    try:
+        return AsyncClient(app=app, base_url="http://test")
+    except TypeError:
+        from httpx import ASGITransport
+        return AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not _HAS_HTTPX, reason="httpx/httpcore import failed (incompatible Python)")
+async def test_batch_pay_endpoint():
+    issued = _invoice("issued")
+    app.dependency_overrides[getRepository] = lambda: InMemoryRepo([issued])
+    app.dependency_overrides[getPublisher] = lambda: BatchPublisher()
+
+    client = _client()
+    await client.__aenter__()
+    try:
+        r = await client.post("/api/invoices:batchPay", json={"ids": [str(issued.id.value)]})
+        assert r.status_code == 200
+        assert r.json() == [{"id": str(issued.id.value), "status": "paid", "error": None}]
+
+        empty = await client.post("/api/invoices:batchPay", json={})
+        assert empty.status_code == 400
+    finally:
+        await client.__aexit__(None, None, None)
+        app.dependency_overrides.clear()
@@ -0,0 +1,72 @@
+import copy
+import pytest
+from uuid import uuid4
+
+from src.Application.Commands.PayInvoice import payInvoiceHandler
+from src.Application.Commands.Retry import retryOnConflict
+from src.Application.Ports.Repositories import InvoiceRepositoryPort, ConcurrencyConflict
+from src.Domain.ValueObject.InvoiceId import InvoiceId
+from src.Domain.ValueObject.InvoiceStatus import InvoiceStatus
+from src.Domain.Shared.ValueObject.Money import Money
+from src.Domain.ValueObject.InvoiceNumber import InvoiceNumber
+from src.Domain.Invoice.Invoice import Invoice
+
+
+class RacingRepo(InvoiceRepositoryPort):
+    """Loses the first `conflicts` saves as if another writer committed first."""
+
+    def __init__(self, conflicts: int):
+        self.store = {}
+        self.conflicts = conflicts
+        self.gets = 0
+
+    async def save(self, invoice: Invoice, reload: bool = False) -> Invoice:
+        if self.conflicts:
+            self.conflicts -= 1
+            raise ConcurrencyConflict("conflict")
+        self.store[str(invoice.id.value)] = invoice
+        return invoice
+
+    async def get(self, invoice_id: str) -> Invoice | None:
+        self.gets += 1
+        # hand out copies, like a real repository loading fresh rows
+        return copy.deepcopy(self.store.get(invoice_id))
+
+
+class FakePublisher:
+    def __init__(self):
+        self.published = []
+
+    async def publish(self, topic, payload):
+        self.published.append((topic, payload))
+
+
+def _issued_invoice():
+    return Invoice(id=InvoiceId(uuid4()), customer="A", amount=Money(1.0), invoiceNumber=InvoiceNumber("INV-CC"), status=InvoiceStatus("issued"))
+
+
+@pytest.mark.asyncio
+async def test_handler_retries_from_fresh_read_after_conflict():
+    repo = RacingRepo(conflicts=0)
+    inv = _issued_invoice()
+    await repo.save(inv)
+    repo.conflicts = 2
+    pub = FakePublisher()
+    paid = await payInvoiceHandler(str(inv.id.value), repo=repo, publisher=pub)
+    assert paid.status.value == "paid"
+    assert repo.gets == 3
+    # only the attempt that committed publishes its event
+    assert [key for key, _ in pub.published] == ["invoice.paid"]
+
+
+@pytest.mark.asyncio
+async def test_retry_gives_up_after_limit():
+    calls = []
+
+    async def always_conflicts():
+        calls.append(1)
+        raise ConcurrencyConflict("conflict")
+
+    with pytest.raises(ConcurrencyConflict):
+        await retryOnConflict(always_conflicts, retries=2)
+    assert len(calls) == 3
@@ -12,3 +12,27 @@ def test_invoice_dataclass():
     assert inv.amount.value == 42.5
     assert inv.status.value == "draft"
     assert inv.invoiceNumber.value == "INV-TEST"
+
+
+def test_from_row_matches_validated_invoice():
+    from datetime import datetime
+    from uuid import uuid4
+    from src.Domain.Shared.ValueObject.Money import Money
+    from src.Domain.ValueObject.InvoiceId import InvoiceId
+    from src.Domain.ValueObject.InvoiceItem import InvoiceItem
+    from src.Domain.ValueObject.InvoiceNumber import InvoiceNumber
+    from src.Domain.ValueObject.InvoiceStatus import InvoiceStatus
+
+    invoice_id = str(uuid4())
+    items = [InvoiceItem.from_row("P1", "X", 3, Money.from_stored(0.29))]
+    inv = Invoice.from_row(id=invoice_id, customer="Bob", amount=0.87, status="draft", invoice_number="INV-ROW", created_at=datetime(2024, 1, 1), version=2, items=items)
+
+    assert inv.id == InvoiceId(invoice_id) and hash(inv.id) == hash(InvoiceId(invoice_id))
+    assert str(inv.id.value) == invoice_id
+    assert inv.status is InvoiceStatus.DRAFT is InvoiceStatus("draft")
+    assert inv.amount == Money(0.87) and inv.invoiceNumber == InvoiceNumber("INV-ROW")
+    assert inv.items[0] == InvoiceItem(product_id="P1", description="X", quantity=3, unit_price=Money(0.29))
+    assert not hasattr(inv.items[0], "__dict__")
+    # the item index is built on first use
+    inv.update_item_quantity("P1", 1)
+    assert inv.amount == Money(0.29)
@@ -0,0 +1,128 @@
+import copy
+import pytest
+from datetime import datetime
+from uuid import uuid4
+try:
+    from httpx import AsyncClient
+    _HAS_HTTPX = True
+except Exception:
+    _HAS_HTTPX = False
+from src.Main import app
+from src.Infrastructure.Adapters.Http import getReadRepository, getCache, getUnitOfWork, getPublisher
+from src.Application.Ports.Repositories import InvoiceRepositoryPort
+from src.Application.Ports.UnitOfWork import UnitOfWork
+from src.Domain.Invoice.Invoice import Invoice
+from src.Domain.Shared.ValueObject.Money import Money
+from src.Domain.ValueObject.InvoiceId import InvoiceId
+from src.Domain.ValueObject.InvoiceItem import InvoiceItem
+from src.Domain.ValueObject.InvoiceNumber import InvoiceNumber
+
+
+class VersionedRepo(InvoiceRepositoryPort):
+    def __init__(self, invoice):
+        self.store = {str(invoice.id): invoice}
+        self.loads = 0
+        self.item_loads = 0
+
+    async def save(self, invoice, reload=False):
+        invoice.version += 1
+        self.store[str(invoice.id)] = invoice
+        return invoice
+
+    async def get(self, invoice_id):
+        self.loads += 1
+        return copy.deepcopy(self.store.get(invoice_id))
+
+    async def get_version(self, invoice_id, lock=False):
+        invoice = self.store.get(invoice_id)
+        return invoice.version if invoice is not None else None
+
+    async def iter_summaries(self, limit, after=None, include_items=False, **filters):
+        for inv in list(self.store.values())[:limit]:
+            yield {"id": str(inv.id), "customer": inv.customer, "amount": inv.amount.value, "status": inv.status.value, "invoice_number": inv.invoiceNumber.value, "item_count": len(inv.items), "created_at": inv.created_at, "updated_at": datetime(2024, 1, 1, 0, 0, inv.version)}
+
+    async def summary_items(self, invoice_ids):
+        self.item_loads += 1
+        return {i: [it.to_primitive() for it in self.store[i].items] for i in invoice_ids}
+
+
+class NoopUnitOfWork(UnitOfWork):
+    def __init__(self, invoices):
+        self.invoices = invoices
+
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        pass
+
+
+class NullPublisher:
+    async def publish(self, routing_key, payload):
+        pass
+
+
+def _client():
+    try:
+        return AsyncClient(app=app, base_url="http://test")
+    except TypeError:
+        from httpx import ASGITransport
+        return AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not _HAS_HTTPX, reason="httpx/httpcore import failed (incompatible Python)")
+async def test_conditional_get_list_and_writes():
+    items = [InvoiceItem(product_id="P1", description="X", quantity=1, unit_price=Money(2.0))]
+    inv = Invoice(id=InvoiceId(uuid4()), customer="C", amount=Money(0), invoiceNumber=InvoiceNumber("INV-E1"), items=items, version=3)
+    repo = VersionedRepo(inv)
+    app.dependency_overrides[getReadRepository] = lambda: repo
+    app.dependency_overrides[getCache] = lambda: None
+    app.dependency_overrides[getUnitOfWork] = lambda: NoopUnitOfWork(repo)
+    app.dependency_overrides[getPublisher] = lambda: NullPublisher()
+    client = _client()
+    await client.__aenter__()
+    try:
+        url = f"/api/invoices/{inv.id}"
+        r = await client.get(url)
+        assert r.status_code == 200 and r.headers["ETag"] == '"3"'
+        assert r.json()["items"][0]["productId"] == "P1"
+        assert repo.loads == 1
+        r = await client.get(url, params={"includeItems": "false"})
+        assert r.status_code == 200 and r.headers["ETag"] == '"3"'
+        assert r.json()["items"] == [] and r.json()["itemCount"] == 1
+        assert repo.loads == 2
+
+        r = await client.get(url, headers={"If-None-Match": '"3"'})
+        assert r.status_code == 304 and r.content == b""
+        # validated without building the aggregate
+        assert repo.loads == 2
+
+        page = await client.get("/api/invoices")
+        assert (await client.get("/api/invoices", headers={"If-None-Match": page.headers["ETag"]})).status_code == 304
+        assert repo.item_loads == 1
+        full = await client.get("/api/invoices")
+        assert full.json()[0]["items"][0]["productId"] == "P1" and repo.item_loads == 2
+        summaries = await client.get("/api/invoices", params={"includeItems": "false"})
+        assert summaries.json()[0]["items"] == [] and repo.item_loads == 2
+        r = await client.get("/api/invoices", headers={"If-None-Match": full.headers["ETag"]})
+        # answered from the summary rows, before the items are loaded
+        assert r.status_code == 304 and repo.item_loads == 2
+
+        r = await client.patch(f"{url}/items/P1", json={"quantity": 2}, headers={"If-Match": '"2"'})
+        assert r.status_code == 412
+        r = await client.patch(f"{url}/items/P1", json={"quantity": 2}, headers={"If-Match": 'W/"3"'})
+        assert r.status_code == 412
+        r = await client.patch(f"{url}/items/P1", json={"quantity": 2}, headers={"If-Match": '"1", "3"'})
+        assert r.status_code == 200 and r.headers["ETag"] == '"4"'
+
+        r = await client.post(f"{url}:issue", headers={"If-Match": '"3"'})
+        assert r.status_code == 412
+        r = await client.post(f"{url}:issue", headers={"If-Match": '"4"'})
+        assert r.status_code == 200 and r.headers["ETag"] == '"5"'
+
+        assert (await client.get(url, headers={"If-None-Match": '"3"'})).status_code == 200
+        assert (await client.get("/api/invoices", headers={"If-None-Match": page.headers["ETag"]})).status_code == 200
+    finally:
+        await client.__aexit__(None, None, None)
+        app.dependency_overrides.clear()
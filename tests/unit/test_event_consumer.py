@@ -0,0 +1,218 @@
+import asyncio
+import json
+import pytest
+
+from src.Infrastructure.Events.EventConsumer import EventConsumer, topic_matches
+
+
+class InMemoryMessage:
+    def __init__(self, queue, tag, routing_key, body, headers=None):
+        self.queue = queue
+        self.delivery_tag = tag
+        self.routing_key = routing_key
+        self.body = body
+        self.headers = headers or {}
+        self.content_type = "application/json"
+        self.message_id = None
+
+    async def ack(self, multiple=False):
+        self.queue.settle(self, "ack", multiple)
+
+    async def reject(self, requeue=False):
+        self.queue.settle(self, "dead" if not requeue else "requeue", False)
+
+    async def nack(self, multiple=False, requeue=True):
+        self.queue.settle(self, "requeue" if requeue else "dead", multiple)
+
+
+class InMemoryQueue:
+    """Delivers at most `prefetch` unacked messages, like a RabbitMQ queue with QoS."""
+
+    def __init__(self, broker, name, arguments=None):
+        self.broker = broker
+        self.name = name
+        self.arguments = arguments or {}
+        self.bindings = []
+        self.ready = []
+        self.held = []
+        self.unacked = {}
+        self.acked = []
+        self.ack_calls = 0
+        self.callback = None
+        self.next_tag = 1
+
+    async def bind(self, exchange, routing_key="#"):
+        # only topic bindings of the events exchange receive published events
+        if exchange == "domain_events":
+            self.bindings.append(routing_key)
+
+    async def consume(self, callback):
+        self.callback = callback
+        self.pump()
+        return "ctag"
+
+    async def cancel(self, tag):
+        self.callback = None
+
+    def push(self, routing_key, body, headers=None):
+        ttl = self.arguments.get("x-message-ttl")
+        if ttl is not None:
+            # a delay queue: dead-letter to the target queue once the TTL expires
+            target = self.broker.queues[self.arguments["x-dead-letter-routing-key"]]
+            self.held.append(body)
+            asyncio.get_running_loop().call_later(ttl / 1000, self.expire, target, routing_key, body, headers)
+            return
+        self.ready.append((routing_key, body, headers))
+        self.pump()
+
+    def expire(self, target, routing_key, body, headers):
+        self.held.remove(body)
+        target.push(self.arguments["x-dead-letter-routing-key"], body, headers)
+
+    def pump(self):
+        while self.callback is not None and self.ready and len(self.unacked) < self.broker.prefetch:
+            routing_key, body, headers = self.ready.pop(0)
+            message = InMemoryMessage(self, self.next_tag, routing_key, body, headers)
+            self.next_tag += 1
+            self.unacked[message.delivery_tag] = message
+            asyncio.get_running_loop().create_task(self.callback(message))
+
+    def settle(self, message, outcome, multiple):
+        tags = [t for t in self.unacked if t <= message.delivery_tag] if multiple else [message.delivery_tag]
+        if outcome == "ack":
+            self.ack_calls += 1
+        for tag in tags:
+            settled = self.unacked.pop(tag)
+            if outcome == "ack":
+                self.acked.append(settled.routing_key)
+            elif outcome == "dead":
+                self.broker.queues[f"{self.name}.dead"].ready.append((settled.routing_key, settled.body, settled.headers))
+            else:
+                self.ready.append((settled.routing_key, settled.body, settled.headers))
+        self.pump()
+
+
+class DefaultExchange:
+    """Routes each message to the queue named by its routing key."""
+
+    def __init__(self, broker):
+        self.broker = broker
+
+    async def publish(self, message, routing_key):
+        self.broker.queues[routing_key].push(routing_key, message.body, message.headers)
+
+
+class InMemoryChannel:
+    def __init__(self, broker):
+        self.broker = broker
+        self.default_exchange = DefaultExchange(broker)
+
+    async def set_qos(self, prefetch_count):
+        self.broker.prefetch = prefetch_count
+
+    async def declare_exchange(self, name, type, durable=False):
+        return name
+
+    async def declare_queue(self, name, durable=False, arguments=None):
+        return self.broker.queues.setdefault(name, InMemoryQueue(self.broker, name, arguments))
+
+    async def close(self):
+        pass
+
+
+class InMemoryBroker:
+    def __init__(self):
+        self.prefetch = 0
+        self.queues = {}
+
+    async def channel(self):
+        return InMemoryChannel(self)
+
+    def publish(self, routing_key, payload):
+        body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+        for queue in self.queues.values():
+            if any(topic_matches(pattern, routing_key) for pattern in queue.bindings):
+                queue.push(routing_key, body)
+
+
+async def _drain(queue):
+    for _ in range(200):
+        delayed = [q for name, q in queue.broker.queues.items() if name.startswith(f"{queue.name}.retry.")]
+        if not queue.ready and not queue.unacked and not any(q.held for q in delayed):
+            return
+        await asyncio.sleep(0.01)
+
+
+def test_topic_matching():
+    assert topic_matches("invoice.*", "invoice.paid")
+    assert not topic_matches("invoice.*", "invoice.item.added")
+    assert topic_matches("invoice.#", "invoice.item.added")
+    assert not topic_matches("invoice.#", "customer.created")
+
+
+@pytest.mark.asyncio
+async def test_consumer_bounds_concurrency_and_acks_in_batches():
+    broker = InMemoryBroker()
+    running = 0
+    peak = 0
+    handled = []
+
+    async def handler(routing_key, payload):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.005)
+        handled.append(payload["n"])
+        running -= 1
+
+    consumer = EventConsumer([("invoice.#", handler)], queue_name="test.events", prefetch=8, concurrency=3, ack_batch_size=4, ack_interval=0.05)
+    await consumer.start(broker)
+    queue = broker.queues["test.events"]
+    assert queue.bindings == ["invoice.#"]
+    assert queue.arguments["x-dead-letter-exchange"] == "domain_events.dlx"
+
+    for n in range(20):
+        broker.publish("invoice.item.added" if n % 2 else "invoice.paid", {"n": n})
+    broker.publish("customer.created", {"n": -1})
+    await _drain(queue)
+    await consumer.stop()
+
+    assert sorted(handled) == list(range(20))
+    assert peak <= 3
+    assert len(queue.acked) == 20
+    assert queue.ack_calls < 20
+
+
+@pytest.mark.asyncio
+async def test_failed_messages_are_retried_with_backoff_then_dead_lettered():
+    broker = InMemoryBroker()
+    attempts = []
+
+    async def handler(routing_key, payload):
+        attempts.append((payload["n"], routing_key, asyncio.get_running_loop().time()))
+        if payload["n"] == 1 or (payload["n"] == 3 and len([a for a in attempts if a[0] == 3]) < 2):
+            raise RuntimeError("boom")
+
+    consumer = EventConsumer([("invoice.*", handler)], queue_name="test.events", prefetch=4, concurrency=2, ack_batch_size=2, ack_interval=0.05, retry_delays=[0.02, 0.05])
+    await consumer.start(broker)
+    queue = broker.queues["test.events"]
+    assert broker.queues["test.events.retry.2"].arguments == {"x-message-ttl": 50, "x-dead-letter-exchange": "", "x-dead-letter-routing-key": "test.events"}
+
+    broker.publish("invoice.paid", {"n": 0})
+    broker.publish("invoice.paid", {"n": 1})
+    broker.publish("invoice.paid", b"not json")
+    broker.publish("invoice.issued", {"n": 3})
+    await _drain(queue)
+    await consumer.stop()
+
+    # three attempts in all, each retry after its delay, with the original routing key
+    poison = [(key, at) for n, key, at in attempts if n == 1]
+    assert [key for key, _ in poison] == ["invoice.paid"] * 3
+    assert poison[1][1] - poison[0][1] >= 0.02 and poison[2][1] - poison[1][1] >= 0.05
+    # succeeded on its retry
+    assert [key for n, key, _ in attempts if n == 3] == ["invoice.issued"] * 2
+    dead = broker.queues["test.events.dead"].ready
+    assert sorted(body for _, body, _ in dead) == sorted([b"not json", json.dumps({"n": 1}).encode()])
+    assert [headers.get("x-attempts") for _, body, headers in dead if body != b"not json"] == [2]
+    # every delivery was settled exactly once: originals and retried copies
+    assert not queue.unacked and len(queue.acked) == 5
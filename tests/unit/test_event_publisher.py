@@ -0,0 +1,82 @@
+import pytest
+
+from aio_pika import Message, ExchangeType
+from aio_pika.pool import Pool
+
+import src.Infrastructure.Events.EventPublisher as module
+from src.Infrastructure.Events.EventPublisher import EventPublisher
+
+
+class FakeExchange:
+    def __init__(self):
+        self.published = []
+
+    async def publish(self, message, routing_key):
+        self.published.append((routing_key, message.body))
+
+
+class FakeChannel:
+    def __init__(self, exchange):
+        self.exchange = exchange
+        self.declared = 0
+
+    async def declare_exchange(self, name, type):
+        self.declared += 1
+        return self.exchange
+
+    async def get_exchange(self, name, ensure=True):
+        return self.exchange
+
+    async def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self):
+        self.exchange = FakeExchange()
+        self.channels = []
+        self.closed = False
+
+    async def channel(self):
+        ch = FakeChannel(self.exchange)
+        self.channels.append(ch)
+        return ch
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_publisher_reuses_connection_and_declares_exchange_once(monkeypatch):
+    connections = []
+
+    async def fake_connect_robust(url):
+        conn = FakeConnection()
+        connections.append(conn)
+        return conn
+
+    monkeypatch.setattr(module, "connect_robust", fake_connect_robust, raising=False)
+    monkeypatch.setattr(module, "Message", Message, raising=False)
+    monkeypatch.setattr(module, "ExchangeType", ExchangeType, raising=False)
+    monkeypatch.setattr(module, "Pool", Pool, raising=False)
+
+    publisher = EventPublisher(pool_size=2)
+    publisher._test_mode = False
+    publisher._url = "amqp://test"
+
+    await publisher.connect()
+    for i in range(5):
+        await publisher.publish("invoice.created", {"n": i})
+
+    assert len(connections) == 1
+    conn = connections[0]
+    assert sum(ch.declared for ch in conn.channels) == 1
+    assert len(conn.channels) <= 2
+    assert len(conn.exchange.published) == 5
+
+    await publisher.publish_batch([("invoice.paid", {"n": i}) for i in range(3)])
+    assert len(connections) == 1
+    assert [key for key, _ in conn.exchange.published[5:]] == ["invoice.paid"] * 3
+
+    await publisher.close()
+    assert conn.closed
@@ -0,0 +1,66 @@
+import csv
+import io
+import json
+import pytest
+from datetime import datetime
+try:
+    from httpx import AsyncClient
+    _HAS_HTTPX = True
+except Exception:
+    _HAS_HTTPX = False
+from src.Main import app
+from src.Infrastructure.Adapters.Http import getReadRepository
+
+
+ROWS = [
+    {"id": "a", "invoice_number": "INV-E1", "customer": "ACME", "status": "draft", "amount": 10.0, "created_at": datetime(2024, 1, 1), "items": [{"productId": "P1", "description": "X", "quantity": 2, "unitPrice": 5.0}]},
+    {"id": "b", "invoice_number": "INV-E2", "customer": "ACME, Inc", "status": "paid", "amount": 0.0, "created_at": datetime(2024, 1, 2), "items": []},
+]
+
+
+class ExportRepo:
+    def __init__(self):
+        self.filters = None
+
+    async def iter_export_rows(self, **filters):
+        self.filters = filters
+        for row in ROWS:
+            yield row
+
+
+def _client():
+    try:
+        return AsyncClient(app=app, base_url="http://test")
+    except TypeError:
+        from httpx import ASGITransport
+        return AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not _HAS_HTTPX, reason="httpx/httpcore import failed (incompatible Python)")
+async def test_export_ndjson_and_csv():
+    repo = ExportRepo()
+    app.dependency_overrides[getReadRepository] = lambda: repo
+    client = _client()
+    await client.__aenter__()
+    try:
+        r = await client.get("/api/invoices:export", params={"status": "draft"})
+        assert r.status_code == 200
+        assert r.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in r.text.splitlines()]
+        assert lines[0]["invoiceNumber"] == "INV-E1"
+        assert lines[0]["items"][0]["productId"] == "P1"
+        assert lines[1]["items"] == []
+        assert repo.filters["status"] == "draft"
+
+        r2 = await client.get("/api/invoices:export", params={"format": "csv"})
+        assert r2.status_code == 200
+        table = list(csv.reader(io.StringIO(r2.text)))
+        assert table[0] == ["id", "invoiceNumber", "customer", "status", "amount", "createdAt"]
+        assert table[2][2] == "ACME, Inc"
+
+        bad = await client.get("/api/invoices:export", params={"format": "xml"})
+        assert bad.status_code == 422
+    finally:
+        await client.__aexit__(None, None, None)
+        app.dependency_overrides.clear()
@@ -0,0 +1,240 @@
+import pytest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from fastapi import FastAPI, HTTPException
+from sqlalchemy.dialects import mysql
+try:
+    from httpx import AsyncClient
+    _HAS_HTTPX = True
+except Exception:
+    _HAS_HTTPX = False
+import src.Infrastructure.Repositories.IdempotencyRepository as module
+from src.Infrastructure.Adapters.Idempotency import IdempotencyMiddleware, IdempotencyKeySweeper
+from src.Infrastructure.Repositories.IdempotencyRepository import (
+    IdempotencyClaimLost,
+    IdempotencyKeyInProgress,
+    IdempotencyKeyReused,
+    IdempotencyRepository,
+    current_claim,
+    mark_applied,
+)
+
+
+class InMemoryIdempotencyStore:
+    def __init__(self):
+        # key -> (fingerprint, token, applied, response)
+        self.rows = {}
+
+    async def claim(self, key, fingerprint, token, lock_seconds):
+        row = self.rows.get(key)
+        if row is None:
+            self.rows[key] = (fingerprint, token, False, None)
+            return None
+        if row[0] != fingerprint:
+            raise IdempotencyKeyReused(key)
+        if row[3] is None:
+            raise IdempotencyKeyInProgress(key)
+        return row[3]
+
+    async def complete(self, key, token, response, ttl):
+        fingerprint, owner, applied, _ = self.rows[key]
+        self.rows[key] = (fingerprint, owner, applied, response)
+        return owner == token
+
+    async def release(self, key, token):
+        if self.rows[key][1] != token or self.rows[key][2]:
+            return False
+        del self.rows[key]
+        return True
+
+    def apply(self):
+        claim = current_claim.get()
+        fingerprint, token, _, response = self.rows[claim.key]
+        self.rows[claim.key] = (fingerprint, token, True, response)
+
+
+def _app(store):
+    app = FastAPI()
+    app.add_middleware(IdempotencyMiddleware, store=store)
+    app.state.calls = 0
+
+    @app.post("/invoices", status_code=201)
+    async def create(payload: dict):
+        app.state.calls += 1
+        if payload.get("commit"):
+            # stands in for mark_applied in the command's transaction
+            store.apply()
+        if payload.get("fail"):
+            raise HTTPException(status_code=payload["fail"], detail="try again")
+        return {"n": app.state.calls, **payload}
+
+    return app
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not _HAS_HTTPX, reason="httpx/httpcore import failed (incompatible Python)")
+async def test_retry_replays_stored_response_without_running_handler():
+    app = _app(InMemoryIdempotencyStore())
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        first = await ac.post("/invoices", json={"customer": "ACME"}, headers={"Idempotency-Key": "k1"})
+        retry = await ac.post("/invoices", json={"customer": "ACME"}, headers={"Idempotency-Key": "k1"})
+        other = await ac.post("/invoices", json={"customer": "ACME"}, headers={"Idempotency-Key": "k2"})
+        plain = await ac.post("/invoices", json={"customer": "ACME"})
+    assert first.status_code == retry.status_code == 201
+    assert retry.content == first.content
+    assert retry.headers["content-type"] == first.headers["content-type"]
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert "idempotent-replayed" not in first.headers
+    assert other.json()["n"] == 2
+    assert plain.json()["n"] == 3
+    assert app.state.calls == 3
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not _HAS_HTTPX, reason="httpx/httpcore import failed (incompatible Python)")
+async def test_key_reuse_and_in_flight_requests_are_rejected():
+    store = InMemoryIdempotencyStore()
+    app = _app(store)
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        await ac.post("/invoices", json={"customer": "ACME"}, headers={"Idempotency-Key": "k1"})
+        reused = await ac.post("/invoices", json={"customer": "Other"}, headers={"Idempotency-Key": "k1"})
+        store.rows["k2"] = (next(iter(store.rows.values()))[0], "other", False, None)
+        in_flight = await ac.post("/invoices", json={"customer": "ACME"}, headers={"Idempotency-Key": "k2"})
+    assert reused.status_code == 422
+    assert in_flight.status_code == 409
+    assert app.state.calls == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not _HAS_HTTPX, reason="httpx/httpcore import failed (incompatible Python)")
+async def test_retryable_errors_are_not_stored_unless_applied():
+    store = InMemoryIdempotencyStore()
+    app = _app(store)
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        for status in (503, 409, 429):
+            failed = await ac.post("/invoices", json={"fail": status}, headers={"Idempotency-Key": f"k{status}"})
+            assert failed.status_code == status
+            assert f"k{status}" not in store.rows
+        retried = await ac.post("/invoices", json={"fail": 503}, headers={"Idempotency-Key": "k503"})
+        assert retried.status_code == 503 and app.state.calls == 4
+        # the command committed before failing: retries replay instead of running it again
+        applied = await ac.post("/invoices", json={"fail": 503, "commit": True}, headers={"Idempotency-Key": "k1"})
+        replayed = await ac.post("/invoices", json={"fail": 503, "commit": True}, headers={"Idempotency-Key": "k1"})
+    assert applied.status_code == replayed.status_code == 503
+    assert replayed.headers["idempotent-replayed"] == "true"
+    assert app.state.calls == 5
+
+
+@pytest.mark.asyncio
+async def test_sweeper_deletes_expired_keys_in_batches():
+    class Store:
+        def __init__(self):
+            self.expired = 7
+
+        async def sweep(self, batch_size):
+            deleted = min(batch_size, self.expired)
+            self.expired -= deleted
+            return deleted
+
+    store = Store()
+    assert await IdempotencyKeySweeper(store, batch_size=3).sweep_once() == 7
+    assert store.expired == 0
+
+
+class Result:
+    def __init__(self, rowcount=0, row=None):
+        self.rowcount = rowcount
+        self.row = row
+
+    def first(self):
+        return self.row
+
+
+class ScriptedSession:
+    """Answers each statement with the next scripted result and records its SQL."""
+
+    def __init__(self, results):
+        self.results = list(results)
+        self.statements = []
+
+    def begin(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, stmt):
+        self.statements.append(str(stmt.compile(dialect=mysql.dialect())).split("\n")[0])
+        return self.results.pop(0)
+
+
+def _row(fingerprint="fp", token="old", applied=False, status_code=None, expires_in=60):
+    return SimpleNamespace(fingerprint=fingerprint, claim_token=token, applied=applied, status_code=status_code, headers='[["content-type", "application/json"]]', body=b"{}", expires_at=datetime.utcnow() + timedelta(seconds=expires_in))
+
+
+async def _claim(monkeypatch, results, fingerprint="fp"):
+    session = ScriptedSession(results)
+    monkeypatch.setattr(module, "AsyncSessionLocal", lambda: session)
+    return await IdempotencyRepository().claim("k1", fingerprint, "new", 60), session.statements
+
+
+@pytest.mark.asyncio
+async def test_claim_inserts_or_reads_the_locked_row(monkeypatch):
+    claimed, statements = await _claim(monkeypatch, [Result(rowcount=1)])
+    assert claimed is None
+    assert statements == ["INSERT IGNORE INTO idempotency_keys (idempotency_key, fingerprint, claim_token, applied, status_code, headers, body, expires_at) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)"]
+
+    stored, statements = await _claim(monkeypatch, [Result(), Result(row=_row(status_code=201))])
+    assert stored.status_code == 201 and stored.headers == [("content-type", "application/json")]
+    assert statements[1].startswith("SELECT") and len(statements) == 2
+
+    with pytest.raises(IdempotencyKeyReused):
+        await _claim(monkeypatch, [Result(), Result(row=_row(status_code=201))], fingerprint="other")
+    with pytest.raises(IdempotencyKeyInProgress):
+        await _claim(monkeypatch, [Result(), Result(row=_row())])
+
+
+@pytest.mark.asyncio
+async def test_claim_takes_over_only_unapplied_expired_claims(monkeypatch):
+    # abandoned before its command committed: run again under the new token
+    claimed, statements = await _claim(monkeypatch, [Result(), Result(row=_row(expires_in=-1)), Result(rowcount=1)])
+    assert claimed is None and statements[2].startswith("UPDATE idempotency_keys SET fingerprint=%s, claim_token=%s")
+    # its command committed but the response was never stored: never re-run
+    with pytest.raises(IdempotencyKeyInProgress):
+        await _claim(monkeypatch, [Result(), Result(row=_row(applied=True, expires_in=3600))])
+    # an expired pending claim is still a different request's
+    with pytest.raises(IdempotencyKeyReused):
+        await _claim(monkeypatch, [Result(), Result(row=_row(expires_in=-1))], fingerprint="other")
+    # past the replay window the key starts over
+    claimed, statements = await _claim(monkeypatch, [Result(), Result(row=_row(fingerprint="other", status_code=201, expires_in=-1)), Result(rowcount=1)])
+    assert claimed is None and statements[2].startswith("UPDATE")
+    # swept between the INSERT IGNORE and the SELECT
+    claimed, statements = await _claim(monkeypatch, [Result(), Result(row=None), Result(rowcount=1)])
+    assert claimed is None and statements[2].startswith("INSERT INTO idempotency_keys")
+
+
+@pytest.mark.asyncio
+async def test_only_the_owning_claim_completes_releases_or_commits(monkeypatch):
+    from src.Infrastructure.Repositories.IdempotencyRepository import Claim, StoredResponse
+
+    session = ScriptedSession([Result(rowcount=0), Result(rowcount=0), Result(rowcount=1)])
+    monkeypatch.setattr(module, "AsyncSessionLocal", lambda: session)
+    repo = IdempotencyRepository()
+    assert not await repo.complete("k1", "old", StoredResponse(201, [], b""), 60)
+    assert not await repo.release("k1", "old")
+    assert await repo.release("k1", "new")
+    assert "claim_token = %s" in session.statements[0]
+    assert "applied IS false" in session.statements[1]
+
+    # outside an idempotent request nothing is written
+    await mark_applied(ScriptedSession([]))
+    claimed = current_claim.set(Claim("k1", "old", 60))
+    try:
+        with pytest.raises(IdempotencyClaimLost):
+            await mark_applied(ScriptedSession([Result(rowcount=0)]))
+        await mark_applied(ScriptedSession([Result(rowcount=1)]))
+    finally:
+        current_claim.reset(claimed)
@@ -0,0 +1,211 @@
+import json
+import pytest
+from uuid import uuid4
+
+import src.Infrastructure.Cache.InvoiceCache as module
+from src.Application.Queries.GetInvoice import getInvoiceHandler, getInvoicesHandler
+from src.Infrastructure.Cache.InvoiceCache import InMemoryInvoiceCache, SharedInvoiceCache
+from src.Domain.Invoice.Invoice import Invoice
+from src.Domain.ValueObject.InvoiceId import InvoiceId
+from src.Domain.ValueObject.InvoiceItem import InvoiceItem
+from src.Domain.ValueObject.InvoiceNumber import InvoiceNumber
+from src.Domain.Shared.ValueObject.Money import Money
+
+
+def _invoice(number="INV-C1"):
+    items = [InvoiceItem(product_id="P1", description="X", quantity=2, unit_price=Money(5.0))]
+    return Invoice(id=InvoiceId(uuid4()), customer="C", amount=Money(10.0), invoiceNumber=InvoiceNumber(number), items=items)
+
+
+class CountingRepo:
+    stale_reads = False
+
+    def __init__(self, invoice):
+        self.invoice = invoice
+        self.gets = 0
+
+    async def get(self, invoice_id):
+        self.gets += 1
+        return self.invoice if str(self.invoice.id.value) == invoice_id else None
+
+    async def get_many(self, invoice_ids):
+        return [await self.get(invoice_id) for invoice_id in invoice_ids]
+
+
+@pytest.mark.asyncio
+async def test_get_reads_through_cache():
+    inv = _invoice()
+    inv.version = 4
+    repo = CountingRepo(inv)
+    cache = InMemoryInvoiceCache()
+    invoice_id = str(inv.id.value)
+
+    first = await getInvoiceHandler(invoice_id, repo=repo, cache=cache)
+    second = await getInvoiceHandler(invoice_id, repo=repo, cache=cache)
+    assert repo.gets == 1
+    assert second == first
+    assert second.version == 4
+    # hits are fresh aggregates, never the cached object itself
+    assert second is not first
+
+    await cache.invalidate(invoice_id)
+    await getInvoiceHandler(invoice_id, repo=repo, cache=cache)
+    assert repo.gets == 2
+
+    # misses are not cached
+    assert await getInvoiceHandler(str(uuid4()), repo=repo, cache=cache) is None
+
+
+@pytest.mark.asyncio
+async def test_replica_reads_do_not_fill_cache():
+    inv = _invoice()
+    repo = CountingRepo(inv)
+    repo.stale_reads = True
+    cache = InMemoryInvoiceCache()
+    invoice_id = str(inv.id.value)
+
+    assert await getInvoiceHandler(invoice_id, repo=repo, cache=cache) is not None
+    assert await cache.get(invoice_id) is None
+    await getInvoiceHandler(invoice_id, repo=repo, cache=cache)
+    assert repo.gets == 2
+
+
+@pytest.mark.asyncio
+async def test_memory_cache_evicts_least_recently_used_and_expired(monkeypatch):
+    cache = InMemoryInvoiceCache(max_size=2)
+    a, b, c = _invoice("A"), _invoice("B"), _invoice("C")
+    await cache.set(a)
+    await cache.set(b)
+    assert await cache.get(str(a.id.value)) is not None
+    await cache.set(c)
+    assert await cache.get(str(b.id.value)) is None
+    assert await cache.get(str(a.id.value)) is not None
+
+    monkeypatch.setattr(module, "CACHE_TTL", 0.0)
+    d = _invoice("D")
+    await cache.set(d)
+    assert await cache.get(str(d.id.value)) is None
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+        self.expiry = {}
+        self.round_trips = 0
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+        self.expiry[key] = ex
+
+    async def eval(self, script, numkeys, key, version, value, ex):
+        # what the compare-and-set script does on the server
+        current = self.data.get(key)
+        if current is not None and json.loads(current)["version"] > int(version):
+            return 0
+        await self.set(key, value, ex=int(ex))
+        return 1
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+    async def mget(self, keys):
+        self.round_trips += 1
+        return [self.data.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def eval(self, *args):
+        self.commands.append(args)
+
+    async def execute(self):
+        self.client.round_trips += 1
+        for args in self.commands:
+            await self.client.eval(*args)
+
+
+@pytest.mark.asyncio
+async def test_shared_cache_round_trips_json():
+    client = FakeRedis()
+    cache = SharedInvoiceCache(client)
+    inv = _invoice()
+    await cache.set(inv)
+    key = "invoice:" + str(inv.id.value)
+    assert client.expiry[key] == int(module.CACHE_TTL)
+
+    cached = await cache.get(str(inv.id.value))
+    assert cached == inv
+    assert cached.items[0].unit_price == Money(5.0)
+
+    await cache.invalidate(str(inv.id.value))
+    assert await cache.get(str(inv.id.value)) is None
+
+
+@pytest.mark.asyncio
+async def test_shared_cache_batches_take_one_round_trip():
+    client = FakeRedis()
+    cache = SharedInvoiceCache(client)
+    first, second = _invoice("INV-C1"), _invoice("INV-C2")
+    await cache.set_many([first, second])
+    assert client.round_trips == 1
+    assert client.expiry["invoice:" + str(second.id.value)] == int(module.CACHE_TTL)
+
+    cached = await cache.get_many([str(second.id.value), "missing", str(first.id.value)])
+    assert cached == [second, None, first]
+    assert client.round_trips == 2
+
+
+@pytest.mark.asyncio
+async def test_replica_batch_reads_do_not_fill_cache():
+    inv = _invoice()
+    repo = CountingRepo(inv)
+    repo.stale_reads = True
+    cache = InMemoryInvoiceCache()
+    assert await getInvoicesHandler([str(inv.id.value)], repo=repo, cache=cache) == [inv]
+    assert await cache.get(str(inv.id.value)) is None
+
+
+@pytest.mark.asyncio
+async def test_fill_after_write_keeps_older_copy_out():
+    inv = _invoice()
+    invoice_id = str(inv.id.value)
+    for cache in (InMemoryInvoiceCache(), SharedInvoiceCache(FakeRedis())):
+        # a read of version 0 finishes after the write of version 1 was invalidated
+        await cache.invalidate(invoice_id, 1)
+        await cache.set(inv)
+        assert await cache.get(invoice_id) is None
+
+        newer = _invoice()
+        newer.id = inv.id
+        newer.version = 1
+        await cache.set(newer)
+        assert (await cache.get(invoice_id)).version == 1
+        await cache.set(inv)
+        assert (await cache.get(invoice_id)).version == 1
+
+
+@pytest.mark.asyncio
+async def test_conditional_reads_skip_the_cache():
+    from src.Application.Queries.GetInvoice import getInvoiceVersionHandler
+
+    class VersionRepo:
+        async def get_version(self, invoice_id):
+            return 7
+
+    # whatever another process cached, the version comes from the database
+    assert await getInvoiceVersionHandler("inv", repo=VersionRepo()) == 7
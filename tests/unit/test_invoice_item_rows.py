@@ -0,0 +1,211 @@
+import pytest
+from uuid import uuid4
+
+from src.Infrastructure.Repositories.InvoiceRepository import InvoiceRepository
+from src.Domain.Invoice.Invoice import Invoice
+from src.Domain.ValueObject.InvoiceId import InvoiceId
+from src.Domain.ValueObject.InvoiceItem import InvoiceItem
+from src.Domain.ValueObject.InvoiceNumber import InvoiceNumber
+from src.Domain.Shared.ValueObject.Money import Money
+
+
+class Result:
+    rowcount = 1
+
+    def all(self):
+        return []
+
+
+class RecordingSession:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, stmt, params=None):
+        self.statements.append(stmt.__visit_name__)
+        self.params = params
+        return Result()
+
+
+def _items(n):
+    return [InvoiceItem(product_id=f"P{i}", description="X", quantity=1, unit_price=Money(1.0)) for i in range(n)]
+
+
+@pytest.mark.asyncio
+async def test_single_item_change_writes_single_row():
+    repo = InvoiceRepository()
+    items = _items(200)
+    session = RecordingSession()
+    rows = await repo._write_item_changes(session, "inv", items, {})
+    # new lines go out as one multi-row INSERT
+    assert session.statements == ["insert"]
+    assert len(session.params) == 200
+
+    inv = Invoice(id=InvoiceId(uuid4()), customer="C", amount=Money(0.0), invoiceNumber=InvoiceNumber("INV-R1"), items=list(items))
+    inv.update_item_quantity("P10", 5)
+    session = RecordingSession()
+    rows = await repo._write_item_changes(session, "inv", inv.items, rows)
+    assert session.statements == ["update"]
+    assert rows["P10"][1] == 5
+
+    inv.remove_item("P3")
+    inv.add_item(InvoiceItem(product_id="NEW", description="Y", quantity=2, unit_price=Money(3.0)))
+    session = RecordingSession()
+    rows = await repo._write_item_changes(session, "inv", inv.items, rows)
+    assert session.statements == ["delete", "insert"]
+    # new rows are appended after the highest existing position
+    assert rows["NEW"][3] == 200
+
+
+def test_add_item_rejects_duplicate_product():
+    inv = Invoice(id=InvoiceId(uuid4()), customer="C", amount=Money(0.0), invoiceNumber=InvoiceNumber("INV-R2"), items=_items(1))
+    with pytest.raises(ValueError):
+        inv.add_item(InvoiceItem(product_id="P0", description="X", quantity=1, unit_price=Money(1.0)))
+
+
+class FakeSessionFactory:
+    """Stands in for AsyncSessionLocal; every session shares one RecordingSession."""
+
+    def __init__(self):
+        self.session = RecordingSession()
+        self.session.add = lambda obj: self.session.statements.append("outbox")
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self.session
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class _Begin:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.mark.asyncio
+async def test_save_writes_without_reading_back(monkeypatch):
+    import src.Infrastructure.Repositories.InvoiceRepository as module
+
+    factory = FakeSessionFactory()
+    factory.session.begin = lambda: _Begin()
+    monkeypatch.setattr(module, "AsyncSessionLocal", factory)
+
+    repo = InvoiceRepository()
+    inv = Invoice(id=InvoiceId(uuid4()), customer="C", amount=Money(0.0), invoiceNumber=InvoiceNumber("INV-R3"), items=_items(3))
+    inv.record_event("invoice.created", {})
+    saved = await repo.save(inv)
+    assert saved is inv
+    # invoice, items, outbox, read model
+    assert factory.session.statements == ["insert", "insert", "insert", "insert"]
+
+    factory.session.statements = []
+    inv.issue()
+    await repo.save(inv)
+    assert factory.session.statements == ["update"]
+    assert inv.version == 1
+
+
+@pytest.mark.asyncio
+async def test_save_replaces_cached_invoice(monkeypatch):
+    import src.Infrastructure.Repositories.InvoiceRepository as module
+    from src.Infrastructure.Cache.InvoiceCache import InMemoryInvoiceCache
+
+    factory = FakeSessionFactory()
+    factory.session.begin = lambda: _Begin()
+    monkeypatch.setattr(module, "AsyncSessionLocal", factory)
+
+    cache = InMemoryInvoiceCache()
+    repo = InvoiceRepository(cache=cache)
+    inv = Invoice(id=InvoiceId(uuid4()), customer="C", amount=Money(0.0), invoiceNumber=InvoiceNumber("INV-R4"))
+    await repo.save(inv)
+    await cache.set(inv)
+
+    stale = await cache.get(str(inv.id.value))
+    inv.issue()
+    await repo.save(inv)
+    cached = await cache.get(str(inv.id.value))
+    assert (cached.status.value, cached.version) == ("issued", 1)
+    # a read that started before the write cannot put its copy back
+    await cache.set(stale)
+    assert (await cache.get(str(inv.id.value))).version == 1
+
+
+@pytest.mark.asyncio
+async def test_save_updates_persisted_invoice_loaded_elsewhere(monkeypatch):
+    import src.Infrastructure.Repositories.InvoiceRepository as module
+    from src.Infrastructure.Cache.InvoiceCache import invoice_from_primitive, invoice_to_primitive
+
+    factory = FakeSessionFactory()
+    factory.session.begin = lambda: _Begin()
+    monkeypatch.setattr(module, "AsyncSessionLocal", factory)
+
+    inv = Invoice(id=InvoiceId(uuid4()), customer="C", amount=Money(0.0), invoiceNumber=InvoiceNumber("INV-R5"), items=_items(1))
+    await InvoiceRepository().save(inv)
+    # e.g. served by the cache to a request with its own repository
+    cached = invoice_from_primitive(invoice_to_primitive(inv))
+    assert cached.persisted
+
+    factory.session.statements = []
+    cached.issue()
+    await InvoiceRepository().save(cached)
+    # a version-checked UPDATE instead of an INSERT of the invoice row, then
+    # the stored item rows are read to diff against
+    assert factory.session.statements[:2] == ["update", "select"]
+    assert cached.version == 1
+
+
+class TotalsResult(Result):
+    def one(self):
+        return (4, 12.5, 3)
+
+
+class ItemEditSession(RecordingSession):
+    async def execute(self, stmt, params=None):
+        await super().execute(stmt, params)
+        return TotalsResult()
+
+
+@pytest.mark.asyncio
+async def test_item_edit_applies_amount_delta_without_reloading_lines():
+    session = ItemEditSession()
+    repo = InvoiceRepository(session=session)
+    recorded = []
+
+    change = await repo.update_item_quantity("inv", "P1", 3, on_change=lambda c: c.record_event("invoice.item.updated", {"invoice_id": c.invoice_id}) or recorded.append(c))
+
+    # amount delta + version, the line itself, then one row of new totals;
+    # outbox insert and read-model refresh follow
+    assert session.statements == ["update", "update", "select", "insert", "update"]
+    assert (change.version, change.amount.value, change.items_count) == (4, 12.5, 3)
+    assert recorded == [change]
+
+
+class ItemRowsResult(Result):
+    def all(self):
+        return [("inv", "P1", "X", 2, 1.5, 0)]
+
+
+class ItemRowsSession(RecordingSession):
+    async def execute(self, stmt, params=None):
+        await super().execute(stmt, params)
+        return ItemRowsResult()
+
+
+@pytest.mark.asyncio
+async def test_reads_do_not_remember_item_rows():
+    repo = InvoiceRepository()
+    items = await repo._load_items(ItemRowsSession(), ["inv"])
+    assert [it.product_id for it in items["inv"]] == ["P1"]
+    # lists and pages must not grow the write-path bookkeeping
+    assert repo._item_rows == {}
+
+    bound = InvoiceRepository(session=ItemRowsSession())
+    await bound._load_items(bound._session, ["inv"], bound._item_rows)
+    assert bound._item_rows["inv"]["P1"][1] == 2
+    await bound.on_commit()
+    assert bound._item_rows == {}
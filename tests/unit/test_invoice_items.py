@@ -18,3 +18,23 @@ def test_invoice_amount_consistency():
     inv = Invoice(id=InvoiceId(uuid4()), customer="C", amount=Money(0.0), invoiceNumber=InvoiceNumber("INV-100"), items=items)
     # amount should be set to sum(items)
     assert inv.amount.value == 20.0
+
+
+def test_item_edits_keep_running_total_and_index():
+    from src.Domain.Invoice.Invoice import Invoice
+    from src.Domain.ValueObject.InvoiceId import InvoiceId
+    from src.Domain.ValueObject.InvoiceNumber import InvoiceNumber
+
+    inv = Invoice(id=InvoiceId(uuid4()), customer="C", amount=Money(99.0), invoiceNumber=InvoiceNumber("INV-101"))
+    for i in range(5):
+        inv.add_item(InvoiceItem(product_id=f"P{i}", description="X", quantity=1, unit_price=Money(1.5)))
+    # the first line replaced the amount given without items
+    assert inv.amount == Money(7.5)
+
+    inv.update_item_quantity("P3", 4)
+    inv.remove_item("P1")
+    inv.update_item_quantity("P4", 2)
+    assert [it.product_id for it in inv.items] == ["P0", "P2", "P3", "P4"]
+    assert [it.quantity for it in inv.items] == [1, 1, 4, 2]
+    assert inv.amount == Money(12.0)
+    assert inv.amount.cents == sum(it.quantity * it.unit_price.cents for it in inv.items)
@@ -0,0 +1,87 @@
+import pytest
+
+from src.Infrastructure.Projections.InvoiceSummaryProjector import InvoiceSummaryProjector
+from src.Infrastructure.Repositories.InvoiceRepository import InvoiceRepository
+
+
+class RecordingSession:
+    def __init__(self, results=()):
+        self.statements = []
+        self.results = list(results)
+
+    async def execute(self, stmt, params=None):
+        self.statements.append(str(stmt).split("\n")[0])
+        return self.results.pop(0) if self.results else None
+
+
+@pytest.mark.asyncio
+async def test_events_are_applied_set_wise():
+    session = RecordingSession()
+    events = [
+        ("invoice.created", {"invoice_id": "a"}),
+        ("invoice.created", {"invoice_id": "b"}),
+        ("invoice.item.added", {"invoice_id": "a", "items_count": 1}),
+        ("invoice.item.updated", {"invoice_id": "a", "quantity": 2}),
+        ("invoice.issued", {"invoice_id": "a", "status": "issued"}),
+        ("invoice.issued", {"invoice_id": "b", "status": "issued"}),
+        ("invoice.paid", {"invoice_id": "c", "status": "paid"}),
+    ]
+    await InvoiceSummaryProjector().apply(session, events)
+    assert len(session.statements) == 4
+    assert session.statements[0].startswith("INSERT IGNORE INTO invoice_summaries")
+    assert all(stmt.startswith("UPDATE invoice_summaries") for stmt in session.statements[1:])
+
+
+class Rows:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def mappings(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+    def __iter__(self):
+        return iter(self.rows)
+
+
+class Line:
+    def __init__(self, invoice_id, product_id):
+        self.invoice_id = invoice_id
+        self.product_id = product_id
+        self.description = "X"
+        self.quantity = 1
+        self.unit_price = 2.0
+
+
+class FakeSessionFactory:
+    def __init__(self, session):
+        self.session = session
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self.session
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.mark.asyncio
+async def test_summaries_are_read_without_building_aggregates(monkeypatch):
+    import src.Infrastructure.Repositories.InvoiceRepository as module
+
+    summaries = [{"id": "a", "customer": "C", "item_count": 2}, {"id": "b", "customer": "C", "item_count": 0}]
+    session = RecordingSession([Rows(summaries), Rows([Line("a", "P1"), Line("a", "P2")])])
+    monkeypatch.setattr(module, "AsyncSessionLocal", FakeSessionFactory(session))
+
+    repo = InvoiceRepository()
+    rows = [row async for row in repo.iter_summaries(10)]
+    assert [row["id"] for row in rows] == ["a", "b"]
+    lines = await repo.summary_items([row["id"] for row in rows])
+    assert [it["productId"] for it in lines["a"]] == ["P1", "P2"]
+    assert "b" not in lines
+    # one scan of the read model, one IN query for the lines
+    assert len(session.statements) == 2
@@ -0,0 +1,26 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+from uuid import uuid4
+
+from src.Infrastructure.Adapters.Json import dumps, invoice_to_json
+from src.Infrastructure.Adapters.Http import InvoiceResponse
+from src.Domain.Invoice.Invoice import Invoice
+from src.Domain.Shared.ValueObject.Money import Money
+from src.Domain.ValueObject.InvoiceId import InvoiceId
+from src.Domain.ValueObject.InvoiceItem import InvoiceItem
+from src.Domain.ValueObject.InvoiceNumber import InvoiceNumber
+
+
+def test_invoice_to_json_matches_response_model():
+    items = [InvoiceItem(product_id="P1", description="Café", quantity=2, unit_price=Money(5.25))]
+    inv = Invoice(id=InvoiceId(uuid4()), customer="C", amount=Money(0.0), invoiceNumber=InvoiceNumber("INV-J1"), items=items)
+    data = invoice_to_json(inv)
+    assert data == InvoiceResponse(**data).dict()
+    assert data["amount"] == 10.5 and data["items"][0]["unitPrice"] == 5.25
+
+
+def test_dumps_encodes_decimals_and_datetimes():
+    content = {"amount": Decimal("1.50"), "createdAt": datetime(2024, 1, 2, 3, 4, 5), "customer": "Café"}
+    expected = {"amount": 1.5, "createdAt": "2024-01-02T03:04:05", "customer": "Café"}
+    assert json.loads(dumps(content)) == expected
@@ -0,0 +1,86 @@
+import pytest
+from datetime import datetime, timedelta
+from uuid import uuid4
+try:
+    from httpx import AsyncClient
+    _HAS_HTTPX = True
+except Exception:
+    _HAS_HTTPX = False
+from src.Main import app
+from src.Infrastructure.Adapters.Http import getReadRepository
+from src.Domain.Invoice.Invoice import Invoice
+from src.Domain.ValueObject.InvoiceId import InvoiceId
+from src.Domain.ValueObject.InvoiceNumber import InvoiceNumber
+from src.Domain.ValueObject.InvoiceStatus import InvoiceStatus
+from src.Domain.Shared.ValueObject.Money import Money
+
+
+class PagedRepo:
+    def __init__(self, invoices):
+        self.invoices = invoices
+
+    async def iter_summaries(self, limit, after=None, status=None, customer=None, created_from=None, created_to=None):
+        rows = sorted(self.invoices, key=lambda inv: (inv.created_at, str(inv.id.value)), reverse=True)
+        if after is not None:
+            rows = [inv for inv in rows if (inv.created_at, str(inv.id.value)) < after]
+        if status is not None:
+            rows = [inv for inv in rows if inv.status.value == status]
+        for inv in rows[:limit]:
+            yield {
+                "id": str(inv.id.value),
+                "customer": inv.customer,
+                "status": inv.status.value,
+                "amount": inv.amount.value,
+                "item_count": len(inv.items),
+                "invoice_number": inv.invoiceNumber.value,
+                "created_at": inv.created_at,
+                "updated_at": inv.created_at,
+            }
+
+    async def summary_items(self, invoice_ids):
+        return {str(inv.id.value): [it.to_primitive() for it in inv.items] for inv in self.invoices if str(inv.id.value) in invoice_ids}
+
+
+def _client():
+    try:
+        return AsyncClient(app=app, base_url="http://test")
+    except TypeError:
+        from httpx import ASGITransport
+        return AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not _HAS_HTTPX, reason="httpx/httpcore import failed (incompatible Python)")
+async def test_list_invoices_keyset_pages():
+    base = datetime(2024, 1, 1)
+    invoices = []
+    for i in range(5):
+        inv = Invoice(id=InvoiceId(uuid4()), customer="C", amount=Money(0.0), invoiceNumber=InvoiceNumber(f"INV-P{i}"), status=InvoiceStatus("issued" if i % 2 else "draft"))
+        inv.created_at = base + timedelta(minutes=i)
+        invoices.append(inv)
+    app.dependency_overrides[getReadRepository] = lambda: PagedRepo(invoices)
+
+    client = _client()
+    await client.__aenter__()
+    try:
+        r1 = await client.get("/api/invoices", params={"limit": 2})
+        assert r1.status_code == 200
+        assert [inv["invoiceNumber"] for inv in r1.json()] == ["INV-P4", "INV-P3"]
+        assert r1.json()[0]["itemCount"] == 0
+        cursor = r1.headers["X-Next-Cursor"]
+
+        r2 = await client.get("/api/invoices", params={"limit": 2, "cursor": cursor})
+        assert [inv["invoiceNumber"] for inv in r2.json()] == ["INV-P2", "INV-P1"]
+
+        r3 = await client.get("/api/invoices", params={"limit": 2, "cursor": r2.headers["X-Next-Cursor"]})
+        assert [inv["invoiceNumber"] for inv in r3.json()] == ["INV-P0"]
+        assert "X-Next-Cursor" not in r3.headers
+
+        r4 = await client.get("/api/invoices", params={"status": "issued"})
+        assert [inv["invoiceNumber"] for inv in r4.json()] == ["INV-P3", "INV-P1"]
+
+        bad = await client.get("/api/invoices", params={"cursor": "not-a-cursor"})
+        assert bad.status_code == 400
+    finally:
+        await client.__aexit__(None, None, None)
+        app.dependency_overrides.clear()
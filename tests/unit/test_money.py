@@ -0,0 +1,39 @@
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+
+from src.Domain.Invoice.Invoice import Invoice
+from src.Domain.Shared.ValueObject.Money import Money
+from src.Domain.ValueObject.InvoiceId import InvoiceId
+from src.Domain.ValueObject.InvoiceItem import InvoiceItem
+from src.Domain.ValueObject.InvoiceNumber import InvoiceNumber
+
+
+def test_money_holds_integer_cents():
+    assert Money(0.1).cents == 10
+    assert Money("19.995").cents == 2000
+    assert Money(Decimal("12.34")).to_decimal() == Decimal("12.34")
+    assert Money(12.5) == Money.from_cents(1250)
+    assert Money(0.1) + Money(0.2) == Money(0.3)
+    assert (Money(0.1) * 3).value == 0.3
+    with pytest.raises(TypeError):
+        Money("ten")
+    with pytest.raises(ValueError):
+        Money(1, "EUR") + Money(1, "USD")
+
+
+def test_exact_money_rejects_fractions_of_a_cent():
+    assert Money.exact(10.5) == Money.from_cents(1050)
+    assert Money.exact("0.10").cents == 10
+    with pytest.raises(ValueError):
+        Money.exact(10.005)
+    with pytest.raises(ValueError):
+        Money.exact(Decimal("0.001"))
+
+
+def test_invoice_total_is_exact_for_many_lines():
+    items = [InvoiceItem(product_id=f"P{i}", description="kWh", quantity=3, unit_price=Money(0.1)) for i in range(10000)]
+    inv = Invoice(id=InvoiceId(uuid4()), customer="C", amount=Money(0), invoiceNumber=InvoiceNumber("INV-M1"), items=items)
+    assert inv.amount.cents == 300000
+    assert inv.amount.value == 3000.0
@@ -0,0 +1,57 @@
+import pytest
+from uuid import uuid4
+
+from src.Application.Commands.IssueInvoice import issueInvoiceHandler
+from src.Application.Commands.AddItem import addInvoiceItemHandler
+from src.Application.Ports.Repositories import InvoiceRepositoryPort
+from src.Application.Ports.Events import EventPublisherPort
+from src.Domain.ValueObject.InvoiceId import InvoiceId
+from src.Domain.Shared.ValueObject.Money import Money
+from src.Domain.ValueObject.InvoiceNumber import InvoiceNumber
+from src.Domain.Invoice.Invoice import Invoice
+
+
+class OutboxRepo(InvoiceRepositoryPort):
+    """Fake repository that takes recorded events into its own outbox on save."""
+
+    def __init__(self):
+        self.store = {}
+        self.outbox = []
+
+    async def save(self, invoice: Invoice) -> Invoice:
+        self.outbox.extend(invoice.pull_events())
+        self.store[str(invoice.id.value)] = invoice
+        return invoice
+
+    async def get(self, invoice_id: str) -> Invoice | None:
+        return self.store.get(invoice_id)
+
+
+class FakePublisher(EventPublisherPort):
+    def __init__(self):
+        self.published = []
+
+    async def publish(self, topic: str, payload: dict):
+        self.published.append((topic, payload))
+
+
+def test_record_and_pull_events():
+    inv = Invoice(id=InvoiceId(uuid4()), customer="A", amount=Money(0.0), invoiceNumber=InvoiceNumber("INV-O0"))
+    inv.record_event("invoice.issued", {"invoice_id": "x"})
+    assert inv.pull_events() == [("invoice.issued", {"invoice_id": "x"})]
+    assert inv.pull_events() == []
+
+
+@pytest.mark.asyncio
+async def test_events_go_to_outbox_instead_of_publisher():
+    repo = OutboxRepo()
+    pub = FakePublisher()
+    inv = Invoice(id=InvoiceId(uuid4()), customer="A", amount=Money(0.0), invoiceNumber=InvoiceNumber("INV-O1"))
+    await repo.save(inv)
+
+    await addInvoiceItemHandler(str(inv.id.value), "P1", "Prod", 1, 2.0, repo=repo, publisher=pub)
+    await issueInvoiceHandler(str(inv.id.value), repo=repo, publisher=pub)
+
+    assert pub.published == []
+    assert [key for key, _ in repo.outbox] == ["invoice.item.added", "invoice.issued"]
+    assert repo.outbox[-1][1]["status"] == "issued"
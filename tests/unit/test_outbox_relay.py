@@ -0,0 +1,96 @@
+import pytest
+from types import SimpleNamespace
+
+import src.Infrastructure.Events.OutboxRelay as module
+from src.Infrastructure.Events.OutboxRelay import OutboxRelay
+
+
+class Result:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+    def scalars(self):
+        return iter(self.rows)
+
+
+class FakeDatabase:
+    """Stands in for AsyncSessionLocal; logs statements and transaction boundaries."""
+
+    def __init__(self, results):
+        self.results = list(results)
+        self.log = []
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def begin(self):
+        return Transaction(self)
+
+    async def execute(self, stmt):
+        self.log.append(stmt.__visit_name__)
+        return Result(self.results.pop(0) if stmt.__visit_name__ == "select" else [])
+
+
+class Transaction:
+    def __init__(self, db):
+        self.db = db
+
+    async def __aenter__(self):
+        self.db.log.append("begin")
+
+    async def __aexit__(self, *exc):
+        self.db.log.append("commit" if exc[0] is None else "rollback")
+        return False
+
+
+class Publisher:
+    def __init__(self, db, fail=False):
+        self.db = db
+        self.fail = fail
+
+    async def publish_batch(self, events):
+        self.db.log.append(("publish", len(events)))
+        if self.fail:
+            raise RuntimeError("broker down")
+
+
+def _rows(n):
+    return [SimpleNamespace(id=i, routing_key="invoice.created", payload='{"invoice_id": "x"}') for i in range(n)]
+
+
+@pytest.mark.asyncio
+async def test_claim_commits_before_publishing(monkeypatch):
+    db = FakeDatabase([_rows(2)])
+    monkeypatch.setattr(module, "AsyncSessionLocal", db)
+
+    assert await OutboxRelay(Publisher(db)).relay_once() == 2
+    # claim (lock + lease), committed; publish without locks; mark sent
+    assert db.log == ["begin", "select", "update", "commit", ("publish", 2), "begin", "update", "commit"]
+
+
+@pytest.mark.asyncio
+async def test_failed_publish_releases_the_claim(monkeypatch):
+    db = FakeDatabase([_rows(1)])
+    monkeypatch.setattr(module, "AsyncSessionLocal", db)
+
+    with pytest.raises(RuntimeError):
+        await OutboxRelay(Publisher(db, fail=True)).relay_once()
+    assert db.log[-3:] == ["begin", "update", "commit"]
+
+
+@pytest.mark.asyncio
+async def test_purge_deletes_sent_rows_in_batches(monkeypatch):
+    db = FakeDatabase([[1, 2], [3]])
+    monkeypatch.setattr(module, "AsyncSessionLocal", db)
+
+    assert await OutboxRelay(Publisher(db), batch_size=2).purge_once() == 3
+    assert [entry for entry in db.log if entry not in ("begin", "commit")] == ["select", "delete", "select", "delete"]
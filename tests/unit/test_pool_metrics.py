@@ -0,0 +1,37 @@
+import pytest
+from sqlalchemy import exc
+from sqlalchemy.util._concurrency_py3k import greenlet_spawn
+
+from src.Infrastructure.Database.PoolMetrics import InstrumentedAsyncPool, pool_stats
+
+
+class FakeConnection:
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_pool_reports_gauges_and_wait_counters():
+    pool = InstrumentedAsyncPool(FakeConnection, pool_size=1, max_overflow=1, timeout=0.01)
+
+    first = await greenlet_spawn(pool.connect)
+    second = await greenlet_spawn(pool.connect)
+    stats = pool_stats(pool)
+    assert stats["checkedOut"] == 2
+    assert stats["overflow"] == 1
+    assert stats["checkouts"] == 2
+
+    with pytest.raises(exc.TimeoutError):
+        await greenlet_spawn(pool.connect)
+    assert pool.timeouts == 1
+    assert pool.wait_seconds_max >= 0.01
+
+    await greenlet_spawn(first.close)
+    await greenlet_spawn(second.close)
+    stats = pool_stats(pool)
+    assert stats["checkedOut"] == 0
+    assert stats["idle"] == 1
+    assert stats["checkouts"] == 3
@@ -0,0 +1,82 @@
+import time
+import pytest
+from starlette.requests import Request
+try:
+    from httpx import AsyncClient
+    _HAS_HTTPX = True
+except Exception:
+    _HAS_HTTPX = False
+from src.Main import app
+from src.Infrastructure.Adapters.Http import getRepository, getPublisher, getReadRepository, getCache
+from src.Infrastructure.Repositories.InvoiceReadRepository import InvoiceReadRepository
+from src.Infrastructure.Repositories.InvoiceRepository import InvoiceRepository
+
+
+def _request(cookie=None, last_write=None):
+    headers = [(b"cookie", cookie.encode())] if cookie else []
+    if last_write is not None:
+        headers.append((b"x-last-write", last_write.encode()))
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+def test_reads_go_to_primary_right_after_a_write():
+    assert type(getReadRepository(_request())) is InvoiceReadRepository
+    assert getCache(_request()) is not None
+
+    fresh = _request(f"last_write={time.time()}")
+    assert type(getReadRepository(fresh)) is InvoiceRepository
+    assert getCache(fresh) is None
+
+    stale = _request(f"last_write={time.time() - 3600}")
+    assert type(getReadRepository(stale)) is InvoiceReadRepository
+
+    # clients without cookies echo the response header instead
+    echoed = _request(last_write=f"{time.time()}")
+    assert type(getReadRepository(echoed)) is InvoiceRepository
+    assert getCache(echoed) is None
+
+
+@pytest.mark.asyncio
+async def test_read_repository_rejects_writes():
+    with pytest.raises(RuntimeError):
+        await InvoiceReadRepository().remove_item("inv", "P1")
+
+
+class InMemoryRepo:
+    async def save(self, invoice):
+        return invoice
+
+
+class DummyPublisher:
+    async def publish(self, key, payload):
+        return None
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not _HAS_HTTPX, reason="httpx/httpcore import failed (incompatible Python)")
+async def test_successful_writes_set_the_last_write_cookie():
+    app.dependency_overrides[getRepository] = lambda: InMemoryRepo()
+    app.dependency_overrides[getPublisher] = lambda: DummyPublisher()
+    try:
+        client = AsyncClient(app=app, base_url="http://test")
+    except TypeError:
+        from httpx import ASGITransport
+        client = AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+    await client.__aenter__()
+    try:
+        r = await client.post("/api/invoices", json={"customer": "C", "invoiceNumber": "INV-RYW"})
+        assert r.status_code == 200
+        assert "last_write=" in r.headers["set-cookie"]
+        assert r.cookies["last_write"] == r.headers["x-last-write"]
+
+        # a read-only POST is not a write
+        read = await client.post("/api/invoices:batchGet", json={"ids": []})
+        assert "set-cookie" not in read.headers
+        assert "x-last-write" not in read.headers
+
+        bad = await client.post("/api/invoices:batchPay", json={})
+        assert bad.status_code == 400
+        assert "set-cookie" not in bad.headers
+    finally:
+        await client.__aexit__(None, None, None)
+        app.dependency_overrides.clear()
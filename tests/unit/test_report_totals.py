@@ -0,0 +1,98 @@
+import pytest
+from sqlalchemy.dialects import mysql
+try:
+    from httpx import AsyncClient
+    _HAS_HTTPX = True
+except Exception:
+    _HAS_HTTPX = False
+from src.Main import app
+from src.Application.Queries.GetTotals import getTotalsHandler
+from src.Infrastructure.Adapters.Http import getReadRepository, getReportCache
+from src.Infrastructure.Cache.ReportCache import InMemoryReportCache
+import src.Infrastructure.Repositories.InvoiceRepository as repository_module
+from src.Infrastructure.Repositories.InvoiceRepository import InvoiceRepository
+
+
+class TotalsRepo:
+    def __init__(self):
+        self.calls = []
+
+    async def report_totals(self, group_by, **filters):
+        self.calls.append((list(group_by), filters))
+        return [{"customer": "ACME", "period": "2024-01", "count": 2, "amount": 30.0}]
+
+
+@pytest.mark.asyncio
+async def test_totals_handler_validates_and_caches():
+    repo = TotalsRepo()
+    cache = InMemoryReportCache(ttl=60)
+
+    with pytest.raises(ValueError):
+        await getTotalsHandler(["product"], repo=repo, cache=cache)
+    with pytest.raises(ValueError):
+        await getTotalsHandler(["customer"], period="week", repo=repo, cache=cache)
+
+    first = await getTotalsHandler(["period", "customer"], repo=repo, cache=cache)
+    second = await getTotalsHandler(["customer", "period"], repo=repo, cache=cache)
+    assert first == second
+    assert repo.calls == [(["customer", "period"], {"period": "month", "status": None, "customer": None, "created_from": None, "created_to": None})]
+
+    await getTotalsHandler(["customer", "period"], status="paid", repo=repo, cache=cache)
+    assert len(repo.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_report_totals_groups_in_sql(monkeypatch):
+    statements = []
+
+    class Result:
+        def mappings(self):
+            return [{"status": "paid", "period": "2024", "count": 3, "amount": 42.0}]
+
+    class Session:
+        async def execute(self, stmt):
+            statements.append(str(stmt.compile(dialect=mysql.dialect())))
+            return Result()
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+    monkeypatch.setattr(repository_module, "AsyncSessionLocal", Session)
+    rows = await InvoiceRepository().report_totals(["status", "period"], period="year", customer="ACME")
+
+    assert rows == [{"status": "paid", "period": "2024", "count": 3, "amount": 42.0}]
+    sql = statements[0]
+    assert "GROUP BY invoices.status, date_format(invoices.created_at" in sql
+    assert "sum(invoices.amount)" in sql
+    assert "invoices.customer = " in sql
+
+
+def _client():
+    try:
+        return AsyncClient(app=app, base_url="http://test")
+    except TypeError:
+        from httpx import ASGITransport
+        return AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not _HAS_HTTPX, reason="httpx/httpcore import failed (incompatible Python)")
+async def test_totals_endpoint():
+    repo = TotalsRepo()
+    app.dependency_overrides[getReadRepository] = lambda: repo
+    app.dependency_overrides[getReportCache] = lambda: InMemoryReportCache(ttl=0)
+    client = _client()
+    await client.__aenter__()
+    try:
+        r = await client.get("/api/reports/totals", params={"groupBy": "customer,period", "period": "month"})
+        assert r.status_code == 200
+        assert r.json() == [{"customer": "ACME", "period": "2024-01", "count": 2, "amount": 30.0}]
+
+        assert (await client.get("/api/reports/totals", params={"groupBy": "product"})).status_code == 400
+        assert (await client.get("/api/reports/totals", params={"period": "week"})).status_code == 422
+    finally:
+        await client.__aexit__(None, None, None)
+        app.dependency_overrides.clear()
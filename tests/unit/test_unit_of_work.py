@@ -0,0 +1,123 @@
+import copy
+import pytest
+from uuid import uuid4
+
+from src.Application.Commands.PayInvoice import payInvoiceHandler
+from src.Application.Ports.Repositories import InvoiceRepositoryPort, ConcurrencyConflict
+from src.Application.Ports.UnitOfWork import UnitOfWork
+from src.Infrastructure.Cache.InvoiceCache import InMemoryInvoiceCache
+from src.Infrastructure.Repositories.UnitOfWork import SqlAlchemyUnitOfWork
+from src.Domain.Invoice.Invoice import Invoice
+from src.Domain.ValueObject.InvoiceId import InvoiceId
+from src.Domain.ValueObject.InvoiceNumber import InvoiceNumber
+from src.Domain.ValueObject.InvoiceStatus import InvoiceStatus
+from src.Domain.Shared.ValueObject.Money import Money
+
+
+class RacingRepo(InvoiceRepositoryPort):
+    def __init__(self, invoice, conflicts):
+        self.store = {str(invoice.id.value): invoice}
+        self.conflicts = conflicts
+
+    async def save(self, invoice, reload=False):
+        if self.conflicts:
+            self.conflicts -= 1
+            raise ConcurrencyConflict("conflict")
+        self.store[str(invoice.id.value)] = invoice
+        return invoice
+
+    async def get(self, invoice_id):
+        return copy.deepcopy(self.store.get(invoice_id))
+
+
+class RecordingUnitOfWork(UnitOfWork):
+    def __init__(self, invoices):
+        self.invoices = invoices
+        self.log = []
+
+    async def commit(self):
+        self.log.append("commit")
+
+    async def rollback(self):
+        self.log.append("rollback")
+
+
+class NullPublisher:
+    async def publish(self, routing_key, payload):
+        pass
+
+
+def _invoice(status="issued"):
+    return Invoice(id=InvoiceId(uuid4()), customer="A", amount=Money(1.0), invoiceNumber=InvoiceNumber("INV-U1"), status=InvoiceStatus(status))
+
+
+@pytest.mark.asyncio
+async def test_each_attempt_is_one_transaction():
+    inv = _invoice()
+    uow = RecordingUnitOfWork(RacingRepo(inv, conflicts=1))
+    paid = await payInvoiceHandler(str(inv.id.value), publisher=NullPublisher(), uow=uow)
+    assert paid.status.value == "paid"
+    assert uow.log == ["rollback", "commit"]
+
+
+@pytest.mark.asyncio
+async def test_failed_command_is_rolled_back():
+    inv = _invoice(status="draft")
+    uow = RecordingUnitOfWork(RacingRepo(inv, conflicts=0))
+    with pytest.raises(ValueError):
+        await payInvoiceHandler(str(inv.id.value), publisher=NullPublisher(), uow=uow)
+    assert uow.log == ["rollback"]
+
+
+class Result:
+    rowcount = 1
+
+
+class SharedSession:
+    """Fails if the repository tries to manage its own transaction."""
+
+    def __init__(self):
+        self.statements = []
+        self.commits = 0
+
+    async def execute(self, stmt, params=None):
+        self.statements.append(stmt.__visit_name__)
+        return Result()
+
+    def add(self, obj):
+        self.statements.append("outbox")
+
+    def begin(self):
+        raise AssertionError("the unit of work owns the transaction")
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        pass
+
+    async def close(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_repository_writes_in_the_unit_session_and_caches_after_commit():
+    session = SharedSession()
+    cache = InMemoryInvoiceCache()
+    uow = SqlAlchemyUnitOfWork(cache=cache, session_factory=lambda: session)
+    inv = _invoice(status="draft")
+    invoice_id = str(inv.id.value)
+
+    await uow.invoices.save(inv)
+    await cache.set(inv)
+    inv.issue()
+    await uow.invoices.save(inv)
+    assert session.statements == ["insert", "update"]
+    # not committed yet: readers still get the cached copy
+    assert (await cache.get(invoice_id)).status.value == "draft"
+
+    await uow.commit()
+    assert session.commits == 1
+    # the saved aggregate replaces it once committed
+    cached = await cache.get(invoice_id)
+    assert (cached.status.value, cached.version) == ("issued", 1)
@@ -34,13 +34,15 @@ async def test_update_and_delete_item_handlers():
 
     # update quantity
     updated = await updateInvoiceItemHandler(str(inv.id.value), "P1", 3, repo=repo)
-    assert len(updated.items) == 1
+    assert updated.items_count == 1
     assert updated.amount.value == 15.0
+    assert repo.store[str(inv.id.value)].items[0].quantity == 3
 
     # delete item
     updated2 = await deleteInvoiceItemHandler(str(inv.id.value), "P1", repo=repo)
-    assert len(updated2.items) == 0
+    assert updated2.items_count == 0
     assert updated2.amount.value == 0.0
+    assert repo.store[str(inv.id.value)].items == []
 
 
 @pytest.mark.asyncio